@@ -4,8 +4,14 @@ INCOSE 표준 기반 자동 요구사항 품질 향상 시스템
 """
 import streamlit as st
 import json
+import uuid
+from datetime import datetime
 from pathlib import Path
-from modules import AIClient, RequirementImprover, RequirementEvaluator
+from modules import AIClient, AsyncAIClient, RequirementImprover, RequirementEvaluator, RequirementPipeline, BulkProcessor, ResultCache, JobStore, JobRunner, ExecutionService
+from modules.cache import make_key, normalize_text
+from modules.metrics import JsonlExporter, PrometheusExporter, call_context
+from modules.prescreen import prescreen
+from modules.rules import ScoreRecord
 import config
 
 # 페이지 설정
@@ -115,6 +121,72 @@ def delete_api_key():
     if CONFIG_FILE.exists():
         CONFIG_FILE.unlink()
 
+def get_user_key(api_key):
+    """사용자 구분 키 (API 키 해시, 요청 공평 분배와 일괄 처리 작업 소유자 구분에 사용)"""
+    return make_key(api_key)[:16]
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def get_ai_client(api_key, model, max_tokens):
+    """
+    AI 클라이언트 (HTTP 연결 풀 포함)를 프로세스 전체에서 재사용
+    
+    ASYNC_CLIENT이면 같은 키를 쓰는 모든 세션의 요청(스트리밍 포함)이 이벤트 루프 하나에서 동시 요청 수 제한을 공유 (동기 메서드 그대로 사용).
+    캐시에서 밀려난 클라이언트는 더 이상 참조되지 않으면 이벤트 루프와 연결을 스스로 정리 (프로세스 종료 시에도 정리)
+    """
+    client_class = AsyncAIClient if config.ASYNC_CLIENT else AIClient
+    ai_client = client_class(
+        api_key=api_key,
+        model=model,
+        max_tokens=max_tokens
+    )
+    
+    # 호출별 계측 기록 내보내기
+    if config.METRICS_JSONL_FILE:
+        ai_client.add_hook(JsonlExporter(config.METRICS_JSONL_FILE))
+    if config.METRICS_PROMETHEUS_FILE:
+        ai_client.add_hook(PrometheusExporter(config.METRICS_PROMETHEUS_FILE))
+    return ai_client
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def get_prompts(prompt_version):
+    """프롬프트 파일 로드 (파일 수정 시각이 바뀌면 다시 로드)"""
+    with open(config.PROMPT_FILE, 'r', encoding='utf-8') as f:
+        quality_prompt = f.read()
+    with open(config.SCORING_PROMPT_FILE, 'r', encoding='utf-8') as f:
+        scoring_prompt = f.read()
+    return quality_prompt, scoring_prompt
+
+@st.cache_resource(show_spinner=False)
+def get_result_cache():
+    """결과 캐시 (동일 텍스트/프롬프트/모델이면 API 호출 생략)"""
+    return ResultCache(config.CACHE_FILE, config.CACHE_MAX_BYTES)
+
+@st.cache_resource(show_spinner=False)
+def get_job_runner():
+    """일괄 처리 작업 큐 (프로세스당 하나, 이전 실행에서 중단된 작업은 이어서 처리, 요구사항은 실행 서비스에서 처리)"""
+    return JobRunner(JobStore(config.JOB_DB_FILE), get_execution_service())
+
+@st.cache_resource(show_spinner=False)
+def get_execution_service():
+    """개선 요청 실행 서비스 (프로세스당 하나, 모든 세션의 단건 요청과 일괄 작업이 작업자와 사용자별 대기열을 공유)"""
+    return ExecutionService()
+
+def create_pipeline(api_key):
+    """AI 클라이언트, 개선기, 평가기로 파이프라인 구성"""
+    ai_client = get_ai_client(api_key, config.AI_MODEL, config.MAX_TOKENS)
+    
+    prompt_version = (
+        config.PROMPT_FILE.stat().st_mtime_ns,
+        config.SCORING_PROMPT_FILE.stat().st_mtime_ns
+    )
+    quality_prompt, scoring_prompt = get_prompts(prompt_version)
+    
+    # 개선기 및 평가기 초기화
+    improver = RequirementImprover(ai_client, quality_prompt)
+    evaluator = RequirementEvaluator(ai_client, scoring_prompt)
+    
+    return RequirementPipeline(improver, evaluator, cache=get_result_cache())
+
 # 세션 스테이트 초기화
 if 'api_key' not in st.session_state:
     st.session_state.api_key = load_api_key()
@@ -128,6 +200,18 @@ if 'original_scores' not in st.session_state:
 if 'improved_scores' not in st.session_state:
     st.session_state.improved_scores = None
 
+if 'bulk_job' not in st.session_state:
+    st.session_state.bulk_job = None
+
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
+if 'improve_task' not in st.session_state:
+    st.session_state.improve_task = None
+
+if 'improve_notice' not in st.session_state:
+    st.session_state.improve_notice = None
+
 # 헤더
 st.markdown("# 🔧 요구사항 개선 도구")
 st.markdown("""
@@ -220,6 +304,18 @@ requirement_text = st.text_area(
     help="개선할 요구사항을 입력하세요"
 )
 
+# 로컬 사전 점검 (API 호출 없이 입력 즉시 표시)
+if requirement_text.strip():
+    local_scores = prescreen(requirement_text)
+    if local_scores:
+        st.caption("즉시 점검: " + " · ".join(
+            f"{rule} {'N/A' if value['score'] == 0 else str(value['score']) + '점'}"
+            for rule, value in local_scores.items()
+        ))
+        with st.expander("즉시 점검 상세"):
+            for rule, value in local_scores.items():
+                st.text(f"{rule}: {value['reason']}")
+
 # 개선하기 버튼
 if st.button("✨ 요구사항 개선하기", disabled=(not st.session_state.api_key or not requirement_text)):
     if not st.session_state.api_key:
@@ -227,44 +323,232 @@ if st.button("✨ 요구사항 개선하기", disabled=(not st.session_state.api
     elif not requirement_text:
         st.error("요구사항을 입력해주세요")
     else:
-        with st.spinner("🔄 요구사항을 분석하고 개선하는 중입니다..."):
-            try:
-                # AI 클라이언트 초기화
-                ai_client = AIClient(
-                    api_key=st.session_state.api_key,
-                    model=config.AI_MODEL,
-                    max_tokens=config.MAX_TOKENS
-                )
-                
-                # 프롬프트 로드
-                quality_prompt = ai_client.load_prompt(config.PROMPT_FILE)
-                scoring_prompt_file = config.SCORING_PROMPT_FILE
-                scoring_prompt = ai_client.load_prompt(scoring_prompt_file)
-                
-                # 개선기 및 평가기 초기화
-                improver = RequirementImprover(ai_client, quality_prompt)
-                evaluator = RequirementEvaluator(ai_client, scoring_prompt)
-                
-                # 1. 원본 평가
-                st.session_state.original_scores = evaluator.evaluate(requirement_text)
-                
-                # 2. 요구사항 개선
-                improved_result = improver.improve(
-                    original_text=requirement_text,
-                    subject=subject,
-                    system=system,
-                    receiver=receiver
+        try:
+            pipeline = create_pipeline(st.session_state.api_key)
+            run_id = uuid.uuid4().hex
+            
+            def improve_work(report, text=requirement_text, subject=subject, system=system, receiver=receiver):
+                """원본 평가와 개선을 동시에 실행하며 스트리밍 중인 개선 결과를 진행 상황으로 기록"""
+                streamed_text = ""
+                for event in pipeline.run_stream(original_text=text, subject=subject, system=system, receiver=receiver):
+                    if event['type'] == 'delta':
+                        streamed_text += event['text']
+                        report(text=streamed_text)
+                    else:
+                        return event['result']
+            
+            # API 키 단위로 공평하게 처리하고, 같은 키의 같은 요청이 진행 중이면 그 결과를 공유
+            user = get_user_key(st.session_state.api_key)
+            request_key = make_key("improve", normalize_text(requirement_text), subject, system, receiver)
+            with call_context(session=st.session_state.session_id, run=run_id):
+                task_id = get_execution_service().submit(user, request_key, improve_work)
+            st.session_state.improve_task = {"id": task_id, "run": run_id}
+            st.session_state.improve_notice = None
+            
+        except Exception as e:
+            st.error(f"❌ 오류 발생: {str(e)}")
+            st.info("API 키가 올바른지, 인터넷 연결이 정상인지 확인해주세요.")
+
+@st.fragment(run_every=config.EXECUTION_POLL_INTERVAL)
+def show_improve_task():
+    """개선 요청 진행 상황 (화면을 막지 않고 주기적으로 확인, 끝나면 결과를 세션에 반영하고 화면 갱신)"""
+    request = st.session_state.improve_task
+    service = get_execution_service()
+    task = service.status(request['id'])
+    
+    if task is None:
+        st.session_state.improve_task = None
+        st.session_state.improve_notice = ("error", "요청 결과가 만료되었습니다. 다시 시도해주세요.")
+        st.rerun()
+    
+    if task['state'] == 'queued':
+        stats = service.stats()
+        st.info(f"⏳ 대기 중입니다. 앞에 {task['ahead']}건이 있습니다. (처리 중 {stats['running']}/{stats['workers']}건)")
+        return
+    if task['state'] == 'running':
+        st.info("🔄 요구사항을 분석하고 개선하는 중입니다...")
+        if task['progress'].get('text'):
+            st.markdown(task['progress']['text'])
+        return
+    
+    st.session_state.improve_task = None
+    if task['state'] == 'failed':
+        st.session_state.improve_notice = ("error", task['error'])
+        st.rerun()
+    
+    # 세션에는 규칙별 이유 없이 압축된 점수만 보관
+    result = task['result']
+    st.session_state.original_scores = ScoreRecord.from_result(result['original_scores'], keep_reasons=False)
+    st.session_state.improved_result = result['improved_result']
+    st.session_state.improved_scores = ScoreRecord.from_result(result['improved_scores'], keep_reasons=False)
+    st.session_state.improve_notice = ("success", request['run'])
+    st.rerun()
+
+if st.session_state.improve_task:
+    show_improve_task()
+
+if st.session_state.improve_notice:
+    kind, detail = st.session_state.improve_notice
+    st.session_state.improve_notice = None
+    if kind == "error":
+        st.error(f"❌ 오류 발생: {detail}")
+        st.info("API 키가 올바른지, 인터넷 연결이 정상인지 확인해주세요.")
+    else:
+        st.success("개선 완료!")
+        
+        # 프롬프트 캐시 적중/미적중 토큰 수
+        usage = get_ai_client(st.session_state.api_key, config.AI_MODEL, config.MAX_TOKENS).usage_summary(run=detail)
+        if usage['calls']:
+            st.caption(
+                f"API 호출 {usage['calls']}회 · 캐시 적중 {usage['cache_read_tokens']:,} 토큰 · "
+                f"캐시 생성 {usage['cache_write_tokens']:,} 토큰 · 미캐시 입력 {usage['input_tokens']:,} 토큰 · "
+                f"출력 {usage['output_tokens']:,} 토큰 · 예상 비용 ${usage['cost']:.4f}"
+            )
+        else:
+            st.caption("결과 캐시 또는 진행 중이던 같은 요청의 결과를 사용하여 추가 API 호출이 없었습니다.")
+
+st.markdown("---")
+
+# 일괄 처리 섹션
+st.markdown("## 📂 일괄 처리")
+
+uploaded_file = st.file_uploader(
+    "요구사항 파일 (.xlsx / .csv)",
+    type=["xlsx", "csv"],
+    help="'요구사항' 열(없으면 첫 번째 열)의 각 행을 개선하고 평가합니다. 'ID' 열이 있으면 함께 기록됩니다."
+)
+
+job_runner = get_job_runner()
+owner = get_user_key(st.session_state.api_key) if st.session_state.api_key else None
+if owner:
+    # 이 API 키로 등록한 대기 작업(새로 고침/재시작 전 등록분 포함)을 이 키의 파이프라인으로 백그라운드 처리
+    job_runner.start(owner, create_pipeline(st.session_state.api_key))
+
+if st.button("📂 일괄 개선하기", disabled=(not st.session_state.api_key or uploaded_file is None)):
+    try:
+        bulk = BulkProcessor(create_pipeline(st.session_state.api_key))
+        requirements = list(bulk.read_requirements(uploaded_file, uploaded_file.name))
+        
+        # 결과는 세션이 아닌 작업 큐(SQLite)에 요구사항별로 저장
+        st.session_state.bulk_job = job_runner.submit(
+            owner,
+            uploaded_file.name,
+            requirements,
+            subject=subject,
+            system=system,
+            receiver=receiver
+        )
+        st.success(f"일괄 처리 작업을 등록했습니다. ({len(requirements)}건)")
+        
+    except Exception as e:
+        st.error(f"❌ 오류 발생: {str(e)}")
+
+@st.fragment(run_every=config.JOB_POLL_INTERVAL)
+def show_bulk_jobs():
+    """일괄 처리 작업 진행 상황 (주기적으로 갱신, 현재 API 키로 등록한 작업만 표시)"""
+    if not owner:
+        return
+    jobs = job_runner.store.list_jobs(owner)
+    if not jobs:
+        return
+    
+    job_ids = [job['id'] for job in jobs]
+    labels = {
+        job['id']: f"{job['name']} ({datetime.fromtimestamp(job['created']):%Y-%m-%d %H:%M}, {job['total']}건)"
+        for job in jobs
+    }
+    job_id = st.selectbox(
+        "작업",
+        job_ids,
+        index=job_ids.index(st.session_state.bulk_job) if st.session_state.bulk_job in job_ids else 0,
+        format_func=labels.get
+    )
+    job = jobs[job_ids.index(job_id)]
+    counts = job['counts']
+    finished = counts['done'] + counts['failed']
+    
+    st.progress(finished / job['total'] if job['total'] else 1.0, text=f"{finished} / {job['total']}")
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("대기", counts['pending'])
+    col2.metric("개선 중", counts['improving'])
+    col3.metric("평가 중", counts['scoring'])
+    col4.metric("완료", counts['done'])
+    col5.metric("실패", counts['failed'])
+    
+    # 집합 분석과 결과 파일 생성은 모든 요구사항이 끝나면 작업 큐가 실행 서비스에서 처리 (여기서는 저장된 파일만 표시)
+    output_path = Path(job['output']) if job['output'] else None
+    export_error = job_runner.export_errors.get(job_id)
+    if output_path is not None and not output_path.exists():
+        export_error = "결과 파일을 찾을 수 없습니다."
+    
+    if counts['failed'] and st.button("🔁 실패한 요구사항 다시 처리", key=f"retry_{job_id}"):
+        job_runner.retry_failed(job_id)
+        return
+    
+    if finished < job['total']:
+        # 진행 중에도 지금까지 끝난 요구사항의 결과를 받을 수 있도록 중간 결과 파일 생성 (집합 분석은 최종 파일에만 반영)
+        if counts['done'] and st.button("📄 현재까지 결과 파일 만들기", key=f"partial_{job_id}"):
+            job_runner.export_partial(owner, job)
+        partial_path = job_runner.partial_path(owner, job)
+        if partial_path.exists():
+            with open(partial_path, 'rb') as f:
+                st.download_button(
+                    label=f"📥 중간 결과 다운로드 ({datetime.fromtimestamp(partial_path.stat().st_mtime):%H:%M:%S} 기준)",
+                    data=f.read(),
+                    file_name=partial_path.name,
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    key=f"download_partial_{job_id}"
                 )
-                st.session_state.improved_result = improved_result
-                
-                # 3. 개선된 요구사항 평가
-                st.session_state.improved_scores = evaluator.evaluate(improved_result['improved'])
-                
-                st.success("개선 완료!")
-                
-            except Exception as e:
-                st.error(f"❌ 오류 발생: {str(e)}")
-                st.info("API 키가 올바른지, 인터넷 연결이 정상인지 확인해주세요.")
+        return
+    if export_error:
+        st.error(f"❌ 결과 파일 생성 실패: {export_error}")
+        if not counts['failed'] and st.button("🔁 결과 파일 다시 생성", key=f"export_{job_id}"):
+            job_runner.retry_failed(job_id)
+        return
+    if output_path is None:
+        st.info("🔄 요구사항 집합 분석 및 결과 파일 생성 중...")
+        return
+    
+    st.caption(f"저장 위치: {output_path}")
+    with open(output_path, 'rb') as f:
+        st.download_button(
+            label="📥 일괄 처리 결과 다운로드",
+            data=f.read(),
+            file_name=output_path.name,
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            key=f"download_{job_id}"
+        )
+
+show_bulk_jobs()
+
+# 세션 API 사용 현황
+if st.session_state.api_key:
+    session_usage = get_ai_client(st.session_state.api_key, config.AI_MODEL, config.MAX_TOKENS).usage_summary(
+        session=st.session_state.session_id
+    )
+    if session_usage['calls']:
+        with st.expander(f"📈 세션 API 사용 현황 (호출 {session_usage['calls']}회 · 예상 비용 ${session_usage['cost']:.4f})"):
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("평균 지연 시간", f"{session_usage['avg_latency']:.1f}초")
+            col2.metric("p95 지연 시간", f"{session_usage['p95_latency']:.1f}초")
+            col3.metric("평균 첫 토큰 시간", f"{session_usage['avg_ttft']:.1f}초")
+            col4.metric("재시도 / 오류", f"{session_usage['retries']} / {session_usage['errors']}")
+            
+            import pandas as pd
+            
+            st.dataframe(pd.DataFrame([
+                {
+                    "단계": phase,
+                    "호출": data['calls'],
+                    "평균 지연(초)": round(data['latency'] / data['calls'], 2),
+                    "미캐시 입력": data['input_tokens'],
+                    "캐시 적중": data['cache_read_tokens'],
+                    "캐시 생성": data['cache_write_tokens'],
+                    "출력": data['output_tokens'],
+                    "예상 비용($)": round(data['cost'], 4)
+                }
+                for phase, data in session_usage['phases'].items()
+            ]), use_container_width=True)
 
 st.markdown("---")
 
@@ -317,6 +601,26 @@ if st.session_state.original_scores and st.session_state.improved_scores:
             delta=f"+{delta_pct:.1f}%"
         )
         
+        # 증분 평가 여부
+        if impr.get('rescored_rules') == []:
+            st.caption("공백 외 변경이 없어 원본 점수를 그대로 사용했습니다.")
+        elif impr.get('rescored_rules'):
+            st.caption(f"변경이 작아 영향받는 {len(impr['rescored_rules'])}개 규칙만 다시 평가했습니다: {', '.join(impr['rescored_rules'])}")
+        
+        # 분리된 요구사항별 점수
+        if impr.get('items'):
+            import pandas as pd
+            st.caption(f"{len(impr['items'])}개로 분리된 요구사항을 각각 평가하여 규칙별 평균으로 집계했습니다.")
+            st.dataframe(pd.DataFrame([
+                {
+                    "요구사항": item['number'],
+                    "패턴": item.get('pattern') or "-",
+                    "총점": f"{item['scores']['total']} / {item['scores']['max']}",
+                    "만족률": f"{item['scores']['percentage']}%"
+                }
+                for item in impr['items']
+            ]), use_container_width=True, hide_index=True)
+        
         # 카테고리별 점수
         if 'categories' in impr and impr['categories']:
             st.markdown("**카테고리별 점수**")
@@ -0,0 +1,191 @@
+"""
+요구사항 개선 도구 - 벤치마크
+로컬 스텁 서버를 대상으로 개선→평가 파이프라인의 처리량/지연 시간을 측정 (API 토큰 사용 없음)
+
+사용 예:
+    python benchmark.py --requirements 50 --workers 8 --latency 0.3
+    python benchmark.py --modes batch --malformed-rate 0.1 --json
+    python benchmark.py --modes concurrent combined
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+import config
+
+SAMPLE_REQUIREMENTS = [
+    "CANFD 통신 표준 사양을 만족해야 한다.",
+    "시스템은 빠르게 부팅되어야 한다.",
+    "IRCU는 차량 속도가 10km/h 이상이면 경고음을 출력한다.",
+    "Supplier는 진단 기능을 설계하고 평가해야 한다.",
+    "모든 입력 신호는 적절히 필터링되어야 한다.",
+    "The system shall log all faults within 100 ms.",
+    "전원 인가 후 IRCU 시스템은 초기화를 완료해야 한다.",
+    "Supplier는 HKMC와 협의하여 SW 사양서를 제출해야 한다.",
+]
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+
+    parser = argparse.ArgumentParser(description="개선→평가 파이프라인 벤치마크 (로컬 스텁 서버)")
+    parser.add_argument("--modes", nargs="+", choices=["single", "concurrent", "combined", "batch", "batch-api"],
+                        default=["single", "concurrent", "batch"])
+    parser.add_argument("--requirements", type=int, default=20, help="측정할 요구사항 수")
+    parser.add_argument("--workers", type=int, default=config.BULK_MAX_WORKERS, help="concurrent/combined 모드 동시 처리 수")
+    parser.add_argument("--url", default=None, help="이미 실행 중인 스텁 서버 주소 (생략 시 내장 서버 실행)")
+    parser.add_argument("--latency", type=float, default=0.2, help="스텁 서버 첫 토큰 지연(초)")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="스텁 서버 출력 토큰당 지연(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429/529 오류 주입 확률")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="점수 응답 손상 확률")
+    parser.add_argument("--batch-latency", type=float, default=1.0, help="스텁 서버 Message Batches 완료 시간(초)")
+    parser.add_argument("--rpm", type=int, default=100000, help="스케줄러 분당 요청 수 제한")
+    parser.add_argument("--tpm", type=int, default=100000000, help="스케줄러 분당 토큰 수 제한")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    return parser.parse_args(argv)
+
+
+def percentile(values: List[float], p: float) -> float:
+
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def create_pipeline(base_url: str, args: argparse.Namespace, combined: bool = False):
+    """스텁 서버에 연결된 파이프라인 (결과 캐시 없음, combined: 개선+평가 단일 호출)"""
+    from modules.ai_client import AIClient
+    from modules.improver import RequirementImprover
+    from modules.evaluator import RequirementEvaluator
+    from modules.pipeline import RequirementPipeline
+    from modules.scheduler import RequestScheduler
+
+    scheduler = RequestScheduler(
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        max_concurrency=max(config.MAX_CONCURRENT_REQUESTS, args.workers * 3),
+        max_retries=config.MAX_RETRIES,
+        base_delay=config.RETRY_BASE_DELAY,
+        max_delay=config.RETRY_MAX_DELAY
+    )
+    ai_client = AIClient(api_key="stub", model=config.AI_MODEL, max_tokens=config.MAX_TOKENS,
+                         base_url=base_url, scheduler=scheduler)
+    improver = RequirementImprover(ai_client, ai_client.load_prompt(config.PROMPT_FILE))
+    evaluator = RequirementEvaluator(ai_client, ai_client.load_prompt(config.SCORING_PROMPT_FILE))
+    return RequirementPipeline(improver, evaluator, combined=combined)
+
+
+def run_mode(mode: str, pipeline, requirements: List[str], workers: int) -> Dict:
+    """모드별 실행 후 요구사항별 지연 시간과 실패 수 반환"""
+    latencies = []
+    failures = 0
+
+    def timed(work: Callable[[], object]) -> float:
+        start = time.perf_counter()
+        work()
+        return time.perf_counter() - start
+
+    def run_one(text: str):
+        return timed(lambda: pipeline.run(text, config.DEFAULT_SUBJECT, config.DEFAULT_SYSTEM, config.DEFAULT_RECEIVER))
+
+    start = time.perf_counter()
+    if mode == "batch-api":
+        from modules.batches import BatchPipeline, MessageBatchBackend
+        
+        ai_client = pipeline.evaluator.ai_client
+        batch_pipeline = BatchPipeline(pipeline.improver, pipeline.evaluator, MessageBatchBackend(ai_client, poll_interval=0.1))
+        texts = {f"REQ-{i + 1}": text for i, text in enumerate(requirements)}
+        results = {}
+        elapsed = timed(lambda: results.update(batch_pipeline.run(
+            texts, config.DEFAULT_SUBJECT, config.DEFAULT_SYSTEM, config.DEFAULT_RECEIVER
+        )))
+        latencies = [elapsed] * len(requirements)
+        failures = sum(1 for result in results.values() if "error" in result)
+    elif mode == "batch":
+        texts = {f"REQ-{i + 1}": text for i, text in enumerate(requirements)}
+        try:
+            elapsed = timed(lambda: pipeline.evaluator.evaluate_batch(texts))
+            latencies = [elapsed] * len(requirements)
+        except Exception:
+            failures = len(requirements)
+    else:
+        with ThreadPoolExecutor(max_workers=1 if mode == "single" else workers) as executor:
+            futures = [executor.submit(run_one, text) for text in requirements]
+            for future in futures:
+                try:
+                    latencies.append(future.result())
+                except Exception:
+                    failures += 1
+    wall = time.perf_counter() - start
+
+    return {"wall": wall, "latencies": latencies, "failures": failures}
+
+
+def main(argv: List[str] = None) -> int:
+
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    requirements = [
+        f"{SAMPLE_REQUIREMENTS[i % len(SAMPLE_REQUIREMENTS)]} (#{i + 1})"
+        for i in range(args.requirements)
+    ]
+
+    server = None
+    if args.url is None:
+        from modules.stub_server import StubServer
+        server = StubServer(
+            latency=args.latency,
+            token_latency=args.token_latency,
+            error_rate=args.error_rate,
+            malformed_rate=args.malformed_rate,
+            batch_latency=args.batch_latency
+        ).start()
+
+    reports = []
+    try:
+        for mode in args.modes:
+            pipeline = create_pipeline(args.url or server.url, args, combined=mode == "combined")
+            stats_before = dict(server.stats) if server else {}
+
+            result = run_mode(mode, pipeline, requirements, args.workers)
+            usage = pipeline.evaluator.ai_client.usage_summary()
+            count = len(requirements)
+
+            report = {
+                "mode": mode,
+                "requirements": count,
+                "requirements_per_sec": round(count / result["wall"], 2) if result["wall"] > 0 else 0,
+                "p50_latency": round(percentile(result["latencies"], 50), 3),
+                "p95_latency": round(percentile(result["latencies"], 95), 3),
+                "api_calls_per_requirement": round(usage["calls"] / count, 2),
+                "tokens_per_requirement": round(
+                    (usage["input_tokens"] + usage["output_tokens"] + usage["cache_read_tokens"] + usage["cache_write_tokens"]) / count
+                ),
+                "cached_input_ratio": round(
+                    usage["cache_read_tokens"] / max(1, usage["input_tokens"] + usage["cache_read_tokens"] + usage["cache_write_tokens"]), 3
+                ),
+                "failure_rate": round(result["failures"] / count, 3)
+            }
+            if server:
+                report["injected_errors"] = server.stats["errors"] - stats_before.get("errors", 0)
+                report["malformed_responses"] = server.stats["malformed"] - stats_before.get("malformed", 0)
+                report["parse_failure_rate"] = round(report["malformed_responses"] / max(1, usage["calls"]), 3)
+            reports.append(report)
+    finally:
+        if server:
+            server.stop()
+
+    if args.json:
+        print(json.dumps(reports, ensure_ascii=False, indent=2))
+    else:
+        for report in reports:
+            print(f"[{report['mode']}]")
+            for key, value in report.items():
+                if key != "mode":
+                    print(f"  {key}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,5 +12,17 @@ pyinstaller --name="RequirementImprover" ^
   --collect-all="streamlit" ^
   app.py
 
+echo Building RequirementImproverCLI.exe...
+
+pyinstaller --name="RequirementImproverCLI" ^
+  --onefile ^
+  --console ^
+  --add-data="prompts;prompts" ^
+  --add-data="config.py;." ^
+  --hidden-import="anthropic" ^
+  --exclude-module="streamlit" ^
+  --exclude-module="plotly" ^
+  cli.py
+
 echo Build complete!
 pause
\ No newline at end of file
@@ -0,0 +1,311 @@
+"""
+요구사항 개선 도구 - 명령줄 실행기
+Streamlit 없이 파일/표준입력의 요구사항을 개선·평가하여 JSONL로 출력
+
+사용 예:
+    python cli.py requirements.txt > results.jsonl
+    type requirements.txt | python cli.py --mode score --fail-under 70
+    python cli.py --batch-api requirements.txt > results.jsonl
+    python cli.py --async requirements.txt > results.jsonl
+    python cli.py --mode score --set-analysis requirements.txt > results.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List
+import config
+
+CONFIG_FILE = Path.home() / ".requirement_improver" / "config.json"
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+
+    parser = argparse.ArgumentParser(description="INCOSE 기반 요구사항 개선/평가 (JSONL 출력)")
+    parser.add_argument("files", nargs="*", help="요구사항 파일 (생략하거나 '-'이면 표준입력)")
+    parser.add_argument("--mode", choices=["improve", "score"], default="improve",
+                        help="improve: 개선 후 원본/개선본 평가, score: 원본 평가만 (기본값: improve)")
+    parser.add_argument("--whole", action="store_true", help="파일 전체를 하나의 요구사항으로 처리 (기본값: 한 줄에 하나)")
+    parser.add_argument("--subject", default=config.DEFAULT_SUBJECT, help="시스템 주체")
+    parser.add_argument("--system", default=config.DEFAULT_SYSTEM, help="대상 시스템")
+    parser.add_argument("--receiver", default=config.DEFAULT_RECEIVER, help="수신자/협의 대상")
+    parser.add_argument("--workers", type=int, default=config.BULK_MAX_WORKERS, help="동시에 처리할 요구사항 수")
+    parser.add_argument("--batch", action="store_true", help="score 모드에서 여러 요구사항을 한 요청으로 평가")
+    parser.add_argument("--batch-api", action="store_true",
+                        help="Message Batches API로 일괄 제출 (비용 절감, 완료까지 최대 24시간 대기)")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="improve 모드에서 이벤트 루프 하나로 최대 ASYNC_MAX_IN_FLIGHT건을 동시에 처리 (--workers 대신)")
+    parser.add_argument("--combined", action="store_true",
+                        help="improve 모드에서 원본 평가, 개선, 개선본 평가를 한 번의 요청으로 처리")
+    parser.add_argument("--set-analysis", action="store_true",
+                        help="입력 요구사항 전체의 중복/상충을 분석하여 집합 규칙(C11, R30) 점수에 반영")
+    parser.add_argument("--no-cache", action="store_true", help="결과 캐시 사용 안 함")
+    parser.add_argument("--fail-under", type=float, default=None,
+                        help="원본 만족률(%%)이 이 값보다 낮은 요구사항이 있으면 종료 코드 1")
+    parser.add_argument("-o", "--output", default=None, help="출력 파일 (기본값: 표준출력)")
+    parser.add_argument("--metrics", default=None, help="API 호출 계측 기록(JSONL) 파일")
+    return parser.parse_args(argv)
+
+
+def read_requirements(files: List[str], whole: bool) -> Iterator[Dict]:
+    """파일/표준입력에서 요구사항 (ID, 텍스트) 읽기"""
+    for name in files or ["-"]:
+        if name == "-":
+            source, content = "stdin", sys.stdin.read()
+        else:
+            source, content = name, Path(name).read_text(encoding="utf-8")
+
+        if whole:
+            if content.strip():
+                yield {"id": source, "text": content.strip()}
+            continue
+
+        for line_number, line in enumerate(content.splitlines(), start=1):
+            if line.strip():
+                yield {"id": f"{source}:{line_number}", "text": line.strip()}
+
+
+def load_api_key() -> str:
+    """환경 변수(.env 포함) 또는 앱에 저장된 API 키"""
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+
+    if os.environ.get("ANTHROPIC_API_KEY"):
+        return os.environ["ANTHROPIC_API_KEY"]
+    if CONFIG_FILE.exists():
+        with open(CONFIG_FILE, 'r') as f:
+            return json.load(f).get('api_key', '')
+    return ''
+
+
+def create_pipeline(api_key: str, use_cache: bool, combined: bool = config.COMBINED_MODE, use_async: bool = False):
+    """AI 클라이언트, 개선기, 평가기로 파이프라인 구성 (use_async이거나 ASYNC_CLIENT이면 AsyncAIClient 사용)"""
+    from modules.ai_client import AIClient
+    from modules.async_client import AsyncAIClient
+    from modules.improver import RequirementImprover
+    from modules.evaluator import RequirementEvaluator
+    from modules.pipeline import RequirementPipeline
+
+    client_class = AsyncAIClient if use_async or config.ASYNC_CLIENT else AIClient
+    ai_client = client_class(api_key=api_key, model=config.AI_MODEL, max_tokens=config.MAX_TOKENS)
+    improver = RequirementImprover(ai_client, ai_client.load_prompt(config.PROMPT_FILE))
+    evaluator = RequirementEvaluator(ai_client, ai_client.load_prompt(config.SCORING_PROMPT_FILE))
+
+    cache = None
+    if use_cache:
+        from modules.cache import ResultCache
+        cache = ResultCache(config.CACHE_FILE, config.CACHE_MAX_BYTES)
+
+    return RequirementPipeline(improver, evaluator, cache=cache, combined=combined)
+
+
+def compact_scores(scores: Dict) -> Dict:
+    """JSONL 출력용 점수 요약 (규칙별 이유 제외)"""
+    from modules.rules import ScoreRecord
+    
+    record = ScoreRecord.coerce(scores)
+    return {
+        "total": record.total,
+        "max": record.max,
+        "percentage": record.percentage,
+        "rules": dict(zip(record.table.rules, record.values.tolist()))
+    }
+
+
+def process(pipeline, requirement: Dict, args: argparse.Namespace) -> Dict:
+    """요구사항 1건 처리"""
+    record = {"id": requirement["id"], "original": requirement["text"]}
+    try:
+        if args.mode == "score":
+            from modules.metrics import call_context
+            with call_context(phase="score-original"):
+                record["original_scores"] = compact_scores(pipeline.evaluate(requirement["text"]))
+        else:
+            result = pipeline.run(
+                original_text=requirement["text"],
+                subject=args.subject,
+                system=args.system,
+                receiver=args.receiver
+            )
+            add_improve_result(record, result)
+    except Exception as e:
+        record["error"] = str(e)
+    return record
+
+
+def add_improve_result(record: Dict, result: Dict):
+    """improve 모드 결과를 출력 레코드에 추가"""
+    record["improved"] = result["improved_result"]["requirement"]
+    record["original_scores"] = compact_scores(result["original_scores"])
+    record["improved_scores"] = compact_scores(result["improved_scores"])
+    if result["improved_scores"].get("items"):
+        record["improved_items"] = [
+            {"number": item["number"], "text": item["text"], "pattern": item["pattern"], "scores": compact_scores(item["scores"])}
+            for item in result["improved_scores"]["items"]
+        ]
+
+
+def run_message_batches(pipeline, requirements: List[Dict], args: argparse.Namespace) -> Iterator[Dict]:
+    """Message Batches API로 일괄 제출하고 완료 후 입력 순서대로 출력"""
+    from modules.batches import BatchPipeline
+    
+    batch_pipeline = BatchPipeline(pipeline.improver, pipeline.evaluator)
+    texts = {requirement["id"]: requirement["text"] for requirement in requirements}
+    
+    def report(counts: Dict[str, int]):
+        print("배치 진행: " + ", ".join(f"{key} {value}" for key, value in counts.items()), file=sys.stderr)
+    
+    if args.mode == "score":
+        results = batch_pipeline.score(texts, report)
+    else:
+        results = batch_pipeline.run(texts, args.subject, args.system, args.receiver, report)
+    
+    for requirement in requirements:
+        record = {"id": requirement["id"], "original": requirement["text"]}
+        result = results[requirement["id"]]
+        if isinstance(result, Exception):
+            record["error"] = str(result)
+        elif args.mode == "score":
+            record["original_scores"] = compact_scores(result)
+        elif "error" in result:
+            record["error"] = result["error"]
+        else:
+            add_improve_result(record, result)
+        yield record
+
+
+def run_async(pipeline, requirements: List[Dict], args: argparse.Namespace) -> Iterator[Dict]:
+    """improve 모드 요구사항을 이벤트 루프 하나에서 동시에 처리하고 입력 순서대로 출력"""
+    import asyncio
+    
+    texts = {requirement["id"]: requirement["text"] for requirement in requirements}
+    results = asyncio.run(pipeline.run_many_async(texts, args.subject, args.system, args.receiver))
+    
+    for requirement in requirements:
+        record = {"id": requirement["id"], "original": requirement["text"]}
+        result = results[requirement["id"]]
+        if "error" in result:
+            record["error"] = result["error"]
+        else:
+            add_improve_result(record, result)
+        yield record
+
+
+def analyze_set(pipeline, requirements: List[Dict]) -> Dict:
+    """입력 요구사항 집합 분석 (유사한 요구사항 묶음만 LLM으로 판정)"""
+    from modules.set_analysis import SetAnalyzer
+    
+    ai_client = pipeline.evaluator.ai_client
+    analyzer = SetAnalyzer(ai_client, ai_client.load_prompt(config.SET_PROMPT_FILE))
+    analysis = analyzer.analyze(requirements)
+    print(
+        f"집합 분석: 후보 쌍 {len(analysis['pairs'])}개, LLM 판정 묶음 {len(analysis['groups'])}개, "
+        f"판정 {len(analysis['findings'])}건" + (f", 로컬 추정 {analysis['errors']}묶음" if analysis["errors"] else ""),
+        file=sys.stderr
+    )
+    for req_id, rows in analysis["duplicate_ids"].items():
+        print(f"ID 중복: {req_id} ({', '.join(map(str, rows))}번째 요구사항)", file=sys.stderr)
+    return analysis
+
+
+def add_set_scores(record: Dict, analysis: Dict, row: int):
+    """출력 레코드(입력의 row번째 요구사항)의 점수에 집합 규칙 점수를 반영하고 관련 판정 추가"""
+    set_scores = analysis["scores"][row]
+    for key in ("original_scores", "improved_scores"):
+        if key in record:
+            rules = {**record[key]["rules"], **{rule: value["score"] for rule, value in set_scores.items()}}
+            record[key] = compact_scores({"scores": {rule: {"score": score} for rule, score in rules.items()}})
+    record["set_scores"] = set_scores
+    record["set_findings"] = [
+        {key: value for key, value in finding.items() if key != "rows"}
+        for finding in analysis["findings"] if row in finding["rows"]
+    ]
+
+
+def run_batch(pipeline, requirements: List[Dict]) -> Iterator[Dict]:
+    """score 모드 배치 평가"""
+    texts = {requirement["id"]: requirement["text"] for requirement in requirements}
+    try:
+        results = pipeline.evaluator.evaluate_batch(texts)
+    except Exception as e:
+        for requirement in requirements:
+            yield {"id": requirement["id"], "original": requirement["text"], "error": str(e)}
+        return
+
+    for requirement in requirements:
+        yield {
+            "id": requirement["id"],
+            "original": requirement["text"],
+            "original_scores": compact_scores(results[requirement["id"]])
+        }
+
+
+def main(argv: List[str] = None) -> int:
+
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    requirements = list(read_requirements(args.files, args.whole))
+    if not requirements:
+        return 0
+
+    api_key = load_api_key()
+    if not api_key:
+        print("API 키가 없습니다. ANTHROPIC_API_KEY 환경 변수를 설정해주세요.", file=sys.stderr)
+        return 2
+
+    pipeline = create_pipeline(
+        api_key,
+        use_cache=not args.no_cache,
+        combined=args.combined or config.COMBINED_MODE,
+        use_async=args.use_async and args.mode == "improve"
+    )
+    if args.metrics:
+        from modules.metrics import JsonlExporter
+        pipeline.evaluator.ai_client.add_hook(JsonlExporter(args.metrics))
+    sys.stdout.reconfigure(encoding='utf-8')
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    exit_code = 0
+    
+    set_analysis = None
+    if args.set_analysis:
+        set_analysis = analyze_set(pipeline, requirements)
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            if args.batch_api:
+                from modules.metrics import call_context
+                with call_context(phase="message-batches"):
+                    records = list(run_message_batches(pipeline, requirements, args))
+            elif args.use_async and args.mode == "improve":
+                records = run_async(pipeline, requirements, args)
+            elif args.mode == "score" and args.batch:
+                from modules.metrics import call_context
+                with call_context(phase="score-batch"):
+                    records = list(run_batch(pipeline, requirements))
+            else:
+                records = executor.map(lambda requirement: process(pipeline, requirement, args), requirements)
+
+            for row, record in enumerate(records):
+                if set_analysis and "error" not in record:
+                    add_set_scores(record, set_analysis, row)
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+
+                if "error" in record:
+                    exit_code = 1
+                elif args.fail_under is not None and record["original_scores"]["percentage"] < args.fail_under:
+                    exit_code = 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        pipeline.evaluator.ai_client.close()
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
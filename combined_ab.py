@@ -0,0 +1,169 @@
+"""
+요구사항 개선 도구 - 개선+평가 단일 호출 일관성 점검
+같은 요구사항을 기존 3회 호출 경로(원본 평가, 개선, 개선본 평가)와 단일 호출 경로(combined)로 각각 처리하여
+API 호출 수/토큰/지연 시간과 점수 일관성(만족률 차이, 규칙별 점수 일치율)을 비교
+
+사용 예:
+    python combined_ab.py requirements.txt
+    python combined_ab.py --limit 20 --max-diff 5 requirements.txt
+    python combined_ab.py --url http://127.0.0.1:8765 requirements.txt   (로컬 스텁 서버, 호출 수/토큰만 확인)
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+import config
+from cli import load_api_key, read_requirements
+
+VARIANTS = ["three-call", "combined"]
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+
+    parser = argparse.ArgumentParser(description="3회 호출 / 개선+평가 단일 호출 일관성 비교")
+    parser.add_argument("files", nargs="*", help="요구사항 파일 (생략하거나 '-'이면 표준입력, 한 줄에 하나)")
+    parser.add_argument("--limit", type=int, default=None, help="비교할 최대 요구사항 수")
+    parser.add_argument("--workers", type=int, default=config.BULK_MAX_WORKERS, help="동시에 처리할 요구사항 수")
+    parser.add_argument("--url", default=None, help="API 엔드포인트 (로컬 스텁 서버 등)")
+    parser.add_argument("--max-diff", type=float, default=None,
+                        help="원본/개선 만족률의 평균 절대 차이(%%p)가 이 값을 넘으면 종료 코드 1")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    return parser.parse_args(argv)
+
+
+def create_pipelines(api_key: str, base_url: str = None):
+    """같은 AI 클라이언트를 공유하는 3회 호출/단일 호출 파이프라인 (결과 캐시 없음)"""
+    from modules.ai_client import AIClient
+    from modules.improver import RequirementImprover
+    from modules.evaluator import RequirementEvaluator
+    from modules.pipeline import RequirementPipeline
+
+    ai_client = AIClient(api_key=api_key, model=config.AI_MODEL, max_tokens=config.MAX_TOKENS, base_url=base_url)
+    improver = RequirementImprover(ai_client, ai_client.load_prompt(config.PROMPT_FILE))
+    evaluator = RequirementEvaluator(ai_client, ai_client.load_prompt(config.SCORING_PROMPT_FILE))
+    pipelines = {
+        "three-call": RequirementPipeline(improver, evaluator, combined=False),
+        "combined": RequirementPipeline(improver, evaluator, combined=True)
+    }
+    return ai_client, pipelines
+
+
+def compare(pipelines: Dict, requirement: Dict) -> Dict:
+    """요구사항 1건을 두 경로로 처리"""
+    from modules.metrics import call_context
+
+    record = {"id": requirement["id"], "original": requirement["text"]}
+    for variant in VARIANTS:
+        try:
+            with call_context(variant=variant):
+                start = time.perf_counter()
+                result = pipelines[variant].run(
+                    requirement["text"], config.DEFAULT_SUBJECT, config.DEFAULT_SYSTEM, config.DEFAULT_RECEIVER
+                )
+                latency = time.perf_counter() - start
+        except Exception as e:
+            record[variant] = {"error": str(e)}
+            continue
+
+        record[variant] = {
+            "improved": result["improved_result"]["requirement"],
+            "latency": round(latency, 3),
+            "original_percentage": result["original_scores"]["percentage"],
+            "improved_percentage": result["improved_scores"]["percentage"],
+            "original_rules": {rule: value["score"] for rule, value in result["original_scores"]["scores"].items()},
+            "improved_rules": {rule: value["score"] for rule, value in result["improved_scores"]["scores"].items()}
+        }
+    return record
+
+
+def agreement(compared: List[Dict], key: str) -> Dict:
+    """두 경로의 규칙별 점수 일치율 (완전 일치, 1점 이내)과 차이가 자주 나는 규칙"""
+    exact = near = total = 0
+    differing: Dict[str, int] = {}
+    for record in compared:
+        baseline = record["three-call"][key]
+        for rule, score in record["combined"][key].items():
+            if rule not in baseline:
+                continue
+            total += 1
+            exact += score == baseline[rule]
+            near += abs(score - baseline[rule]) <= 1
+            if abs(score - baseline[rule]) > 1:
+                differing[rule] = differing.get(rule, 0) + 1
+    return {
+        "exact": round(exact / max(1, total), 3),
+        "within_1": round(near / max(1, total), 3),
+        "most_differing_rules": sorted(differing.items(), key=lambda item: -item[1])[:10]
+    }
+
+
+def summarize_variants(ai_client, records: List[Dict]) -> Dict:
+    """경로별 호출 수/토큰/지연 시간 요약과 점수 일관성"""
+    compared = [record for record in records if all("error" not in record[variant] for variant in VARIANTS)]
+    summary = {"requirements": len(records), "compared": len(compared)}
+
+    for variant in VARIANTS:
+        usage = ai_client.usage_summary(variant=variant)
+        count = max(1, len(records))
+        results = [record[variant] for record in compared]
+        summary[variant] = {
+            "api_calls_per_requirement": round(usage["calls"] / count, 2),
+            "input_tokens_per_requirement": round(
+                (usage["input_tokens"] + usage["cache_read_tokens"] + usage["cache_write_tokens"]) / count
+            ),
+            "output_tokens_per_requirement": round(usage["output_tokens"] / count),
+            "cost_per_requirement": round(usage["cost"] / count, 5),
+            "avg_latency": round(sum(result["latency"] for result in results) / max(1, len(results)), 3),
+            "avg_original_percentage": round(sum(result["original_percentage"] for result in results) / max(1, len(results)), 1),
+            "avg_improved_percentage": round(sum(result["improved_percentage"] for result in results) / max(1, len(results)), 1),
+            "errors": sum(1 for record in records if "error" in record[variant])
+        }
+
+    original_diffs = [abs(record["combined"]["original_percentage"] - record["three-call"]["original_percentage"]) for record in compared]
+    improved_diffs = [abs(record["combined"]["improved_percentage"] - record["three-call"]["improved_percentage"]) for record in compared]
+    summary["consistency"] = {
+        "mean_abs_original_diff": round(sum(original_diffs) / max(1, len(original_diffs)), 2),
+        "mean_abs_improved_diff": round(sum(improved_diffs) / max(1, len(improved_diffs)), 2),
+        "original_rules": agreement(compared, "original_rules"),
+        "improved_rules": agreement(compared, "improved_rules")
+    }
+    return summary
+
+
+def main(argv: List[str] = None) -> int:
+
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    requirements = list(read_requirements(args.files, whole=False))[:args.limit]
+    if not requirements:
+        return 0
+
+    api_key = load_api_key() if args.url is None else "stub"
+    if not api_key:
+        print("API 키가 없습니다. ANTHROPIC_API_KEY 환경 변수를 설정해주세요.", file=sys.stderr)
+        return 2
+
+    ai_client, pipelines = create_pipelines(api_key, args.url)
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        records = list(executor.map(lambda requirement: compare(pipelines, requirement), requirements))
+    summary = summarize_variants(ai_client, records)
+
+    sys.stdout.reconfigure(encoding='utf-8')
+    if args.json:
+        print(json.dumps({"summary": summary, "records": records}, ensure_ascii=False, indent=2))
+    else:
+        print(f"비교한 요구사항: {summary['compared']} / {summary['requirements']}")
+        for section in VARIANTS + ["consistency"]:
+            print(f"[{section}]")
+            for key, value in summary[section].items():
+                print(f"  {key}: {value}")
+
+    consistency = summary["consistency"]
+    if args.max_diff is not None and max(consistency["mean_abs_original_diff"], consistency["mean_abs_improved_diff"]) > args.max_diff:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,18 +11,118 @@ BASE_DIR = Path(__file__).parent
 # 프롬프트 파일 경로
 PROMPT_FILE = BASE_DIR / "prompts" / "Quality.md"
 SCORING_PROMPT_FILE = BASE_DIR / "prompts" / "scoring_criteria.md"
+SET_PROMPT_FILE = BASE_DIR / "prompts" / "set_criteria.md"
 
 # AI 모델 설정
 AI_MODEL = "claude-sonnet-4-5-20250929"
 MAX_TOKENS = 8000
 
+# 단계별 모델 설정 (설정이 없거나 None인 단계는 AI_MODEL/MAX_TOKENS 사용)
+# 기본값은 모든 단계에 AI_MODEL 사용. 채점을 빠르고 저렴한 모델로 나누려면 score를 바꾸고 escalate를 켤 것
+# 예: "score": {"model": "claude-haiku-4-5-20251001", "max_tokens": MAX_TOKENS},
+#     "escalate": {"model": AI_MODEL, "max_tokens": MAX_TOKENS}
+# escalate: 채점 결과가 누락되거나 확신도가 낮을 때 다시 평가할 모델 (None이거나 채점 모델과 같으면 사용 안 함)
+PHASE_MODELS = {
+    "improve": {"model": AI_MODEL, "max_tokens": MAX_TOKENS},
+    "score": {"model": AI_MODEL, "max_tokens": MAX_TOKENS},
+    "escalate": None,
+    "combined": {"model": AI_MODEL, "max_tokens": 16000},   # 개선 응답과 원본/개선본 규칙별 점수를 함께 받으므로 더 크게
+}
+
+# 개선+평가 단일 호출 설정 (원본 평가, 개선, 개선본 평가를 한 번의 요청으로 받아 왕복 3회를 1회로)
+COMBINED_MODE = False
+
+# API 요청 스케줄러 설정
+API_BASE_URL = None                    # 로컬 스텁 서버 등 다른 엔드포인트 사용 시 (예: "http://127.0.0.1:8765")
+RATE_LIMIT_REQUESTS_PER_MINUTE = 50    # 분당 요청 수
+RATE_LIMIT_TOKENS_PER_MINUTE = 80000   # 분당 토큰 수 (캐시되지 않은 입력 + 출력)
+MAX_CONCURRENT_REQUESTS = 8            # 동시에 진행할 수 있는 요청 수
+MAX_RETRIES = 5                        # 429/529 등 재시도 가능한 오류의 최대 재시도 횟수
+RETRY_BASE_DELAY = 1.0                 # 지수 백오프 기본 대기 시간(초)
+RETRY_MAX_DELAY = 60.0                 # 백오프 최대 대기 시간(초)
+
+# 비동기 클라이언트 설정 (이벤트 루프 하나에서 요청을 처리하여 스레드 없이 많은 요구사항을 동시에 처리)
+ASYNC_CLIENT = False                                     # True면 앱/CLI에서 AsyncAIClient 사용 (동기 메서드는 같은 이벤트 루프에 요청을 넘겨 실행, CLI --async는 항상 사용)
+ASYNC_MAX_CONCURRENT_REQUESTS = MAX_CONCURRENT_REQUESTS  # 비동기 클라이언트 전체(동기 파사드, 스트리밍 포함)의 동시 API 요청 수
+ASYNC_MAX_IN_FLIGHT = 200                                # 비동기 일괄 처리에서 동시에 진행할 요구사항 수
+
+# Message Batches API 설정 (비대화형 일괄 처리, 완료까지 최대 24시간)
+MESSAGE_BATCH_POLL_INTERVAL = 30.0      # 처리 상태 확인 주기(초)
+MESSAGE_BATCH_TIMEOUT = 24 * 60 * 60    # 이 시간이 지나면 배치 취소(초)
+MESSAGE_BATCH_MAX_REQUESTS = 10000      # 배치 1개당 최대 요청 수
+MESSAGE_BATCH_COST_FACTOR = 0.5         # 일반 호출 대비 비용 배율 (예상 비용 계산용)
+
+# 호출 계측 설정
+METRICS_HISTORY_LIMIT = 10000       # 메모리에 보관할 최근 호출 기록 수
+METRICS_JSONL_FILE = Path.home() / ".requirement_improver" / "metrics.jsonl"   # None이면 기록 안 함
+METRICS_PROMETHEUS_FILE = None      # node_exporter textfile 경로 (예: "/var/lib/node_exporter/requirement_improver.prom")
+
+# 모델별 가격 (USD / 1M 토큰, 예상 비용 계산용)
+MODEL_PRICING = {
+    "claude-sonnet-4-5-20250929": {"input": 3.0, "output": 15.0, "cache_read": 0.30, "cache_write": 3.75},
+    "claude-haiku-4-5-20251001": {"input": 1.0, "output": 5.0, "cache_read": 0.10, "cache_write": 1.25},
+    "default": {"input": 3.0, "output": 15.0, "cache_read": 0.30, "cache_write": 3.75}
+}
+
+# 점수 평가 설정
+SCORING_REPAIR_ATTEMPTS = 2  # 누락된 규칙만 다시 요청하는 최대 횟수
+SCORING_MIN_CONFIDENCE = 0.6  # 채점 모델의 확신도가 이 값 미만이면 escalate 모델로 다시 평가
+
+# 로컬 사전 점검 규칙 (어휘 패턴으로 채점하고 LLM에는 나머지 규칙만 요청, 빈 목록이면 사용 안 함)
+PRESCREEN_RULES = ["P2", "R7", "R32", "R33", "R34", "R35"]
+
+# 증분 평가 설정 (개선 전후 차이가 작으면 영향받는 규칙만 다시 평가)
+INCREMENTAL_MIN_SIMILARITY = 0.8    # 토큰 유사도가 이 값 미만이면 전체 평가
+INCREMENTAL_MAX_RULE_RATIO = 0.5    # 다시 평가할 규칙이 전체의 이 비율을 넘으면 전체 평가
+
+# 집합 분석 설정 (문서 전체의 중복/상충 후보를 유사도 색인으로 찾고 후보 묶음만 LLM으로 판정)
+SET_RULES = ["C11", "R30"]          # 집합 분석 결과로 대체하는 규칙 (일관성, 고유 표현)
+# 유사한 요구사항 쌍으로 판정할 수 있는 규칙만 대체함. R29(분류)는 요구사항 하나의 표기로 판정하고,
+# C10/C12~C15(완전성, 실현 가능성, 이해 가능성, 확인 가능성, 정확성)는 상위 요구/일정/추적 매트릭스 등
+# 문서 밖 정보가 필요해 후보 쌍 판정으로 대체할 수 없으므로 요구사항별 LLM 평가 점수를 그대로 사용
+SET_SHINGLE_SIZE = 3                # 문자 n-gram 길이
+SET_MINHASH_PERMUTATIONS = 64       # MinHash 서명 길이
+SET_LSH_BANDS = 32                  # LSH 밴드 수 (밴드당 행 수 = 서명 길이 / 밴드 수)
+SET_COMMON_SHINGLE_RATIO = 0.05     # 요구사항의 이 비율보다 많이 나오는 n-gram은 LSH 서명에서 제외 (상투 표현)
+SET_COMMON_SHINGLE_MIN_COUNT = 10   # 단, 이 개수 이하로 나오는 n-gram은 항상 사용
+SET_RELATED_THRESHOLD = 0.4         # 이 Jaccard 유사도 이상이면 후보 쌍
+SET_DUPLICATE_THRESHOLD = 0.8       # 이 Jaccard 유사도 이상이면 로컬 추정으로도 중복
+SET_MAX_GROUP_SIZE = 10             # LLM 판정 요청 1회당 최대 요구사항 수
+
+# 배치 평가 설정
+BATCH_TOKEN_BUDGET = 7000           # 배치 1회 요청의 예상 토큰 상한 (요구사항 입력 + 점수 출력)
+BATCH_OUTPUT_TOKENS_PER_ITEM = 350  # 요구사항 1개당 예상 출력 토큰 (64개 규칙 점수)
+BATCH_MAX_ITEMS = 20                # 배치 1회당 최대 요구사항 수
+CHARS_PER_TOKEN = 2                 # 토큰 수 추정용 (한국어 기준 대략값)
+
+# 일괄 처리 설정
+BULK_MAX_WORKERS = 4    # 동시에 처리할 요구사항 수
+BULK_TEXT_COLUMNS = ["요구사항", "요구사항 텍스트", "Requirement", "requirement", "text"]
+BULK_ID_COLUMNS = ["ID", "id", "Id", "번호", "요구사항 ID"]
+
+# 실행 서비스 설정 (여러 사용자 세션의 개선 요청을 프로세스 공용 작업자에서 사용자별로 공평하게 처리)
+EXECUTION_MAX_WORKERS = 4        # 프로세스 전체에서 동시에 처리할 요청 수
+EXECUTION_MAX_PER_USER = 2       # 사용자(API 키) 1명이 동시에 점유할 수 있는 작업자 수
+EXECUTION_POLL_INTERVAL = 1.0    # 화면의 진행 상황 갱신 주기(초)
+EXECUTION_RESULT_TTL = 600       # 끝난 요청의 결과 보관 시간(초)
+
+# 작업 큐 설정 (일괄 처리 진행 상태를 저장하여 재시작 후 이어서 처리, 요구사항은 실행 서비스에서 처리)
+JOB_DB_FILE = Path.home() / ".requirement_improver" / "jobs.db"
+JOB_OUTPUT_DIR = Path.home() / ".requirement_improver" / "outputs"   # 결과 파일 저장 폴더 (소유자별 하위 폴더)
+JOB_MAX_IN_FLIGHT = EXECUTION_MAX_PER_USER   # 소유자별로 실행 서비스에 넘겨 둘 최대 요구사항 수
+JOB_POLL_INTERVAL = 2.0                      # 배분 대기 / 화면 진행률 갱신 주기(초)
+JOB_RECORDS_PAGE_SIZE = 200                  # 결과 파일 기록 시 저장소에서 한 번에 읽는 요구사항 수
+
+# 결과 캐시 설정
+CACHE_FILE = Path.home() / ".requirement_improver" / "results.db"
+CACHE_MAX_BYTES = 50 * 1024 * 1024  # 50MB
+
 # 기본값 설정
 DEFAULT_SUBJECT = "Supplier"
 DEFAULT_SYSTEM = "IRCU 시스템"
 DEFAULT_RECEIVER = "HKMC"
 
 # 점수 관련 설정
-MAX_SCORE = 320  # 64개 규칙 × 5점
 RULES_COUNT = {
     "P1-P7": 7,      # 패턴 규칙
     "C1-C9": 9,      # 개별 특성
@@ -43,6 +143,16 @@ RULES_COUNT = {
     "R41-R42": 2     # 모듈성
 }
 
+# 점수 표시용 카테고리 (RULES_COUNT의 규칙 범위로 구성)
+SCORE_CATEGORIES = {
+    "패턴 규칙 (P1-P7)": ["P1-P7"],
+    "개별 특성 (C1-C9)": ["C1-C9"],
+    "집합 특성 (C10-C15)": ["C10-C15"],
+    "정확성 (R1-R9)": ["R1-R9"],
+    "기타 규칙": ["R10-R11", "R12-R17", "R18-R23", "R24-R25", "R26", "R27-R28", "R29-R30",
+              "R31", "R32", "R33", "R34-R35", "R37-R40", "R41-R42"]
+}
+
 # 프록시 필요한 경우 
 USE_PROXY = False
 PROXY_SETTINGS = {
@@ -0,0 +1,30 @@
+"""
+요구사항 개선 모듈
+
+각 클래스는 처음 사용할 때 import (CLI 등에서 불필요한 의존성 로드를 피하기 위함)
+"""
+import importlib
+
+_EXPORTS = {
+    "AIClient": ".ai_client",
+    "AsyncAIClient": ".async_client",
+    "RequirementImprover": ".improver",
+    "RequirementEvaluator": ".evaluator",
+    "RequirementPipeline": ".pipeline",
+    "BulkProcessor": ".bulk",
+    "ResultCache": ".cache",
+    "JobStore": ".jobs",
+    "JobRunner": ".jobs",
+    "BatchPipeline": ".batches",
+    "MessageBatchBackend": ".batches",
+    "SetAnalyzer": ".set_analysis",
+    "ExecutionService": ".execution",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,47 +1,310 @@
 """
 AI API 클라이언트
 """
-import anthropic
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
 import json
+import config
+from .scheduler import RequestScheduler
+from .metrics import call_context, current_tags, estimate_cost, summarize
+from .rules import RULE_TABLE
+
+
+# 집합 판정 유형 (중복: R30, 상충/용어 불일치: C11)
+SET_FINDING_TYPES = ["duplicate", "conflict", "inconsistent_terms"]
+
+RULE_SCORE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "score": {"type": "integer", "minimum": 0, "maximum": 5},
+        "reason": {"type": "string"}
+    },
+    "required": ["score", "reason"]
+}
+
+# 규칙별 점수 기록용 도구 정의 (JSON 스키마)
+# 도구 정의는 캐시 prefix에서 시스템 프롬프트보다 앞에 오므로, 모든 채점 요청(전체/보완/증분 재평가/상위 모델)에
+# 전체 규칙을 담은 같은 정의를 보내 채점 기준 캐시를 공유하고, 평가할 규칙은 사용자 메시지로 지정
+SCORING_TOOL = {
+    "name": "record_scores",
+    "description": "요청받은 규칙별 점수(0-5, 0은 N/A)와 이유를 기록 (요청받은 규칙은 빠짐없이, 나머지 규칙은 생략)",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            **{rule: RULE_SCORE_SCHEMA for rule in RULE_TABLE.rules},
+            "confidence": {
+                "type": "number",
+                "minimum": 0,
+                "maximum": 1,
+                "description": "채점 결과 전체에 대한 확신도 (0-1)"
+            }
+        },
+        "required": ["confidence"]   # 확신도가 낮으면 상위 모델로 재평가 (escalate 사용 시)
+    }
+}
 
 
 class AIClient:
     
     
-    def __init__(self, api_key: str, model: str, max_tokens: int):
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        max_tokens: int,
+        base_url: Optional[str] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        phase_models: Optional[Dict[str, Optional[Dict[str, Any]]]] = None
+    ):
         """
         Args:
             api_key: Anthropic API 키
-            model: 사용할 모델 이름
-            max_tokens: 최대 토큰 수
+            model: 기본 모델 이름 (단계별 설정이 없을 때 사용)
+            max_tokens: 기본 최대 토큰 수
+            base_url: API 엔드포인트 (로컬 스텁 서버 등, 기본값은 config.API_BASE_URL)
+            scheduler: 요청 스케줄러 (여러 클라이언트가 한도를 공유할 때 전달)
+            phase_models: 단계(improve/score/escalate)별 모델과 최대 토큰 수 (기본값은 config.PHASE_MODELS)
         """
-        self.client = anthropic.Anthropic(api_key=api_key)
+        self.api_key = api_key
+        self.base_url = base_url or config.API_BASE_URL
+        self._client = None
+        self._client_lock = threading.Lock()
         self.model = model
         self.max_tokens = max_tokens
+        self.phase_models = config.PHASE_MODELS if phase_models is None else phase_models
+        self.scheduler = scheduler or RequestScheduler(
+            requests_per_minute=config.RATE_LIMIT_REQUESTS_PER_MINUTE,
+            tokens_per_minute=config.RATE_LIMIT_TOKENS_PER_MINUTE,
+            max_concurrency=config.MAX_CONCURRENT_REQUESTS,
+            max_retries=config.MAX_RETRIES,
+            base_delay=config.RETRY_BASE_DELAY,
+            max_delay=config.RETRY_MAX_DELAY
+        )
         
+        # 호출별 기록 (단계, 지연 시간, 토큰 사용량, 예상 비용) 및 기록 시 호출할 훅
+        self.usage_log: List[Dict[str, Any]] = []
+        self.hooks: List[Callable[[Dict[str, Any]], None]] = []
+        self._usage_lock = threading.Lock()
+        
+    @property
+    def client(self):
+        """Anthropic SDK 클라이언트 (첫 API 호출 시 생성, import 시간을 줄이기 위함)"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import anthropic
+                    
+                    # 재시도는 스케줄러가 담당하므로 SDK 자체 재시도는 끔
+                    self._client = anthropic.Anthropic(
+                        api_key=self.api_key,
+                        base_url=self.base_url,
+                        max_retries=0
+                    )
+        return self._client
+    
+    def close(self):
+        """SDK 클라이언트 연결 종료 (이후 요청하면 다시 생성)"""
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+    
     def load_prompt(self, file_path: Path) -> str:
         
         with open(file_path, 'r', encoding='utf-8') as f:
             return f.read()
     
-    def call_api(self, system_prompt: str, user_message: str) -> str:
+    def _build_system(self, system_prompt: str) -> List[Dict[str, Any]]:
+        """정적 시스템 프롬프트를 캐시 가능한 prefix 블록으로 구성 (비어 있으면 빈 목록, 시스템 프롬프트 없이 요청)"""
+        if not system_prompt:
+            return []
+        return [{
+            "type": "text",
+            "text": system_prompt,
+            "cache_control": {"type": "ephemeral"}
+        }]
+    
+    def add_hook(self, hook: Callable[[Dict[str, Any]], None]):
+        """API 호출이 끝날 때마다 호출 기록을 전달받을 함수 등록 (JsonlExporter 등)"""
+        self.hooks.append(hook)
+    
+    def _record_call(
+        self,
+        usage,
+        started: float,
+        ttft: Optional[float],
+        retries: int,
+        error: Optional[str] = None,
+        cost_factor: float = 1.0,
+        model: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """호출 1건의 지연 시간/토큰 사용량을 기록하고 훅에 전달 (cost_factor: 배치 할인 등 비용 배율)"""
+        record = {
+            "timestamp": time.time(),
+            "model": model or self.model,
+            **current_tags(),
+            "latency": time.perf_counter() - started,
+            "ttft": ttft,
+            "retries": retries,
+            "ok": error is None,
+            "error": error,
+            "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+            "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+            "cache_read_tokens": getattr(usage, "cache_read_input_tokens", 0) or 0,
+            "cache_write_tokens": getattr(usage, "cache_creation_input_tokens", 0) or 0
+        }
+        record["cost"] = estimate_cost(record["model"], record) * cost_factor
+        
+        with self._usage_lock:
+            self.usage_log.append(record)
+            if len(self.usage_log) > config.METRICS_HISTORY_LIMIT:
+                del self.usage_log[:len(self.usage_log) - config.METRICS_HISTORY_LIMIT]
+        
+        for hook in self.hooks:
+            try:
+                hook(record)
+            except Exception:
+                pass  # 계측 실패가 API 호출 결과에 영향을 주지 않도록 함
+        return record
+    
+    def usage_summary(self, **tags) -> Dict[str, Any]:
+        """태그(phase, session 등)가 일치하는 호출들의 합계 (태그 생략 시 전체)"""
+        with self._usage_lock:
+            records = [
+                record for record in self.usage_log
+                if all(record.get(key) == value for key, value in tags.items())
+            ]
+        return summarize(records)
+    
+    def phase_model(self, phase: Optional[str]) -> Tuple[str, int]:
+        """단계별 (모델, 최대 토큰 수), 설정이 없으면 기본값"""
+        setting = self.phase_models.get(phase) if phase else None
+        if not setting:
+            return self.model, self.max_tokens
+        return setting.get("model") or self.model, setting.get("max_tokens") or self.max_tokens
+    
+    def call_api(self, system_prompt: str, user_message: str, phase: Optional[str] = None) -> str:
 
         try:
-            message = self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                system=system_prompt,
-                messages=[{
-                    "role": "user",
-                    "content": user_message
-                }]
-            )
+            message = self._create_message(system_prompt, user_message, phase)
             return message.content[0].text
         except Exception as e:
             raise Exception(f"AI API 호출 실패: {str(e)}")
     
+    def stream_api(self, system_prompt: str, user_message: str, phase: Optional[str] = None) -> Iterator[str]:
+        """응답 텍스트를 생성되는 대로 조각 단위로 반환 (첫 조각 수신 전의 오류만 재시도)"""
+        params = self.message_params(system_prompt, user_message, phase)
+        estimated = self._estimate_tokens(user_message)
+        attempt = 0
+        request_started = time.perf_counter()
+        
+        while True:
+            started = False
+            try:
+                with self.scheduler.slot(estimated):
+                    with self.client.messages.stream(**params) as stream:
+                        ttft = None
+                        for text in stream.text_stream:
+                            if not started:
+                                started = True
+                                ttft = time.perf_counter() - request_started
+                            yield text
+                        self._settle_usage(
+                            estimated, stream.get_final_message().usage, request_started, ttft, attempt, params["model"]
+                        )
+                return
+            except Exception as e:
+                delay = None if started else self.scheduler.retry_delay(e, attempt)
+                if delay is None:
+                    self._record_call(None, request_started, None, attempt, error=str(e), model=params["model"])
+                    raise Exception(f"AI API 호출 실패: {str(e)}")
+            time.sleep(delay)
+            attempt += 1
+    
+    def call_tool(
+        self,
+        system_prompt: str,
+        user_message: str,
+        tool: Dict[str, Any],
+        phase: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """지정한 도구를 반드시 사용하도록 호출하고 도구 입력(JSON)을 반환 (도구 호출이 없으면 None)"""
+        try:
+            message = self._create_message(
+                system_prompt,
+                user_message,
+                phase,
+                tools=[tool],
+                tool_choice={"type": "tool", "name": tool["name"]}
+            )
+        except Exception as e:
+            raise Exception(f"AI API 호출 실패: {str(e)}")
+        
+        return next((block.input for block in message.content if block.type == "tool_use"), None)
+    
+    def _create_message(self, system_prompt: str, user_message: str, phase: Optional[str] = None, **kwargs):
+        """스케줄러를 거쳐 Messages API 호출 (한도 대기 및 재시도 포함)"""
+        params = self.message_params(system_prompt, user_message, phase, **kwargs)
+        estimated = self._estimate_tokens(user_message)
+        started = time.perf_counter()
+        attempts = [0]
+        
+        def request():
+            attempts[0] += 1
+            return self.client.messages.create(**params)
+        
+        try:
+            message = self.scheduler.execute(request, estimated)
+        except Exception as e:
+            self._record_call(None, started, None, max(0, attempts[0] - 1), error=str(e), model=params["model"])
+            raise
+        
+        # 스트리밍이 아닌 호출은 응답 전체가 한 번에 도착하므로 첫 토큰 시간 = 전체 지연 시간
+        self._settle_usage(
+            estimated, message.usage, started, time.perf_counter() - started, attempts[0] - 1, params["model"]
+        )
+        return message
+    
+    def message_params(self, system_prompt: str, user_message: str, phase: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """Messages API 요청 파라미터 (일반 호출과 Message Batches 요청에서 공통 사용, phase별 모델 적용)"""
+        model, max_tokens = self.phase_model(phase)
+        params = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "messages": [{
+                "role": "user",
+                "content": user_message
+            }],
+            **kwargs
+        }
+        
+        # 시스템 프롬프트가 비어 있으면 system 파라미터 생략
+        system = self._build_system(system_prompt)
+        if system:
+            params["system"] = system
+        return params
+    
+    def _estimate_tokens(self, user_message: str) -> int:
+        """요청 전 토큰 예상치 (시스템 프롬프트는 캐시된다고 보고 user 메시지만 계산)"""
+        return len(user_message) // config.CHARS_PER_TOKEN + 1
+    
+    def _settle_usage(
+        self,
+        estimated: int,
+        usage,
+        started: float,
+        ttft: Optional[float],
+        retries: int,
+        model: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """호출 기록 후 실제 토큰 수로 스케줄러의 토큰 한도 보정"""
+        record = self._record_call(usage, started, ttft, retries, model=model)
+        actual = record["input_tokens"] + record["cache_write_tokens"] + record["output_tokens"]
+        self.scheduler.record_usage(estimated, actual)
+        return record
+    
     def improve_requirement(
         self,
         quality_prompt: str,
@@ -51,30 +314,363 @@ class AIClient:
         receiver: str
     ) -> str:
 
-        user_message = f
+        user_message = self._improve_message(original_text, subject, system, receiver)
         
-        return self.call_api(quality_prompt, user_message)
+        return self.call_api(quality_prompt, user_message, "improve")
     
-    def evaluate_requirement(
+    def improve_requirement_stream(
         self,
-        scoring_prompt: str,
-        text: str
+        quality_prompt: str,
+        original_text: str,
+        subject: str,
+        system: str,
+        receiver: str
+    ) -> Iterator[str]:
+        """improve_requirement의 스트리밍 버전"""
+        user_message = self._improve_message(original_text, subject, system, receiver)
+        
+        return self.stream_api(quality_prompt, user_message, "improve")
+    
+    def improve_params(
+        self,
+        quality_prompt: str,
+        original_text: str,
+        subject: str,
+        system: str,
+        receiver: str
     ) -> Dict[str, Any]:
+        """improve_requirement와 같은 요청 파라미터 (Message Batches 제출용)"""
+        return self.message_params(quality_prompt, self._improve_message(original_text, subject, system, receiver), "improve")
+    
+    def _improve_message(self, original_text: str, subject: str, system: str, receiver: str) -> str:
+        
+        # 요구사항별 내용은 캐시되지 않는 suffix(user 메시지)에만 포함
+        return f"""다음 요구사항을 개선해주세요.
+
+[프로젝트 컨텍스트]
+- 시스템 주체: {subject}
+- 대상 시스템: {system}
+- 수신자/협의 대상: {receiver}
 
-        user_message = f
+[원본 요구사항]
+{original_text}"""
+    
+    def improve_and_score(
+        self,
+        system_prompt: str,
+        original_text: str,
+        subject: str,
+        system: str,
+        receiver: str,
+        rules: List[str]
+    ) -> Dict[str, Any]:
+        """
+        원본 평가, 개선, 개선본 평가를 한 번의 요청으로 수행 (combined 모드)
+        
+        Args:
+            system_prompt: 개선 지침과 채점 기준을 함께 담은 시스템 프롬프트
+            rules: LLM이 평가할 규칙
         
-        full_prompt = scoring_prompt + "\n\n" + user_message
-        response = self.call_api(scoring_prompt, user_message)
+        Returns:
+            {"improved": 개선 응답 텍스트, "original_scores", "original_missing", "improved_scores", "improved_missing"}
+            (누락되거나 형식이 잘못된 규칙은 *_missing으로 돌려주어 호출자가 보완)
+        """
+        raw = self.call_tool(
+            system_prompt,
+            self._combined_message(original_text, subject, system, receiver),
+            self._combined_tool(rules),
+            "combined"
+        )
+        return self.combined_from_raw(raw, rules)
+    
+    def combined_from_raw(self, raw: Optional[Dict[str, Any]], rules: List[str]) -> Dict[str, Any]:
+        """record_improvement 도구 입력 검증 (개선 응답이 없으면 예외)"""
+        improved = raw.get("improved") if isinstance(raw, dict) else None
+        if not isinstance(improved, str) or not improved.strip():
+            raise Exception("개선 결과 누락")
         
+        original_scores, original_missing = self._validate_scores(raw.get("original_scores"), rules)
+        improved_scores, improved_missing = self._validate_scores(raw.get("improved_scores"), rules)
+        return {
+            "improved": improved,
+            "original_scores": original_scores,
+            "original_missing": original_missing,
+            "improved_scores": improved_scores,
+            "improved_missing": improved_missing
+        }
+    
+    def _combined_message(self, original_text: str, subject: str, system: str, receiver: str) -> str:
         
+        return f"""{self._improve_message(original_text, subject, system, receiver)}
+
+[결과 기록]
+record_improvement 도구로 아래 순서대로 기록해주세요.
+1. original_scores: 원본 요구사항을 채점 기준에 따라 규칙별로 평가 (이유는 한 문장)
+2. improved: 개선 지침의 출력 형식에 따른 개선 결과 전체 ("### 2. 개선된 요구사항" 섹션 포함)
+3. improved_scores: "### 2. 개선된 요구사항" 섹션의 요구사항을 같은 채점 기준으로 평가 (여러 개로 분리했으면 전체를 하나로 보고 평가)"""
+    
+    def _combined_tool(self, rules: List[str]) -> Dict[str, Any]:
+        """원본 점수, 개선 결과, 개선본 점수 기록용 도구 정의 (JSON 스키마)"""
+        rule_scores = {"type": "object", "properties": {rule: RULE_SCORE_SCHEMA for rule in rules}, "required": list(rules)}
+        return {
+            "name": "record_improvement",
+            "description": "원본 요구사항의 규칙별 점수, 개선 결과, 개선된 요구사항의 규칙별 점수(0-5, 0은 N/A)를 기록",
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "original_scores": {**rule_scores, "description": "원본 요구사항의 규칙별 점수"},
+                    "improved": {"type": "string", "description": "개선 지침 출력 형식의 개선 결과 전체 (마크다운)"},
+                    "improved_scores": {**rule_scores, "description": "개선된 요구사항의 규칙별 점수"}
+                },
+                "required": ["original_scores", "improved", "improved_scores"]
+            }
+        }
+    
+    def evaluate_requirement(
+        self,
+        scoring_prompt: str,
+        text: str,
+        rules: List[str]
+    ) -> Dict[str, Any]:
+        """
+        규칙별 점수를 JSON 스키마(도구 입력)로 받아 검증
+        
+        채점용(score) 모델로 평가하고, 누락되거나 형식이 잘못된 규칙만 골라 최대 SCORING_REPAIR_ATTEMPTS회 다시 요청.
+        그래도 누락되거나 확신도가 낮으면 상위(escalate) 모델로 다시 평가
+        """
+        raw = self.call_tool(scoring_prompt, self._scoring_message(text, rules), SCORING_TOOL, "score")
+        scores, missing = self._validate_scores(raw, rules)
+        return self.finish_scores(scoring_prompt, text, rules, scores, missing, self._confidence(raw))
+    
+    def finish_scores(
+        self,
+        scoring_prompt: str,
+        text: str,
+        rules: List[str],
+        scores: Dict[str, Any],
+        missing: List[str],
+        confidence: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """누락된 규칙 보완 후, 실패하거나 확신도가 SCORING_MIN_CONFIDENCE 미만이면 상위 모델로 다시 평가"""
         try:
+            scores = self.repair_scores(scoring_prompt, text, scores, missing, "score")
+        except Exception:
+            if not self.can_escalate():
+                raise
+            return self.escalate_scores(scoring_prompt, text, rules)
+        
+        if confidence is not None and confidence < config.SCORING_MIN_CONFIDENCE and self.can_escalate():
+            return self.escalate_scores(scoring_prompt, text, rules)
+        return scores
+    
+    def can_escalate(self) -> bool:
+        """상위 모델 재평가 사용 여부 (escalate 설정이 있고 채점 모델과 다를 때)"""
+        return bool(self.phase_models.get("escalate")) and self.phase_model("escalate")[0] != self.phase_model("score")[0]
+    
+    def escalate_scores(self, scoring_prompt: str, text: str, rules: List[str]) -> Dict[str, Any]:
+        """상위(escalate) 모델로 전체 규칙 다시 평가 (호출 기록에 escalated 태그)"""
+        with call_context(escalated=True):
+            raw = self.call_tool(scoring_prompt, self._scoring_message(text, rules), SCORING_TOOL, "escalate")
+            scores, missing = self._validate_scores(raw, rules)
+            return self.repair_scores(scoring_prompt, text, scores, missing, "escalate")
+    
+    def repair_scores(
+        self,
+        scoring_prompt: str,
+        text: str,
+        scores: Dict[str, Any],
+        missing: List[str],
+        phase: str = "score"
+    ) -> Dict[str, Any]:
+        """누락되거나 형식이 잘못된 규칙만 다시 요청하여 채움"""
+        for _ in range(config.SCORING_REPAIR_ATTEMPTS):
+            if not missing:
+                break
+            raw = self.call_tool(scoring_prompt, self._repair_message(text, missing), SCORING_TOOL, phase)
+            repaired, missing = self._validate_scores(raw, missing)
+            scores.update(repaired)
+        
+        if missing:
+            raise Exception(f"점수 평가 결과 누락: {', '.join(missing)}")
+        return scores
+    
+    def scoring_params(self, scoring_prompt: str, text: str, rules: List[str]) -> Dict[str, Any]:
+        """evaluate_requirement의 첫 요청과 같은 파라미터 (Message Batches 제출용)"""
+        return self.message_params(
+            scoring_prompt,
+            self._scoring_message(text, rules),
+            "score",
+            tools=[SCORING_TOOL],
+            tool_choice={"type": "tool", "name": SCORING_TOOL["name"]}
+        )
+    
+    def scores_from_message(self, message, rules: List[str]):
+        """응답 메시지의 record_scores 도구 입력을 검증 (규칙 점수, 누락/오류 규칙 목록, 확신도)"""
+        raw = next((block.input for block in message.content if block.type == "tool_use"), None)
+        scores, missing = self._validate_scores(raw, rules)
+        return scores, missing, self._confidence(raw)
+    
+    def _repair_message(self, text: str, missing: List[str]) -> str:
+        
+        return f"""다음 요구사항에 대해 아래 규칙만 채점 기준에 따라 평가하고 record_scores 도구로 결과를 기록해주세요.
+
+[평가할 규칙]
+{", ".join(missing)}
+
+[요구사항]
+{text}"""
+    
+    def _scoring_message(self, text: str, rules: List[str]) -> str:
+        
+        return f"""다음 요구사항을 아래 규칙별로 채점 기준에 따라 평가하고 record_scores 도구로 결과를 기록해주세요.
+
+[평가할 규칙]
+{", ".join(rules)}
+
+[요구사항]
+{text}"""
+    
+    def _confidence(self, raw: Optional[Dict[str, Any]]) -> Optional[float]:
+        """도구 입력의 확신도 (없거나 형식이 잘못되면 None)"""
+        value = raw.get("confidence") if isinstance(raw, dict) else None
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+        return None
+    
+    def _validate_scores(self, raw: Dict[str, Any], rules: List[str]):
+        """스키마에 맞는 규칙 점수와 누락/오류 규칙 목록 반환"""
+        scores = {}
+        missing = []
+        
+        for rule in rules:
+            value = raw.get(rule) if isinstance(raw, dict) else None
+            if isinstance(value, (int, str)) and not isinstance(value, bool):
+                value = {"score": value}
             
-            json_start = response.find('{')
-            json_end = response.rfind('}') + 1
-            if json_start >= 0 and json_end > json_start:
-                json_str = response[json_start:json_end]
-                return json.loads(json_str)
+            score = value.get("score") if isinstance(value, dict) else None
+            if isinstance(score, str) and score.strip().isdigit():
+                score = int(score.strip())
+            
+            if isinstance(score, int) and not isinstance(score, bool) and 0 <= score <= 5:
+                scores[rule] = {"score": score, "reason": str(value.get("reason", ""))}
             else:
-                raise ValueError("JSON 형식을 찾을 수 없습니다")
+                missing.append(rule)
+        
+        return scores, missing
+    
+    def evaluate_requirements_batch(
+        self,
+        scoring_prompt: str,
+        items: Dict[str, str],
+        rules: List[str]
+    ) -> Dict[str, Tuple[Dict[str, Any], List[str]]]:
+        """
+        여러 요구사항을 한 번의 요청으로 평가
+        
+        Returns:
+            ID → (스키마에 맞는 규칙 점수, 누락/오류 규칙 목록). 단건 평가와 같은 _validate_scores로 검증하므로
+            응답에 없는 ID는 모든 규칙이 누락된 것으로 반환하고, 보완(repair)/재평가는 호출자가 처리
+        """
+        requirements = "\n\n".join(
+            f'<requirement id="{req_id}">\n{text}\n</requirement>'
+            for req_id, text in items.items()
+        )
+        user_message = f"""다음 {len(items)}개의 요구사항을 각각 채점 기준에 따라 규칙별로 평가해주세요.
+평가할 규칙: {', '.join(rules)}
+응답은 요구사항 ID를 키로, 규칙별 점수(0-5 정수)를 값으로 하는 JSON으로만 작성하고 이유는 생략하세요.
+예: {{"REQ-1": {{"P1": 3, "P3": 5, ...}}, "REQ-2": {{"P1": 5, ...}}}}
+
+{requirements}"""
+        
+        response = self.call_api(scoring_prompt, user_message, "score")
+        
+        try:
+            parsed = self._extract_json(response)
         except Exception as e:
-            raise Exception(f"점수 평가 결과 파싱 실패: {str(e)}\n응답: {response}")
\ No newline at end of file
+            raise Exception(f"배치 평가 결과 파싱 실패: {str(e)}\n응답: {response}")
+        if not isinstance(parsed, dict):
+            raise Exception(f"배치 평가 결과 형식 오류\n응답: {response}")
+        
+        return {req_id: self._validate_scores(parsed.get(req_id), rules) for req_id in items}
+    
+    def judge_requirement_set(
+        self,
+        set_prompt: str,
+        requirements: Dict[str, str],
+        pairs: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        후보 묶음의 요구사항들 사이의 중복/상충/용어 불일치 판정
+        
+        Args:
+            set_prompt: 집합 판정 기준 프롬프트
+            requirements: 묶음의 요구사항 (ID → 텍스트)
+            pairs: 유사도 색인이 찾은 후보 쌍 ({"ids", "similarity", "signals"})
+        
+        Returns:
+            판정 목록 ({"ids", "type", "reason"}, 묶음 밖 ID나 알 수 없는 유형은 제외)
+        """
+        listed = "\n\n".join(
+            f'<requirement id="{req_id}">\n{text}\n</requirement>'
+            for req_id, text in requirements.items()
+        )
+        hints = "\n".join(
+            f"- {' / '.join(pair['ids'])}: 유사도 {pair['similarity']:.2f}"
+            + (f", {', '.join(pair['signals'])}" if pair["signals"] else "")
+            for pair in pairs
+        )
+        user_message = f"""다음 요구사항 묶음에서 중복/상충/용어 불일치를 판정하고 record_set_findings 도구로 기록해주세요.
+
+[후보 쌍]
+{hints}
+
+{listed}"""
+        
+        raw = self.call_tool(set_prompt, user_message, self._set_findings_tool(), "score")
+        findings = raw.get("findings") if isinstance(raw, dict) else None
+        if not isinstance(findings, list):
+            raise Exception("집합 판정 결과 누락")
+        
+        valid = []
+        for finding in findings:
+            if not isinstance(finding, dict) or finding.get("type") not in SET_FINDING_TYPES:
+                continue
+            ids = [str(req_id) for req_id in finding.get("ids") or [] if str(req_id) in requirements]
+            if len(set(ids)) >= 2:
+                valid.append({"ids": list(dict.fromkeys(ids)), "type": finding["type"], "reason": str(finding.get("reason", ""))})
+        return valid
+    
+    def _set_findings_tool(self) -> Dict[str, Any]:
+        """집합 판정 기록용 도구 정의 (JSON 스키마)"""
+        return {
+            "name": "record_set_findings",
+            "description": "요구사항 묶음의 중복/상충/용어 불일치 판정을 기록 (없으면 빈 목록)",
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "findings": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "ids": {"type": "array", "items": {"type": "string"}, "minItems": 2},
+                                "type": {"type": "string", "enum": SET_FINDING_TYPES},
+                                "reason": {"type": "string"}
+                            },
+                            "required": ["ids", "type", "reason"]
+                        }
+                    }
+                },
+                "required": ["findings"]
+            }
+        }
+    
+    def _extract_json(self, response: str) -> Dict[str, Any]:
+        """응답 텍스트에서 JSON 객체 추출"""
+        json_start = response.find('{')
+        json_end = response.rfind('}') + 1
+        if json_start >= 0 and json_end > json_start:
+            json_str = response[json_start:json_end]
+            return json.loads(json_str)
+        else:
+            raise ValueError("JSON 형식을 찾을 수 없습니다")
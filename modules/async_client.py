@@ -0,0 +1,333 @@
+"""
+asyncio 기반 AI API 클라이언트
+"""
+import asyncio
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterator, List, Optional
+import config
+from .ai_client import SCORING_TOOL, AIClient
+from .metrics import call_context, current_tags
+
+
+# 스트리밍 동기 파사드의 종료 표시
+_STREAM_END = object()
+
+
+def _shutdown_loop(loop: asyncio.AbstractEventLoop, thread: threading.Thread, aclients: List[Any]):
+    """SDK 클라이언트를 닫고 이벤트 루프 종료 (close 호출, 가비지 컬렉션, 프로세스 종료 시 한 번만 실행)"""
+    async def stop():
+        for aclient in aclients:
+            await aclient.close()
+        loop.stop()
+
+    if loop.is_closed():
+        return
+    asyncio.run_coroutine_threadsafe(stop(), loop)
+    if threading.current_thread() is not thread:
+        thread.join(10)
+        if not thread.is_alive():
+            loop.close()
+
+
+class AsyncAIClient(AIClient):
+    """
+    모든 API 요청을 클라이언트 전용 이벤트 루프(백그라운드 스레드 1개)에서 실행하는 AI 클라이언트
+
+    *_async 메서드는 어느 이벤트 루프에서든 await할 수 있고, 동기 메서드(call_api, call_tool, stream_api 등)는
+    같은 루프에 요청을 넘기고 결과를 기다리는 동기 파사드이므로 기존 코드에서 AIClient 대신 그대로 사용.
+    동기/비동기 호출자 모두 같은 세마포어로 동시 API 요청 수를, 스케줄러 버킷으로 요청/토큰 한도를 제한.
+    close()를 호출하지 않아도 클라이언트가 더 이상 참조되지 않거나 프로세스가 끝나면 루프와 연결을 정리
+    """
+
+
+    def __init__(self, *args, max_concurrency: int = config.ASYNC_MAX_CONCURRENT_REQUESTS, **kwargs):
+        """
+        Args:
+            max_concurrency: 동시에 진행할 API 요청 수 (동기 파사드와 스트리밍을 포함한 클라이언트 전체)
+            (나머지 인자는 AIClient와 같음)
+        """
+        super().__init__(*args, **kwargs)
+        self._aclient = None
+        self._aclients: List[Any] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+        self._finalizer: Optional[weakref.finalize] = None
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """요청을 실행할 이벤트 루프 (처음 사용할 때 백그라운드 스레드에서 시작)"""
+        if self._loop is None:
+            with self._loop_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    self._loop_thread = threading.Thread(target=loop.run_forever, name="ai-client-loop", daemon=True)
+                    self._loop_thread.start()
+                    self._aclients = []
+                    self._finalizer = weakref.finalize(self, _shutdown_loop, loop, self._loop_thread, self._aclients)
+                    self._loop = loop
+        return self._loop
+
+    @property
+    def aclient(self):
+        """Anthropic 비동기 SDK 클라이언트 (이벤트 루프 스레드에서만 사용)"""
+        if self._aclient is None:
+            import anthropic
+
+            # 재시도는 스케줄러가 담당하므로 SDK 자체 재시도는 끔
+            self._aclient = anthropic.AsyncAnthropic(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                max_retries=0
+            )
+            self._aclients.append(self._aclient)
+        return self._aclient
+
+    def submit(self, coroutine: Awaitable) -> Future:
+        """코루틴을 이벤트 루프에서 실행 (현재 호출 태그 유지)"""
+        return asyncio.run_coroutine_threadsafe(self._tagged(current_tags(), coroutine), self.loop)
+
+    def run(self, coroutine: Awaitable) -> Any:
+        """코루틴을 이벤트 루프에서 실행하고 결과를 기다림 (동기 코드용)"""
+        if threading.current_thread() is self._loop_thread:
+            coroutine.close()
+            raise Exception("이벤트 루프 안에서는 동기 메서드를 사용할 수 없습니다. *_async 메서드를 사용해주세요.")
+        return self.submit(coroutine).result()
+
+    def close(self):
+        """SDK 클라이언트 연결을 닫고 이벤트 루프 종료 (이후 요청하면 새 루프에서 다시 시작)"""
+        super().close()
+        with self._loop_lock:
+            if self._finalizer is not None:
+                self._finalizer()
+            self._finalizer = None
+            self._aclient = None
+            self._loop = None
+            self._loop_thread = None
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    @staticmethod
+    async def _tagged(tags: Dict[str, Any], coroutine: Awaitable) -> Any:
+
+        with call_context(**tags):
+            return await coroutine
+
+    def _create_message(self, system_prompt: str, user_message: str, phase: Optional[str] = None, **kwargs):
+        """동기 파사드: 이벤트 루프에서 요청하고 결과를 기다림 (call_api, call_tool 등이 사용)"""
+        return self.run(self._create_message_async(system_prompt, user_message, phase, **kwargs))
+
+    async def _create_message_async(
+        self,
+        system_prompt: str,
+        user_message: str,
+        phase: Optional[str] = None,
+        **kwargs
+    ):
+        """스케줄러를 거쳐 Messages API 호출 (다른 이벤트 루프에서 호출하면 클라이언트 루프로 넘겨 실행)"""
+        if asyncio.get_running_loop() is not self._loop:
+            return await asyncio.wrap_future(self.submit(self._create_message_async(system_prompt, user_message, phase, **kwargs)))
+
+        params = self.message_params(system_prompt, user_message, phase, **kwargs)
+        estimated = self._estimate_tokens(user_message)
+        started = time.perf_counter()
+        attempts = [0]
+
+        async def request():
+            attempts[0] += 1
+            return await self.aclient.messages.create(**params)
+
+        try:
+            message = await self.scheduler.execute_async(request, estimated, self._semaphore)
+        except Exception as e:
+            self._record_call(None, started, None, max(0, attempts[0] - 1), error=str(e), model=params["model"])
+            raise
+
+        self._settle_usage(
+            estimated, message.usage, started, time.perf_counter() - started, attempts[0] - 1, params["model"]
+        )
+        return message
+
+    def stream_api(self, system_prompt: str, user_message: str, phase: Optional[str] = None) -> Iterator[str]:
+        """동기 파사드: 이벤트 루프에서 스트리밍 요청을 실행하고 받은 조각을 차례로 반환 (동시 요청 수 제한 공유)"""
+        if threading.current_thread() is self._loop_thread:
+            raise Exception("이벤트 루프 안에서는 동기 메서드를 사용할 수 없습니다. *_async 메서드를 사용해주세요.")
+
+        chunks: queue.Queue = queue.Queue()
+
+        async def pump():
+            try:
+                async for text in self.stream_api_async(system_prompt, user_message, phase):
+                    chunks.put(text)
+            finally:
+                chunks.put(_STREAM_END)
+
+        future = self.submit(pump())
+        try:
+            while True:
+                text = chunks.get()
+                if text is _STREAM_END:
+                    break
+                yield text
+            future.result()
+        finally:
+            # 호출자가 도중에 그만 읽으면 요청도 취소
+            future.cancel()
+
+    async def stream_api_async(
+        self,
+        system_prompt: str,
+        user_message: str,
+        phase: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """stream_api의 비동기 버전 (이벤트 루프 스레드에서 실행, 첫 조각 수신 전의 오류만 재시도)"""
+        params = self.message_params(system_prompt, user_message, phase)
+        estimated = self._estimate_tokens(user_message)
+        attempt = 0
+        request_started = time.perf_counter()
+
+        while True:
+            started = False
+            try:
+                async with self.scheduler.slot_async(estimated, self._semaphore):
+                    async with self.aclient.messages.stream(**params) as stream:
+                        ttft = None
+                        async for text in stream.text_stream:
+                            if not started:
+                                started = True
+                                ttft = time.perf_counter() - request_started
+                            yield text
+                        message = await stream.get_final_message()
+                        self._settle_usage(estimated, message.usage, request_started, ttft, attempt, params["model"])
+                return
+            except Exception as e:
+                delay = None if started else self.scheduler.retry_delay(e, attempt)
+                if delay is None:
+                    self._record_call(None, request_started, None, attempt, error=str(e), model=params["model"])
+                    raise Exception(f"AI API 호출 실패: {str(e)}")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def call_api_async(self, system_prompt: str, user_message: str, phase: Optional[str] = None) -> str:
+        """call_api의 비동기 버전"""
+        try:
+            message = await self._create_message_async(system_prompt, user_message, phase)
+            return message.content[0].text
+        except Exception as e:
+            raise Exception(f"AI API 호출 실패: {str(e)}")
+
+    async def call_tool_async(
+        self,
+        system_prompt: str,
+        user_message: str,
+        tool: Dict[str, Any],
+        phase: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """call_tool의 비동기 버전"""
+        try:
+            message = await self._create_message_async(
+                system_prompt,
+                user_message,
+                phase,
+                tools=[tool],
+                tool_choice={"type": "tool", "name": tool["name"]}
+            )
+        except Exception as e:
+            raise Exception(f"AI API 호출 실패: {str(e)}")
+
+        return next((block.input for block in message.content if block.type == "tool_use"), None)
+
+    async def improve_requirement_async(
+        self,
+        quality_prompt: str,
+        original_text: str,
+        subject: str,
+        system: str,
+        receiver: str
+    ) -> str:
+        """improve_requirement의 비동기 버전"""
+        user_message = self._improve_message(original_text, subject, system, receiver)
+
+        return await self.call_api_async(quality_prompt, user_message, "improve")
+
+    async def improve_and_score_async(
+        self,
+        system_prompt: str,
+        original_text: str,
+        subject: str,
+        system: str,
+        receiver: str,
+        rules: List[str]
+    ) -> Dict[str, Any]:
+        """improve_and_score의 비동기 버전"""
+        raw = await self.call_tool_async(
+            system_prompt,
+            self._combined_message(original_text, subject, system, receiver),
+            self._combined_tool(rules),
+            "combined"
+        )
+        return self.combined_from_raw(raw, rules)
+
+    async def evaluate_requirement_async(
+        self,
+        scoring_prompt: str,
+        text: str,
+        rules: List[str]
+    ) -> Dict[str, Any]:
+        """evaluate_requirement의 비동기 버전 (누락 규칙 보완, 상위 모델 재평가 포함)"""
+        raw = await self.call_tool_async(scoring_prompt, self._scoring_message(text, rules), SCORING_TOOL, "score")
+        scores, missing = self._validate_scores(raw, rules)
+        return await self.finish_scores_async(scoring_prompt, text, rules, scores, missing, self._confidence(raw))
+
+    async def finish_scores_async(
+        self,
+        scoring_prompt: str,
+        text: str,
+        rules: List[str],
+        scores: Dict[str, Any],
+        missing: List[str],
+        confidence: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """finish_scores의 비동기 버전"""
+        try:
+            scores = await self.repair_scores_async(scoring_prompt, text, scores, missing, "score")
+        except Exception:
+            if not self.can_escalate():
+                raise
+            return await self.escalate_scores_async(scoring_prompt, text, rules)
+
+        if confidence is not None and confidence < config.SCORING_MIN_CONFIDENCE and self.can_escalate():
+            return await self.escalate_scores_async(scoring_prompt, text, rules)
+        return scores
+
+    async def escalate_scores_async(self, scoring_prompt: str, text: str, rules: List[str]) -> Dict[str, Any]:
+        """escalate_scores의 비동기 버전"""
+        with call_context(escalated=True):
+            raw = await self.call_tool_async(scoring_prompt, self._scoring_message(text, rules), SCORING_TOOL, "escalate")
+            scores, missing = self._validate_scores(raw, rules)
+            return await self.repair_scores_async(scoring_prompt, text, scores, missing, "escalate")
+
+    async def repair_scores_async(
+        self,
+        scoring_prompt: str,
+        text: str,
+        scores: Dict[str, Any],
+        missing: List[str],
+        phase: str = "score"
+    ) -> Dict[str, Any]:
+        """repair_scores의 비동기 버전"""
+        for _ in range(config.SCORING_REPAIR_ATTEMPTS):
+            if not missing:
+                break
+            raw = await self.call_tool_async(scoring_prompt, self._repair_message(text, missing), SCORING_TOOL, phase)
+            repaired, missing = self._validate_scores(raw, missing)
+            scores.update(repaired)
+
+        if missing:
+            raise Exception(f"점수 평가 결과 누락: {', '.join(missing)}")
+        return scores
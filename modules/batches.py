@@ -0,0 +1,272 @@
+"""
+Message Batches API 실행 백엔드 (응답 지연 대신 비용/처리량 우선인 야간 일괄 처리용)
+"""
+import time
+from typing import Any, Callable, Dict, List, Optional
+from .ai_client import AIClient
+from .improver import RequirementImprover
+from .evaluator import RequirementEvaluator
+from .incremental import affected_rules
+import config
+
+
+class MessageBatchBackend:
+
+
+    def __init__(
+        self,
+        ai_client: AIClient,
+        poll_interval: float = config.MESSAGE_BATCH_POLL_INTERVAL,
+        timeout: float = config.MESSAGE_BATCH_TIMEOUT,
+        max_requests: int = config.MESSAGE_BATCH_MAX_REQUESTS
+    ):
+        """
+        Args:
+            ai_client: 요청 파라미터 생성 및 SDK 클라이언트/스케줄러 제공
+            poll_interval: 처리 상태 확인 주기(초)
+            timeout: 이 시간이 지나도 끝나지 않으면 배치를 취소하고 예외 발생(초)
+            max_requests: 배치 1개당 최대 요청 수 (초과 시 여러 배치로 나누어 제출)
+        """
+        self.ai_client = ai_client
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.max_requests = max_requests
+
+    def run(
+        self,
+        requests: Dict[str, Dict[str, Any]],
+        progress_callback: Optional[Callable[[Dict[str, int]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        요청들을 배치로 제출하고 완료될 때까지 기다려 결과 반환
+
+        Args:
+            requests: custom_id → Messages API 파라미터
+            progress_callback: 상태 확인 때마다 요청 상태별 개수를 전달받을 함수
+
+        Returns:
+            custom_id → 응답 메시지 (실패한 요청은 Exception)
+        """
+        ids = list(requests)
+        batch_ids = []
+        for start in range(0, len(ids), self.max_requests):
+            chunk = ids[start:start + self.max_requests]
+            batch = self._call(lambda: self.ai_client.client.messages.batches.create(requests=[
+                {"custom_id": custom_id, "params": requests[custom_id]}
+                for custom_id in chunk
+            ]))
+            batch_ids.append(batch.id)
+
+        started = time.perf_counter()
+        self._wait(batch_ids, started, progress_callback)
+
+        results: Dict[str, Any] = {}
+        for batch_id in batch_ids:
+            for entry in self._call(lambda: list(self.ai_client.client.messages.batches.results(batch_id))):
+                results[entry.custom_id] = self._read_result(entry, started)
+
+        for custom_id in ids:
+            results.setdefault(custom_id, Exception("배치 결과 누락"))
+        return results
+
+    def _wait(self, batch_ids: List[str], started: float, progress_callback: Optional[Callable]):
+        """모든 배치의 처리가 끝날 때까지 주기적으로 상태 확인"""
+        pending = list(batch_ids)
+        while True:
+            counts = {"processing": 0, "succeeded": 0, "errored": 0, "canceled": 0, "expired": 0}
+            for batch_id in list(pending):
+                batch = self._call(lambda: self.ai_client.client.messages.batches.retrieve(batch_id))
+                for key in counts:
+                    counts[key] += getattr(batch.request_counts, key, 0)
+                if batch.processing_status == "ended":
+                    pending.remove(batch_id)
+
+            if progress_callback:
+                progress_callback(counts)
+            if not pending:
+                return
+
+            if time.perf_counter() - started > self.timeout:
+                for batch_id in pending:
+                    self._call(lambda: self.ai_client.client.messages.batches.cancel(batch_id))
+                raise Exception(f"배치 처리 시간 초과 ({self.timeout:.0f}초): {', '.join(pending)}")
+            time.sleep(self.poll_interval)
+
+    def _read_result(self, entry, started: float):
+        """배치 결과 1건을 응답 메시지로 변환하고 사용량 기록 (배치 할인 반영)"""
+        result = entry.result
+        if result.type == "succeeded":
+            self.ai_client._record_call(
+                result.message.usage, started, None, 0,
+                cost_factor=config.MESSAGE_BATCH_COST_FACTOR, model=result.message.model
+            )
+            return result.message
+
+        error = getattr(getattr(result, "error", None), "error", None)
+        detail = getattr(error, "message", None) or result.type
+        self.ai_client._record_call(None, started, None, 0, error=detail)
+        return Exception(f"배치 요청 실패 ({result.type}): {detail}")
+
+    def _call(self, request: Callable):
+        """배치 관리 API 호출 (스케줄러의 한도 대기/재시도 적용)"""
+        return self.ai_client.scheduler.execute(request, 0)
+
+
+class BatchPipeline:
+    """
+    RequirementPipeline의 Message Batches 버전
+
+    1차 배치에서 개선과 원본 평가를, 2차 배치에서 개선된 요구사항 평가를 제출.
+    점수 응답에서 누락된 규칙 보완과 상위 모델 재평가는 일반 API로 처리
+    """
+
+
+    def __init__(
+        self,
+        improver: RequirementImprover,
+        evaluator: RequirementEvaluator,
+        backend: Optional[MessageBatchBackend] = None
+    ):
+
+        self.improver = improver
+        self.evaluator = evaluator
+        self.backend = backend or MessageBatchBackend(evaluator.ai_client)
+
+    def score(
+        self,
+        texts: Dict[str, str],
+        progress_callback: Optional[Callable[[Dict[str, int]], None]] = None
+    ) -> Dict[str, Any]:
+        """요구사항 평가 (ID → 평가 결과, 실패한 요구사항은 Exception)"""
+        ids = list(texts)
+        rules = self.evaluator.all_rules
+        requests = {
+            f"score-{i}": self._scoring_params(texts[req_id], rules)
+            for i, req_id in enumerate(ids)
+        }
+        responses = self.backend.run(requests, progress_callback)
+        return {
+            req_id: self._finish_scores(texts[req_id], rules, responses[f"score-{i}"])
+            for i, req_id in enumerate(ids)
+        }
+
+    def run(
+        self,
+        requirements: Dict[str, str],
+        subject: str,
+        system: str,
+        receiver: str,
+        progress_callback: Optional[Callable[[Dict[str, int]], None]] = None
+    ) -> Dict[str, Dict]:
+        """
+        요구사항 개선 및 개선 전후 평가
+
+        Returns:
+            ID → {"improved_result", "original_scores", "improved_scores"} (실패 시 {"error"})
+        """
+        ids = list(requirements)
+        rules = self.evaluator.all_rules
+
+        # 1. 개선 + 원본 평가
+        requests = {}
+        for i, req_id in enumerate(ids):
+            requests[f"improve-{i}"] = self.evaluator.ai_client.improve_params(
+                self.improver.quality_prompt, requirements[req_id], subject, system, receiver
+            )
+            requests[f"original-{i}"] = self._scoring_params(requirements[req_id], rules)
+        responses = self.backend.run(requests, progress_callback)
+
+        results: Dict[str, Dict] = {}
+        revisions: Dict[str, List[Dict]] = {}
+        requests = {}
+        for i, req_id in enumerate(ids):
+            try:
+                improved = responses[f"improve-{i}"]
+                if isinstance(improved, Exception):
+                    raise improved
+                improved_result = self.improver.build_result(
+                    requirements[req_id], improved.content[0].text, subject, system, receiver
+                )
+                original_scores = self._finish_scores(requirements[req_id], rules, responses[f"original-{i}"])
+                if isinstance(original_scores, Exception):
+                    raise original_scores
+            except Exception as e:
+                results[req_id] = {"error": str(e)}
+                continue
+
+            results[req_id] = {"improved_result": improved_result, "original_scores": original_scores}
+            revisions[req_id] = self._plan_revision(requirements[req_id], improved_result, original_scores)
+            for j, part in enumerate(revisions[req_id]):
+                if self.evaluator.llm_rules(part["rules"]):
+                    requests[f"improved-{i}-{j}"] = self._scoring_params(part["text"], part["rules"])
+
+        # 2. 개선된 요구사항 평가 (변경된 규칙 / 분리된 요구사항별)
+        responses = self.backend.run(requests, progress_callback) if requests else {}
+        for i, req_id in enumerate(ids):
+            if req_id not in revisions:
+                continue
+            try:
+                results[req_id]["improved_scores"] = self._finish_revision(i, revisions[req_id], responses)
+            except Exception as e:
+                results[req_id] = {"error": str(e)}
+        return results
+
+    def _plan_revision(self, original_text: str, improved_result: Dict, original_scores: Dict) -> List[Dict]:
+        """개선된 요구사항별로 다시 평가할 규칙 결정 (RequirementPipeline.evaluate_revision과 같은 기준)"""
+        items = improved_result.get("requirements") or []
+        if len(items) > 1:
+            return [{"item": item, "text": item["text"], "rules": self.evaluator.all_rules, "base": None} for item in items]
+
+        text = items[0]["text"] if items else improved_result["requirement"]
+        rules = affected_rules(original_text, text)
+        if rules is None:
+            return [{"item": None, "text": text, "rules": self.evaluator.all_rules, "base": None}]
+        return [{"item": None, "text": text, "rules": rules, "base": original_scores}]
+
+    def _finish_revision(self, index: int, parts: List[Dict], responses: Dict[str, Any]) -> Dict:
+
+        results = []
+        for j, part in enumerate(parts):
+            if not part["rules"]:
+                results.append({**part["base"], "rescored_rules": []})
+                continue
+
+            scores = self._finish_scores(part["text"], part["rules"], responses.get(f"improved-{index}-{j}"), raw=True)
+            if isinstance(scores, Exception):
+                raise scores
+            if part["base"] is None:
+                results.append(self.evaluator._process_scores(scores))
+            else:
+                result = self.evaluator._process_scores({**part["base"].get("scores", {}), **scores})
+                result["rescored_rules"] = list(part["rules"])
+                results.append(result)
+
+        if len(parts) == 1:
+            return results[0]
+        combined = self.evaluator.combine_scores(results)
+        combined["items"] = [{**part["item"], "scores": result} for part, result in zip(parts, results)]
+        return combined
+
+    def _scoring_params(self, text: str, rules: List[str]) -> Dict[str, Any]:
+
+        return self.evaluator.ai_client.scoring_params(
+            self.evaluator.scoring_prompt, text, self.evaluator.llm_rules(rules)
+        )
+
+    def _finish_scores(self, text: str, rules: List[str], response, raw: bool = False):
+        """점수 응답 검증 (누락 보완/상위 모델 재평가는 일반 API) 후 로컬 점검 점수와 합쳐 집계"""
+        if isinstance(response, Exception):
+            return response
+
+        ai_client = self.evaluator.ai_client
+        semantic = self.evaluator.llm_rules(rules)
+        scores = {}
+        if semantic:
+            try:
+                scores, missing, confidence = ai_client.scores_from_message(response, semantic)
+                scores = ai_client.finish_scores(self.evaluator.scoring_prompt, text, semantic, scores, missing, confidence)
+            except Exception as e:
+                return e
+
+        scores = self.evaluator.merge_local_scores(text, rules, scores)
+        return scores if raw else self.evaluator._process_scores(scores)
@@ -0,0 +1,126 @@
+"""
+요구사항 일괄 처리 (엑셀/CSV 입력 → 엑셀 출력)
+"""
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+from .pipeline import RequirementPipeline
+from .rules import ScoreRecord
+import config
+
+
+# 집합 분석 판정 유형 표시 이름
+SET_FINDING_LABELS = {"duplicate": "중복 (R30)", "conflict": "상충 (C11)", "inconsistent_terms": "용어 불일치 (C11)"}
+
+
+class BulkProcessor:
+    
+    
+    def __init__(self, pipeline: RequirementPipeline):
+        """
+        Args:
+            pipeline: 처리 결과의 규칙 순서와 집합 규칙 점수 반영에 사용할 파이프라인
+            (요구사항 처리는 JobRunner가 담당하고 여기서는 입력 읽기와 결과 파일 기록만 수행)
+        """
+        self.pipeline = pipeline
+        self.rules = pipeline.evaluator.all_rules
+        self.rule_table = pipeline.evaluator.rule_table
+    
+    def read_requirements(self, file, file_name: str) -> Iterator[Dict]:
+        """엑셀/CSV 파일에서 요구사항 (ID, 텍스트) 읽기"""
+        import pandas as pd
+        
+        if file_name.lower().endswith('.csv'):
+            df = pd.read_csv(file, dtype=str)
+        else:
+            df = pd.read_excel(file, dtype=str)
+        
+        text_column = next((c for c in df.columns if str(c).strip() in config.BULK_TEXT_COLUMNS), df.columns[0])
+        id_column = next((c for c in df.columns if str(c).strip() in config.BULK_ID_COLUMNS), None)
+        
+        for index, row in df.iterrows():
+            text = row[text_column]
+            if not isinstance(text, str) or not text.strip():
+                continue
+            req_id = row[id_column] if id_column is not None else None
+            yield {
+                "id": str(req_id) if isinstance(req_id, str) and req_id.strip() else str(index + 1),
+                "text": text.strip()
+            }
+    
+    def export(self, records: Iterable[Dict], output_path: Path, set_analysis: Optional[Dict] = None) -> Path:
+        """
+        저장된 처리 결과({"id", "text", "result", "error"})를 출력 파일로 기록 (집합 분석 점수는 행 순서로 대응)
+        
+        쓰기 전용 통합 문서로 행을 받는 대로 기록하므로 records는 저장소에서 순서대로 읽는 반복자를 그대로 넘기면 됨.
+        set_analysis(SetAnalyzer.analyze 결과)를 주면 집합 규칙 점수를 반영하고 판정 목록을 별도 시트로 기록
+        """
+        from openpyxl import Workbook
+        
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("결과")
+        sheet.append(self._header())
+        for row, record in enumerate(records):
+            result = record.get("result")
+            if result and set_analysis and row < len(set_analysis["scores"]):
+                result = self.apply_set_scores(result, set_analysis["scores"][row])
+            sheet.append(self.build_row(record, result, record.get("error") or ""))
+        
+        if set_analysis:
+            set_sheet = workbook.create_sheet("집합 분석")
+            set_sheet.append(["유형", "요구사항 ID", "근거"])
+            for finding in set_analysis["findings"]:
+                set_sheet.append([SET_FINDING_LABELS.get(finding["type"], finding["type"]), ", ".join(finding["ids"]), finding["reason"]])
+            for req_id, rows in set_analysis["duplicate_ids"].items():
+                set_sheet.append(["ID 중복", req_id, f"{', '.join(map(str, rows))}번째 요구사항이 같은 ID를 사용"])
+        
+        workbook.save(output_path)
+        return output_path
+    
+    def apply_set_scores(self, result: Dict, set_scores: Dict[str, Dict]) -> Dict:
+        """
+        개선 전후 점수에 집합 규칙 점수 반영
+        
+        요구사항을 하나씩 개선해도 다른 요구사항과의 중복/상충은 남으므로 개선 점수에도 같은 점수 적용
+        """
+        evaluator = self.pipeline.evaluator
+        return {
+            **result,
+            "original_scores": evaluator.apply_set_scores(ScoreRecord.coerce(result["original_scores"], self.rule_table), set_scores),
+            "improved_scores": evaluator.apply_set_scores(ScoreRecord.coerce(result["improved_scores"], self.rule_table), set_scores)
+        }
+    
+    def build_row(self, requirement: Dict, result: Optional[Dict], error: str = "") -> list:
+        """파이프라인 결과로 출력 행 생성 (결과가 없으면 오류 행)"""
+        if result is None:
+            return [requirement["id"], requirement["text"], "", None, None, None, None, None, error]
+        
+        orig = ScoreRecord.coerce(result["original_scores"], self.rule_table)
+        impr = ScoreRecord.coerce(result["improved_scores"], self.rule_table)
+        row = [
+            requirement["id"],
+            requirement["text"],
+            result["improved_result"]["requirement"],
+            orig.total,
+            impr.total,
+            impr.total - orig.total,
+            orig.percentage,
+            impr.percentage,
+            ""
+        ]
+        
+        # 규칙 순서가 고정된 점수 배열이므로 규칙별 조회 없이 바로 기록
+        for orig_score, impr_score, change in zip(orig.values.tolist(), impr.values.tolist(), orig.delta(impr).tolist()):
+            row.extend([orig_score, impr_score, change])
+        
+        return row
+    
+    def _header(self) -> list:
+        
+        header = ["ID", "원본 요구사항", "개선된 요구사항", "원본 총점", "개선 총점", "총점 변화",
+                  "원본 만족률", "개선 만족률", "오류"]
+        for rule in self.rules:
+            header.extend([f"{rule} 원본", f"{rule} 개선", f"{rule} 변화"])
+        return header
@@ -0,0 +1,93 @@
+"""
+요구사항 처리 결과 캐시 (SQLite, 크기 제한 LRU)
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+def normalize_text(text: str) -> str:
+    """공백/유니코드 정규화 (캐시 키용)"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def make_key(*parts: str) -> str:
+    """키 구성 요소들의 SHA-256 해시"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class ResultCache:
+    
+    
+    def __init__(self, path: Path, max_bytes: int):
+        """
+        Args:
+            path: SQLite 파일 경로
+            max_bytes: 저장 값의 총 크기 상한 (초과 시 오래 사용하지 않은 항목부터 삭제)
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed)")
+        self._conn.commit()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return json.loads(row[0])
+    
+    def put(self, key: str, value: Dict[str, Any]):
+        
+        data = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                (key, data, len(data.encode("utf-8")), time.time())
+            )
+            self._evict()
+            self._conn.commit()
+    
+    def clear(self):
+        
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+    
+    def _evict(self):
+        """총 크기가 상한을 넘으면 오래 사용하지 않은 항목부터 삭제"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        expired = []
+        for key, size in self._conn.execute("SELECT key, size FROM results ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            expired.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM results WHERE key = ?", expired)
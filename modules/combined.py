@@ -0,0 +1,74 @@
+"""
+개선+평가 단일 호출 (원본 평가, 개선, 개선본 평가를 한 번의 요청으로 수행)
+"""
+import asyncio
+from typing import Dict
+from .improver import RequirementImprover
+from .evaluator import RequirementEvaluator
+
+
+# 개선 지침 뒤에 붙이는 채점 기준 제목
+SCORING_HEADING = "# 채점 기준 (record_improvement 도구의 original_scores / improved_scores 평가에 사용)"
+
+
+class CombinedImprover:
+    """
+    개선 지침과 채점 기준을 한 시스템 프롬프트로 묶어 record_improvement 도구 입력 하나로 결과를 받음
+
+    누락되거나 형식이 잘못된 규칙만 채점 모델로 다시 요청하고(실패하면 상위 모델로 재평가),
+    점수 집계는 평가기와 같은 방식(로컬 규칙 병합)으로 처리. 분리된 개선 요구사항은 항목별 평가 대신 전체를 하나로 평가
+    """
+
+
+    def __init__(self, improver: RequirementImprover, evaluator: RequirementEvaluator):
+
+        self.improver = improver
+        self.evaluator = evaluator
+        self.ai_client = improver.ai_client
+
+    def system_prompt(self) -> str:
+        """개선 지침 뒤에 채점 기준을 붙인 시스템 프롬프트 (요구사항과 무관하므로 전체가 캐시됨)"""
+        return f"{self.improver.quality_prompt}\n\n---\n\n{SCORING_HEADING}\n\n{self.evaluator.scoring_prompt}"
+
+    def run(self, original_text: str, subject: str, system: str, receiver: str) -> Dict:
+        """RequirementPipeline.run과 같은 형식의 결과 ({"improved_result", "original_scores", "improved_scores"})"""
+        payload = self.ai_client.improve_and_score(
+            self.system_prompt(), original_text, subject, system, receiver, self.evaluator.semantic_rules
+        )
+        improved_result = self.improver.build_result(original_text, payload["improved"], subject, system, receiver)
+        section = improved_result["requirement"]
+
+        scoring_prompt, rules = self.evaluator.scoring_prompt, self.evaluator.semantic_rules
+        original_scores = self.ai_client.finish_scores(
+            scoring_prompt, original_text, rules, payload["original_scores"], payload["original_missing"]
+        )
+        improved_scores = self.ai_client.finish_scores(
+            scoring_prompt, section, rules, payload["improved_scores"], payload["improved_missing"]
+        )
+        return self._build(original_text, improved_result, original_scores, improved_scores)
+
+    async def run_async(self, original_text: str, subject: str, system: str, receiver: str) -> Dict:
+        """run의 비동기 버전 (AsyncAIClient가 아니면 스레드에서 동기 호출)"""
+        if not hasattr(self.ai_client, "improve_and_score_async"):
+            return await asyncio.to_thread(self.run, original_text, subject, system, receiver)
+
+        payload = await self.ai_client.improve_and_score_async(
+            self.system_prompt(), original_text, subject, system, receiver, self.evaluator.semantic_rules
+        )
+        improved_result = self.improver.build_result(original_text, payload["improved"], subject, system, receiver)
+        section = improved_result["requirement"]
+
+        scoring_prompt, rules = self.evaluator.scoring_prompt, self.evaluator.semantic_rules
+        original_scores, improved_scores = await asyncio.gather(
+            self.ai_client.finish_scores_async(scoring_prompt, original_text, rules, payload["original_scores"], payload["original_missing"]),
+            self.ai_client.finish_scores_async(scoring_prompt, section, rules, payload["improved_scores"], payload["improved_missing"])
+        )
+        return self._build(original_text, improved_result, original_scores, improved_scores)
+
+    def _build(self, original_text: str, improved_result: Dict, original_scores: Dict, improved_scores: Dict) -> Dict:
+
+        return {
+            "improved_result": improved_result,
+            "original_scores": self.evaluator.build_result(original_text, original_scores),
+            "improved_scores": self.evaluator.build_result(improved_result["requirement"], improved_scores)
+        }
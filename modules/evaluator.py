@@ -1,8 +1,13 @@
 """
 점수 평가 로직
 """
+import asyncio
 from typing import Dict, List
+import numpy as np
 from .ai_client import AIClient
+from .prescreen import local_rules, prescreen
+from .rules import RULE_TABLE, ScoreMatrix, ScoreRecord
+import config
 
 
 class RequirementEvaluator:
@@ -13,113 +18,185 @@ class RequirementEvaluator:
         self.ai_client = ai_client
         self.scoring_prompt = scoring_prompt
         
-        # 규칙 목록 (64개)
-        self.all_rules = [
-            # Pattern Rules
-            "P1", "P2", "P3", "P4", "P5", "P6", "P7",
-            # Characteristics - Individual
-            "C1", "C2", "C3", "C4", "C5", "C6", "C7", "C8", "C9",
-            # Characteristics - Set
-            "C10", "C11", "C12", "C13", "C14", "C15",
-            # Writing Rules
-            "R1", "R2", "R3", "R4", "R5", "R6", "R7", "R8", "R9",
-            "R10", "R11",
-            "R12", "R13", "R14", "R15", "R16", "R17",
-            "R18", "R19", "R20", "R21", "R22", "R23",
-            "R24", "R25",
-            "R26",
-            "R27", "R28",
-            "R29", "R30",
-            "R31",
-            "R32",
-            "R33",
-            "R34", "R35",
-            "R37", "R38", "R39", "R40",
-            "R41", "R42"
-        ]
+        # 규칙 목록 (config.RULES_COUNT 기준)
+        self.rule_table = RULE_TABLE
+        self.all_rules = list(RULE_TABLE.rules)
+        
+        # 어휘 패턴으로 로컬 채점하는 규칙 / LLM에 요청하는 규칙
+        self.local_rules = local_rules(self.all_rules)
+        self.semantic_rules = [rule for rule in self.all_rules if rule not in self.local_rules]
     
     def evaluate(self, text: str) -> Dict:
-
-        try:
+        """
+        요구사항 평가 (로컬 사전 점검 규칙 + LLM 평가 규칙)
+        
+        평가에 실패하면 0점 결과로 대체하지 않고 예외를 그대로 전달
+        """
+        return self._process_scores(self._score_rules(text, self.all_rules))
+    
+    async def evaluate_async(self, text: str) -> Dict:
+        """evaluate의 비동기 버전"""
+        return self._process_scores(await self._score_rules_async(text, self.all_rules))
+    
+    def prescreen(self, text: str) -> Dict:
+        """LLM 호출 없이 로컬 사전 점검 규칙만 평가 (입력 중 즉시 피드백용)"""
+        return prescreen(text, self.local_rules)
+    
+    def rescore(self, text: str, base_scores: Dict, rules: List[str]) -> Dict:
+        """기존 평가 결과에서 지정한 규칙만 다시 평가하여 병합"""
+        merged = {**base_scores.get("scores", {}), **self._score_rules(text, rules)}
+        result = self._process_scores(merged)
+        result["rescored_rules"] = list(rules)
+        return result
+    
+    def build_result(self, text: str, llm_scores: Dict) -> Dict:
+        """다른 경로(개선+평가 단일 호출 등)로 받은 LLM 규칙 점수에 로컬 규칙 점수를 합쳐 평가 결과로 집계"""
+        return self._process_scores(self.merge_local_scores(text, self.all_rules, llm_scores))
+    
+    async def rescore_async(self, text: str, base_scores: Dict, rules: List[str]) -> Dict:
+        """rescore의 비동기 버전"""
+        merged = {**base_scores.get("scores", {}), **await self._score_rules_async(text, rules)}
+        result = self._process_scores(merged)
+        result["rescored_rules"] = list(rules)
+        return result
+    
+    def _score_rules(self, text: str, rules: List[str]) -> Dict:
+        """지정한 규칙 평가 (로컬 규칙은 사전 점검, 나머지만 LLM 요청)"""
+        semantic = self.llm_rules(rules)
+        scores = {}
+        if semantic:
             scores = self.ai_client.evaluate_requirement(
                 scoring_prompt=self.scoring_prompt,
-                text=text
+                text=text,
+                rules=semantic
             )
-            return self._process_scores(scores)
-        except Exception as e:
-            # 오류 발생 시 기본 점수 반환
-            return self._get_default_scores()
+        return self.merge_local_scores(text, rules, scores)
     
-    def _process_scores(self, scores: Dict) -> Dict:
-        """점수 처리 및 집계"""
-        total_score = 0
-        max_score = 0
-        
-        for rule in self.all_rules:
-            if rule in scores:
-                score = scores[rule].get('score', 0)
-                if score > 0:  # N/A가 아닌 경우만
-                    total_score += score
-                    max_score += 5
+    async def _score_rules_async(self, text: str, rules: List[str]) -> Dict:
+        """_score_rules의 비동기 버전 (AsyncAIClient가 아니면 스레드에서 동기 호출)"""
+        if not hasattr(self.ai_client, "evaluate_requirement_async"):
+            return await asyncio.to_thread(self._score_rules, text, rules)
         
-        # 카테고리별 점수 계산
-        categories = self._calculate_category_scores(scores)
+        semantic = self.llm_rules(rules)
+        scores = {}
+        if semantic:
+            scores = await self.ai_client.evaluate_requirement_async(
+                scoring_prompt=self.scoring_prompt,
+                text=text,
+                rules=semantic
+            )
+        return self.merge_local_scores(text, rules, scores)
+    
+    def llm_rules(self, rules: List[str]) -> List[str]:
+        """지정한 규칙 중 LLM에 요청해야 하는 규칙"""
+        return [rule for rule in rules if rule not in self.local_rules]
+    
+    def merge_local_scores(self, text: str, rules: List[str], scores: Dict) -> Dict:
+        """LLM 점수에 로컬 사전 점검 점수를 합쳐 규칙 순서대로 정렬"""
+        merged = {**scores, **prescreen(text, [rule for rule in rules if rule in self.local_rules])}
+        return {rule: merged[rule] for rule in rules if rule in merged}
+    
+    def combine_scores(self, results: List[Dict]) -> Dict:
+        """분리된 요구사항별 평가 결과를 규칙별 평균 점수(N/A 제외)로 집계"""
+        matrix = ScoreMatrix.from_scores(self.rule_table, [result["scores"] for result in results]).scores
+        counts = (matrix > 0).sum(axis=0)
+        means = np.floor(matrix.sum(axis=0) / np.maximum(counts, 1) + 0.5).astype(int)
         
-        return {
-            "total": total_score,
-            "max": max_score if max_score > 0 else 320,
-            "percentage": round((total_score / max_score * 100), 1) if max_score > 0 else 0,
-            "scores": scores,
-            "categories": categories
+        combined = {
+            rule: {"score": int(means[i]), "reason": f"분리된 요구사항 {int(counts[i])}개의 평균"}
+            for i, rule in enumerate(self.rule_table.rules)
         }
+        return self._process_scores(combined)
     
-    def _calculate_category_scores(self, scores: Dict) -> Dict:
-   
-        categories = {
-            "패턴 규칙 (P1-P7)": {"rules": ["P1", "P2", "P3", "P4", "P5", "P6", "P7"], "score": 0, "max": 35},
-            "개별 특성 (C1-C9)": {"rules": ["C1", "C2", "C3", "C4", "C5", "C6", "C7", "C8", "C9"], "score": 0, "max": 45},
-            "집합 특성 (C10-C15)": {"rules": ["C10", "C11", "C12", "C13", "C14", "C15"], "score": 0, "max": 30},
-            "정확성 (R1-R9)": {"rules": ["R1", "R2", "R3", "R4", "R5", "R6", "R7", "R8", "R9"], "score": 0, "max": 45},
-            "기타 규칙": {"rules": [r for r in self.all_rules if r.startswith('R') and int(r[1:]) >= 10], "score": 0, "max": 165}
-        }
+    def apply_set_scores(self, result, set_scores: Dict[str, Dict]) -> Dict:
+        """평가 결과(dict 또는 ScoreRecord)의 집합 규칙 점수를 집합 분석 결과로 바꾸어 다시 집계"""
+        applied = self._process_scores({**result["scores"], **set_scores})
+        for key in ("rescored_rules", "items"):
+            if result.get(key) is not None:
+                applied[key] = result.get(key)
+        return applied
+    
+    def evaluate_batch(self, texts: Dict[str, str]) -> Dict[str, Dict]:
+        """여러 요구사항을 토큰 예산 단위의 배치로 묶어 평가 (ID → 평가 결과)"""
+        results = {}
+        for batch in self._split_batches(texts):
+            results.update(self._evaluate_batch(batch))
+        return results
+    
+    def _evaluate_batch(self, batch: Dict[str, str]) -> Dict[str, Dict]:
+        """
+        배치 평가, 파싱 실패 시 배치를 반으로 나누어 재시도
         
-        for cat_name, cat_data in categories.items():
-            for rule in cat_data["rules"]:
-                if rule in scores:
-                    score = scores[rule].get('score', 0)
-                    if score > 0:
-                        cat_data["score"] += score
+        요구사항별 점수는 단건 평가와 같은 방식으로 검증하고, 누락되거나 범위를 벗어난 규칙은
+        해당 요구사항만 보완 요청(실패하면 상위 모델로 재평가)하므로 일부 규칙만 받은 결과를 그대로 집계하지 않음
+        """
+        if len(batch) == 1:
+            req_id, text = next(iter(batch.items()))
+            return {req_id: self.evaluate(text)}
         
-        return categories
-    
-    def _get_default_scores(self) -> Dict:
-  
-        return {
-            "total": 0,
-            "max": 320,
-            "percentage": 0,
-            "scores": {},
-            "categories": {}
-        }
+        try:
+            validated = self.ai_client.evaluate_requirements_batch(
+                scoring_prompt=self.scoring_prompt,
+                items=batch,
+                rules=self.semantic_rules
+            )
+        except Exception:
+            ids = list(batch)
+            half = len(ids) // 2
+            results = self._evaluate_batch({req_id: batch[req_id] for req_id in ids[:half]})
+            results.update(self._evaluate_batch({req_id: batch[req_id] for req_id in ids[half:]}))
+            return results
+        
+        batch_scores = {}
+        for req_id, (scores, missing) in validated.items():
+            if missing:
+                scores = self.ai_client.finish_scores(self.scoring_prompt, batch[req_id], self.semantic_rules, scores, missing)
+            batch_scores[req_id] = self.merge_local_scores(batch[req_id], self.all_rules, scores)
+        return self._process_batch_scores(batch_scores)
     
-    def compare_scores(self, original_scores: Dict, improved_scores: Dict) -> Dict:
-
-        changes = {}
+    def _split_batches(self, texts: Dict[str, str]) -> List[Dict[str, str]]:
+        """토큰 예산과 최대 개수 기준으로 배치 분할"""
+        batches = []
+        current = {}
+        current_tokens = 0
         
-        for rule in self.all_rules:
-            orig = original_scores.get("scores", {}).get(rule, {}).get("score", 0)
-            impr = improved_scores.get("scores", {}).get(rule, {}).get("score", 0)
-            
-            if orig > 0 or impr > 0:  # N/A가 아닌 경우만
-                changes[rule] = {
-                    "original": orig,
-                    "improved": impr,
-                    "change": impr - orig
-                }
+        for req_id, text in texts.items():
+            tokens = len(text) // config.CHARS_PER_TOKEN + config.BATCH_OUTPUT_TOKENS_PER_ITEM
+            if current and (current_tokens + tokens > config.BATCH_TOKEN_BUDGET
+                            or len(current) >= config.BATCH_MAX_ITEMS):
+                batches.append(current)
+                current = {}
+                current_tokens = 0
+            current[req_id] = text
+            current_tokens += tokens
         
+        if current:
+            batches.append(current)
+        return batches
+    
+    def _process_scores(self, scores: Dict) -> Dict:
+        """점수 처리 및 집계"""
+        summary = ScoreMatrix.from_scores(self.rule_table, [scores]).summaries()[0]
+        summary["scores"] = scores
+        return summary
+    
+    def _process_batch_scores(self, scores_by_id: Dict[str, Dict]) -> Dict[str, Dict]:
+        """여러 평가 결과를 한 번의 행렬 연산으로 집계"""
+        ids = list(scores_by_id)
+        summaries = ScoreMatrix.from_scores(self.rule_table, [scores_by_id[req_id] for req_id in ids]).summaries()
+        for req_id, summary in zip(ids, summaries):
+            summary["scores"] = scores_by_id[req_id]
+        return dict(zip(ids, summaries))
+    
+    def compare_scores(self, original_scores, improved_scores) -> Dict:
+        """
+        규칙별 점수 변화 (N/A가 아닌 규칙만)
+        
+        평가 결과 dict 또는 ScoreRecord를 받으며, 원본 결과를 복사해 넣지 않음
+        """
+        original = ScoreRecord.coerce(original_scores, self.rule_table)
+        improved = ScoreRecord.coerce(improved_scores, self.rule_table)
         return {
-            "original": original_scores,
-            "improved": improved_scores,
-            "changes": changes,
-            "total_improvement": improved_scores.get("total", 0) - original_scores.get("total", 0)
-        }
\ No newline at end of file
+            "changes": original.changes(improved),
+            "total_improvement": improved.total - original.total
+        }
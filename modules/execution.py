@@ -0,0 +1,195 @@
+"""
+프로세스 공용 실행 서비스 (여러 사용자 세션의 요청을 제한된 작업자 스레드에서 공평하게 처리)
+"""
+import contextvars
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+import config
+
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class ExecutionService:
+    """
+    사용자별 대기열을 돌아가며 하나씩 꺼내 실행하는 작업자 풀
+
+    요청이 많은 사용자가 있어도 다른 사용자의 요청이 뒤로 밀리지 않도록 사용자별 대기열을 순서대로 돌고,
+    한 사용자가 동시에 점유할 수 있는 작업자 수를 제한. 같은 사용자가 같은 키로 요청하면 진행 중인 작업을 공유.
+    호출자는 작업 ID로 상태를 조회하므로 화면 스레드가 결과를 기다리며 멈추지 않음
+    """
+
+
+    def __init__(
+        self,
+        max_workers: int = config.EXECUTION_MAX_WORKERS,
+        max_per_user: int = config.EXECUTION_MAX_PER_USER,
+        result_ttl: float = config.EXECUTION_RESULT_TTL
+    ):
+        """
+        Args:
+            max_workers: 작업자 스레드 수 (프로세스 전체에서 동시에 실행하는 요청 수)
+            max_per_user: 사용자 1명이 동시에 점유할 수 있는 작업자 수
+            result_ttl: 끝난 작업의 결과를 보관하는 시간(초)
+        """
+        self.max_workers = max_workers
+        self.max_per_user = max_per_user
+        self.result_ttl = result_ttl
+
+        self._cond = threading.Condition()
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._queues: Dict[str, Deque[str]] = {}
+        self._users: Deque[str] = deque()
+        self._running: Dict[str, int] = {}
+        self._inflight: Dict[str, str] = {}
+        self._threads: List[threading.Thread] = []
+
+    def submit(self, user: str, key: Optional[str], fn: Callable[[Callable[..., None]], Any]) -> str:
+        """
+        작업 등록 후 작업 ID 반환
+
+        Args:
+            user: 공평 분배 단위 (API 키 해시 등)
+            key: 중복 판별 키 (같은 사용자의 같은 키 작업이 대기/실행 중이면 그 작업 ID 반환, None이면 항상 새 작업)
+            fn: 작업 함수. 진행 상황을 기록할 report(**fields) 함수를 받아 결과를 반환
+                (현재 호출 태그 등 컨텍스트를 유지한 채 작업자 스레드에서 실행)
+        """
+        with self._cond:
+            self._purge()
+            dedup_key = f"{user}\x00{key}" if key is not None else None
+            if dedup_key in self._inflight:
+                task = self._tasks[self._inflight[dedup_key]]
+                task["waiters"] += 1
+                return task["id"]
+
+            task_id = uuid.uuid4().hex
+            self._tasks[task_id] = {
+                "id": task_id,
+                "user": user,
+                "key": dedup_key,
+                "state": QUEUED,
+                "submitted": time.time(),
+                "started": None,
+                "finished": None,
+                "waiters": 1,
+                "progress": {},
+                "result": None,
+                "error": None,
+                "fn": fn,
+                "context": contextvars.copy_context()
+            }
+            if dedup_key is not None:
+                self._inflight[dedup_key] = task_id
+            if user not in self._queues:
+                self._queues[user] = deque()
+                self._users.append(user)
+            self._queues[user].append(task_id)
+
+            self._start_workers()
+            self._cond.notify()
+        return task_id
+
+    def status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        작업 상태 (없거나 보관 시간이 지났으면 None)
+
+        {"id", "state", "ahead": 먼저 실행될 대기 작업 수(추정), "progress", "result", "error", "waiters", "submitted", "started", "finished"}
+        """
+        with self._cond:
+            self._purge()
+            task = self._tasks.get(task_id)
+            if task is None:
+                return None
+            snapshot = {key: value for key, value in task.items() if key not in ("fn", "context", "key")}
+            snapshot["progress"] = dict(task["progress"])
+            snapshot["ahead"] = self._ahead(task) if task["state"] == QUEUED else 0
+            return snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        """대기/실행 중인 작업 수, 대기열이 있는 사용자 수, 작업자 수"""
+        with self._cond:
+            return {
+                "queued": sum(len(queue) for queue in self._queues.values()),
+                "running": sum(self._running.values()),
+                "users": len(self._users),
+                "workers": self.max_workers
+            }
+
+    def _ahead(self, task: Dict[str, Any]) -> int:
+        """사용자별 순환 순서로 이 작업보다 먼저 실행될 대기 작업 수 (점유 한도는 고려하지 않은 추정)"""
+        position = self._queues[task["user"]].index(task["id"])
+        return position + sum(
+            min(len(queue), position + (1 if self._users.index(user) < self._users.index(task["user"]) else 0))
+            for user, queue in self._queues.items() if user != task["user"]
+        )
+
+    def _next_task(self) -> Optional[Dict[str, Any]]:
+        """대기 작업이 있고 점유 한도를 넘지 않은 다음 사용자의 첫 작업 (사용자 순서는 매번 순환)"""
+        for _ in range(len(self._users)):
+            user = self._users[0]
+            self._users.rotate(-1)
+            if self._queues[user] and self._running.get(user, 0) < self.max_per_user:
+                return self._tasks[self._queues[user].popleft()]
+        return None
+
+    def _start_workers(self):
+
+        while len(self._threads) < self.max_workers:
+            thread = threading.Thread(target=self._work, name=f"execution-worker-{len(self._threads)}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self):
+
+        while True:
+            with self._cond:
+                task = self._next_task()
+                while task is None:
+                    self._cond.wait()
+                    task = self._next_task()
+                task["state"] = RUNNING
+                task["started"] = time.time()
+                self._running[task["user"]] = self._running.get(task["user"], 0) + 1
+                fn, context = task.pop("fn"), task.pop("context")
+
+            def report(**fields):
+                with self._cond:
+                    task["progress"].update(fields)
+
+            try:
+                result, error = context.run(fn, report), None
+            except Exception as e:
+                result, error = None, str(e)
+
+            with self._cond:
+                task["state"] = DONE if error is None else FAILED
+                task["result"] = result
+                task["error"] = error
+                task["finished"] = time.time()
+                self._running[task["user"]] -= 1
+                if task["key"] is not None:
+                    self._inflight.pop(task["key"], None)
+                self._drop_idle_user(task["user"])
+                self._cond.notify_all()
+
+    def _drop_idle_user(self, user: str):
+        """대기/실행 중인 작업이 없는 사용자를 순환 목록에서 제거"""
+        if not self._queues[user] and not self._running.get(user):
+            del self._queues[user]
+            self._running.pop(user, None)
+            self._users.remove(user)
+
+    def _purge(self):
+        """보관 시간이 지난 끝난 작업 삭제"""
+        expired = time.time() - self.result_ttl
+        for task_id in [
+            task_id for task_id, task in self._tasks.items()
+            if task["finished"] is not None and task["finished"] < expired
+        ]:
+            del self._tasks[task_id]
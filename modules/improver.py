@@ -1,10 +1,22 @@
 """
 요구사항 개선 로직
 """
-from typing import Dict, List
+import asyncio
+import re
+from typing import Dict, Iterator, List, Optional
 from .ai_client import AIClient
 
 
+# Quality.md 출력 형식의 "### 2. 개선된 요구사항" 섹션과 그 다음 섹션 제목
+IMPROVED_SECTION_PATTERN = re.compile(r'^###\s*2\..*$', re.MULTILINE)
+NEXT_SECTION_PATTERN = re.compile(r'^###\s', re.MULTILINE)
+
+# 개선된 요구사항 섹션 안의 "**요구사항 1**: ...", "**패턴**: ...", "**분리 이유**: ..." 줄
+REQUIREMENT_HEADER_PATTERN = re.compile(r'^\**\s*요구사항\s*(\d+)\s*\**\s*[:：]\s*\**\s*(.*)$')
+PATTERN_LINE_PATTERN = re.compile(r'^\**\s*(?:적용된\s*)?패턴\s*\**\s*[:：]\s*\**\s*(.*?)\s*\**\s*$')
+META_LINE_PATTERN = re.compile(r'^\**\s*(분리\s*이유|주요\s*개선\s*사항)')
+
+
 class RequirementImprover:
  
     
@@ -30,35 +42,128 @@ class RequirementImprover:
             receiver=receiver
         )
         
+        return self.build_result(original_text, improved_text, subject, system, receiver)
+    
+    async def improve_async(
+        self,
+        original_text: str,
+        subject: str,
+        system: str,
+        receiver: str
+    ) -> Dict:
+        """improve의 비동기 버전 (AsyncAIClient가 아니면 스레드에서 동기 호출)"""
+        if not hasattr(self.ai_client, "improve_requirement_async"):
+            return await asyncio.to_thread(self.improve, original_text, subject, system, receiver)
+        
+        improved_text = await self.ai_client.improve_requirement_async(
+            quality_prompt=self.quality_prompt,
+            original_text=original_text,
+            subject=subject,
+            system=system,
+            receiver=receiver
+        )
+        
+        return self.build_result(original_text, improved_text, subject, system, receiver)
+    
+    def improve_stream(
+        self,
+        original_text: str,
+        subject: str,
+        system: str,
+        receiver: str
+    ) -> Iterator[str]:
+        """개선 결과를 텍스트 조각 단위로 스트리밍"""
+        return self.ai_client.improve_requirement_stream(
+            quality_prompt=self.quality_prompt,
+            original_text=original_text,
+            subject=subject,
+            system=system,
+            receiver=receiver
+        )
+    
+    def build_result(
+        self,
+        original_text: str,
+        improved_text: str,
+        subject: str,
+        system: str,
+        receiver: str
+    ) -> Dict:
+        """개선 응답 전체 텍스트로 결과 구성"""
+        section = self.extract_improved_section(improved_text)
         return {
             "original": original_text,
             "improved": improved_text,
+            "requirement": section,
+            "requirements": self.parse_improved_requirements(section),
             "subject": subject,
             "system": system,
             "receiver": receiver
         }
     
+    def extract_improved_section(self, improved_text: str, complete: bool = True) -> Optional[str]:
+        """
+        응답에서 "### 2. 개선된 요구사항" 섹션 본문 추출
+        
+        Args:
+            improved_text: 개선 응답 텍스트 (스트리밍 중이면 지금까지 받은 부분)
+            complete: 응답이 끝났는지 여부. False이면 다음 섹션이 시작되기 전까지 None 반환
+        """
+        start = IMPROVED_SECTION_PATTERN.search(improved_text)
+        if not start:
+            return improved_text.strip() if complete else None
+        
+        end = NEXT_SECTION_PATTERN.search(improved_text, start.end())
+        if end:
+            section = improved_text[start.end():end.start()]
+        elif complete:
+            section = improved_text[start.end():]
+        else:
+            return None
+        
+        return section.strip() or improved_text.strip()
+    
     def parse_improved_requirements(self, improved_text: str) -> List[Dict]:
-
-        requirements = []
+        """
+        개선된 요구사항 섹션을 개별 요구사항으로 분리
         
-        # "요구사항 1:", "요구사항 2:" 등으로 분리
-        lines = improved_text.split('\n')
+        "**요구사항 1**: ..." 형식이 없으면 섹션 전체를 요구사항 1개로 반환.
+        "**패턴**"은 pattern으로, "**분리 이유**"/"**주요 개선 사항**" 이후는 설명이므로 제외
+        """
+        requirements = []
         current_req = None
+        in_meta = False
         
-        for line in lines:
-            if line.strip().startswith('요구사항'):
-                if current_req:
-                    requirements.append(current_req)
+        for line in improved_text.split('\n'):
+            stripped = line.strip()
+            if not stripped:
+                continue
+            
+            header = REQUIREMENT_HEADER_PATTERN.match(stripped)
+            pattern = PATTERN_LINE_PATTERN.match(stripped)
+            
+            if header:
                 current_req = {
-                    'number': len(requirements) + 1,
-                    'text': '',
+                    'number': int(header.group(1)),
+                    'text': header.group(2).strip(),
                     'pattern': 'Ubiquitous'  # 기본값
                 }
-            elif current_req and line.strip():
-                current_req['text'] += line.strip() + ' '
-        
-        if current_req:
-            requirements.append(current_req)
+                requirements.append(current_req)
+                in_meta = False
+            elif pattern:
+                if current_req is None and requirements:
+                    current_req = requirements[-1]
+                if current_req is not None:
+                    current_req['pattern'] = pattern.group(1)
+            elif META_LINE_PATTERN.match(stripped):
+                current_req = None
+                in_meta = True
+            elif in_meta:
+                continue
+            else:
+                if current_req is None:
+                    current_req = {'number': len(requirements) + 1, 'text': '', 'pattern': 'Ubiquitous'}
+                    requirements.append(current_req)
+                current_req['text'] = f"{current_req['text']} {stripped}".strip()
         
-        return requirements
\ No newline at end of file
+        return [req for req in requirements if req['text']]
@@ -0,0 +1,81 @@
+"""
+개선 전후 텍스트 차이로 다시 평가할 규칙 추정
+"""
+import difflib
+import re
+from typing import List, Optional
+from .cache import normalize_text
+from .rules import RULE_TABLE
+import config
+
+
+TOKEN_PATTERN = re.compile(r'\w+|[^\w\s]')
+
+# 변경된 토큰에 포함되면 영향을 받는 규칙
+DIFF_RULE_TRIGGERS = [
+    # 의무형 동사
+    (re.compile(r'해야|하여야|한다|된다|shall|must|should|will|권장|할 수 있', re.I), ["P2", "R2", "R3"]),
+    # 모호한 용어 / 도피 조항 / 열린 조항
+    (re.compile(r'적절|충분|보장|빠르|신속|가능한|최대한|효율|등$|appropriate|adequate|sufficient|possible|etc', re.I),
+     ["R7", "R8", "R9", "C3", "C7"]),
+    # 수치 / 단위 / 범위
+    (re.compile(r'\d|ms$|km|%|초$|분$|이내|이상|이하|미만|초과|±', re.I), ["P5", "R6", "R33", "R34", "R35", "R40", "C7"]),
+    # 결합자 / 열거 / 사선
+    (re.compile(r'^(및|그리고|또는|혹은|하고|하며|and|or|,|/)$', re.I), ["C5", "R15", "R17", "R18", "R19", "R22"]),
+    # 조건
+    (re.compile(r'경우|때$|동안|이면|하면|^if$|^when$|^while$|^unless$', re.I), ["P6", "R27", "R28"]),
+    # 보편적 한정어 / 절대값
+    (re.compile(r'모든|전체|항상|절대|^all$|^any$|^every$|^always$|^never$', re.I), ["R26", "R32"]),
+    # 부정
+    (re.compile(r'않|없|금지|^not$|^no$', re.I), ["R16"]),
+    # 대명사
+    (re.compile(r'^(그것|이것|해당|it|this|that|they)$', re.I), ["R24"]),
+    # 괄호
+    (re.compile(r'^[()]$'), ["R21"]),
+    # 목적 구문 / 한정 절
+    (re.compile(r'위해|위하여|목적|^so$|^order$', re.I), ["R20", "P7"]),
+    # 약어 / 용어
+    (re.compile(r'^[A-Z]{2,}'), ["R4", "R37", "R38"]),
+]
+
+# 변경이 있으면 항상 다시 평가하는 규칙 (행동/객체, 명확성, 문장 구조/문법)
+BASE_RULES = ["P3", "P4", "C3", "R1", "R12", "R13", "R14"]
+
+# 주어(첫 토큰)가 바뀌었을 때 다시 평가하는 규칙
+SUBJECT_RULES = ["P1", "R3", "R5"]
+
+
+def affected_rules(original_text: str, revised_text: str) -> Optional[List[str]]:
+    """
+    개선 전후 차이로 영향을 받는 규칙 목록
+
+    Returns:
+        []: 공백 외에는 변경 없음 (원본 점수 재사용)
+        규칙 목록: 작은 변경 (해당 규칙만 다시 평가)
+        None: 변경이 커서 전체 평가 필요
+    """
+    original = normalize_text(original_text)
+    revised = normalize_text(revised_text)
+    if original == revised:
+        return []
+
+    original_tokens = TOKEN_PATTERN.findall(original)
+    revised_tokens = TOKEN_PATTERN.findall(revised)
+    matcher = difflib.SequenceMatcher(a=original_tokens, b=revised_tokens, autojunk=False)
+    if matcher.ratio() < config.INCREMENTAL_MIN_SIMILARITY:
+        return None
+
+    rules = set(BASE_RULES)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        if i1 == 0 or j1 == 0:
+            rules.update(SUBJECT_RULES)
+        for token in original_tokens[i1:i2] + revised_tokens[j1:j2]:
+            for pattern, triggered in DIFF_RULE_TRIGGERS:
+                if pattern.search(token):
+                    rules.update(triggered)
+
+    if len(rules) > len(RULE_TABLE.rules) * config.INCREMENTAL_MAX_RULE_RATIO:
+        return None
+    return [rule for rule in RULE_TABLE.rules if rule in rules]
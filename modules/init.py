@@ -1,2 +0,0 @@
-# app.py
-from modules import AIClient, RequirementImprover, RequirementEvaluator
\ No newline at end of file
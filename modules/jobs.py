@@ -0,0 +1,458 @@
+"""
+일괄 처리 작업 큐 (SQLite에 요구사항별 상태 저장, 재시작 후 이어서 처리)
+"""
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+from .bulk import BulkProcessor
+from .execution import ExecutionService
+from .metrics import call_context
+from .pipeline import RequirementPipeline
+from .rules import ScoreRecord
+from .set_analysis import SetAnalyzer
+import config
+
+
+PENDING = "pending"
+IMPROVING = "improving"
+SCORING = "scoring"
+DONE = "done"
+FAILED = "failed"
+
+STATUSES = [PENDING, IMPROVING, SCORING, DONE, FAILED]
+ACTIVE_STATUSES = [IMPROVING, SCORING]
+
+# 파이프라인 단계 → 요구사항 상태
+PHASE_STATUS = {"improve": IMPROVING, "score-improved": SCORING}
+
+# 중간 결과 파일에 기록하는 끝나지 않은 요구사항의 상태
+PENDING_LABELS = {PENDING: "대기 중", IMPROVING: "개선 중", SCORING: "평가 중"}
+
+
+class JobStore:
+
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: SQLite 파일 경로
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                owner TEXT NOT NULL DEFAULT '',
+                name TEXT NOT NULL,
+                output TEXT,
+                subject TEXT NOT NULL,
+                system TEXT NOT NULL,
+                receiver TEXT NOT NULL,
+                total INTEGER NOT NULL,
+                created REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS items (
+                job_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                req_id TEXT NOT NULL,
+                text TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                updated REAL NOT NULL,
+                PRIMARY KEY (job_id, seq)
+            );
+            CREATE INDEX IF NOT EXISTS idx_items_status ON items (status);
+        """)
+        
+        # 소유자 열이 없던 이전 형식의 작업은 소유자 없음('')으로 남아 어떤 사용자에게도 표시/처리되지 않음
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")]
+        if "owner" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT NOT NULL DEFAULT ''")
+        if "output" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN output TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_owner ON jobs (owner, created)")
+        self._conn.commit()
+
+    def create_job(self, owner: str, name: str, requirements: Iterable[Dict], subject: str, system: str, receiver: str) -> str:
+        """
+        요구사항({"id", "text"}) 목록으로 작업 생성 후 작업 ID 반환
+        
+        owner: 작업 소유자 (API 키 해시, 소유자의 API 키로만 처리되고 소유자에게만 표시)
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        rows = [
+            (job_id, seq, requirement["id"], requirement["text"], PENDING, now)
+            for seq, requirement in enumerate(requirements)
+        ]
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, owner, name, subject, system, receiver, total, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, owner, name, subject, system, receiver, len(rows), now)
+            )
+            self._conn.executemany(
+                "INSERT INTO items (job_id, seq, req_id, text, status, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+        return job_id
+
+    def claim_next(self, owners: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """지정한 소유자들의 작업 중 가장 오래된 작업의 대기 중인 요구사항 1건을 처리 중(improving)으로 바꾸고 반환"""
+        owners = list(owners)
+        if not owners:
+            return None
+        
+        with self._lock:
+            row = self._conn.execute(f"""
+                SELECT items.job_id, items.seq, items.req_id, items.text, jobs.subject, jobs.system, jobs.receiver, jobs.owner
+                FROM items JOIN jobs ON jobs.id = items.job_id
+                WHERE items.status = ? AND jobs.owner IN ({", ".join("?" * len(owners))})
+                ORDER BY jobs.created, items.seq
+                LIMIT 1
+            """, (PENDING, *owners)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE items SET status = ?, updated = ? WHERE job_id = ? AND seq = ?",
+                (IMPROVING, time.time(), row[0], row[1])
+            )
+            self._conn.commit()
+
+        keys = ["job_id", "seq", "id", "text", "subject", "system", "receiver", "owner"]
+        return dict(zip(keys, row))
+
+    def set_status(self, job_id: str, seq: int, status: str):
+
+        self._update(job_id, seq, status=status)
+
+    def complete(self, job_id: str, seq: int, result: Dict[str, Any]):
+
+        self._update(job_id, seq, status=DONE, result=json.dumps(result, ensure_ascii=False), error=None)
+
+    def fail(self, job_id: str, seq: int, error: str):
+
+        self._update(job_id, seq, status=FAILED, error=error)
+
+    def requeue_interrupted(self) -> int:
+        """처리 도중 중단된(프로세스 종료 등) 요구사항을 대기 상태로 되돌림"""
+        return self._requeue("status IN (?, ?)", ACTIVE_STATUSES)
+
+    def retry_failed(self, job_id: str) -> int:
+        """실패한 요구사항을 다시 대기 상태로 (결과 파일은 다시 생성)"""
+        self.set_output(job_id, None)
+        return self._requeue("job_id = ? AND status = ?", [job_id, FAILED])
+
+    def set_output(self, job_id: str, path: Optional[str]):
+        """작업 결과 파일 경로 기록 (None이면 다시 생성할 대상으로)"""
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET output = ? WHERE id = ?", (path, job_id))
+            self._conn.commit()
+
+    def output(self, job_id: str) -> Optional[str]:
+        """작업 결과 파일 경로 (아직 없으면 None)"""
+        with self._lock:
+            row = self._conn.execute("SELECT output FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def finished_without_output(self, owner: str) -> List[Dict[str, Any]]:
+        """모든 요구사항이 끝났지만(완료/실패) 결과 파일이 아직 없는 소유자의 작업 ({"id", "name"})"""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT id, name FROM jobs
+                WHERE owner = ? AND output IS NULL AND NOT EXISTS (
+                    SELECT 1 FROM items WHERE items.job_id = jobs.id AND items.status NOT IN (?, ?)
+                )
+                ORDER BY created
+            """, (owner, DONE, FAILED)).fetchall()
+        return [{"id": job_id, "name": name} for job_id, name in rows]
+
+    def delete_job(self, job_id: str):
+
+        with self._lock:
+            self._conn.execute("DELETE FROM items WHERE job_id = ?", (job_id,))
+            self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            self._conn.commit()
+
+    def list_jobs(self, owner: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """소유자의 최근 작업 목록 (상태별 요구사항 수, 결과 파일 경로 포함)"""
+        with self._lock:
+            jobs = self._conn.execute(
+                "SELECT id, name, total, created, output FROM jobs WHERE owner = ? ORDER BY created DESC LIMIT ?", (owner, limit)
+            ).fetchall()
+        return [
+            {"id": job_id, "name": name, "total": total, "created": created, "output": output, "counts": self.counts(job_id)}
+            for job_id, name, total, created, output in jobs
+        ]
+
+    def counts(self, job_id: str) -> Dict[str, int]:
+        """상태별 요구사항 수"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM items WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall()
+        counts = {status: 0 for status in STATUSES}
+        counts.update(dict(rows))
+        return counts
+
+    def records(self, job_id: str, with_results: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        요구사항별 처리 결과 (입력 순서)
+
+        config.JOB_RECORDS_PAGE_SIZE건씩 나누어 읽으므로 큰 작업도 전체 결과를 메모리에 올리지 않음.
+        with_results=False면 결과 JSON은 읽지 않음 (result는 None)
+        """
+        result_column = "result" if with_results else "NULL"
+        last_seq = -1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT seq, req_id, text, status, {result_column}, error FROM items "
+                    "WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                    (job_id, last_seq, config.JOB_RECORDS_PAGE_SIZE)
+                ).fetchall()
+            for seq, req_id, text, status, result, error in rows:
+                yield {
+                    "seq": seq,
+                    "id": req_id,
+                    "text": text,
+                    "status": status,
+                    "result": json.loads(result) if result else None,
+                    "error": error
+                }
+            if len(rows) < config.JOB_RECORDS_PAGE_SIZE:
+                return
+            last_seq = rows[-1][0]
+
+    def _update(self, job_id: str, seq: int, **fields):
+
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE items SET {assignments}, updated = ? WHERE job_id = ? AND seq = ?",
+                (*fields.values(), time.time(), job_id, seq)
+            )
+            self._conn.commit()
+
+    def _requeue(self, condition: str, params: List[Any]) -> int:
+
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE items SET status = ?, error = NULL, updated = ? WHERE {condition}",
+                (PENDING, time.time(), *params)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+
+class JobRunner:
+
+
+    def __init__(
+        self,
+        store: JobStore,
+        service: ExecutionService,
+        max_in_flight: int = config.JOB_MAX_IN_FLIGHT,
+        poll_interval: float = config.JOB_POLL_INTERVAL,
+        output_dir: Path = config.JOB_OUTPUT_DIR
+    ):
+        """
+        Args:
+            store: 작업 저장소
+            service: 요구사항을 실행할 실행 서비스 (단건 개선 요청과 같은 사용자별 대기열/작업자를 공유)
+            max_in_flight: 소유자별로 실행 서비스에 넘겨 둘 최대 요구사항 수 (나머지는 저장소에서 대기)
+            poll_interval: 대기 중인 요구사항이 없을 때 다시 확인하는 주기(초)
+            output_dir: 결과 파일 저장 폴더 (소유자별 하위 폴더)
+
+        생성 시 이전 실행에서 중단된 요구사항을 대기 상태로 되돌림.
+        이미 완료된 요구사항은 다시 처리하지 않고, 중단된 요구사항도 결과 캐시에 남은 개선/평가 결과는 재사용
+        """
+        self.store = store
+        self.service = service
+        self.max_in_flight = max_in_flight
+        self.poll_interval = poll_interval
+        self.output_dir = Path(output_dir)
+        self.pipelines: Dict[str, RequirementPipeline] = {}
+        self.export_errors: Dict[str, str] = {}
+
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, int] = {}
+        self._exporting: Set[str] = set()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.store.requeue_interrupted()
+
+    def start(self, owner: str, pipeline: RequirementPipeline) -> "JobRunner":
+        """
+        소유자의 작업을 처리할 파이프라인을 등록하고 배분 스레드 시작
+
+        요구사항은 그 작업 소유자의 파이프라인(API 키)으로, 실행 서비스의 소유자 대기열에서 처리하므로
+        일괄 작업도 사용자별 공평 분배와 점유 한도를 따름. 등록되지 않은 소유자의 작업은 소유자가 다시 접속할 때까지 대기.
+        이미 등록된 소유자는 이후 요구사항부터 새 파이프라인 사용
+        """
+        self.pipelines[owner] = pipeline
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._dispatch, name="job-dispatcher", daemon=True)
+            self._thread.start()
+        self._wake.set()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        """배분 중지 (실행 서비스에 이미 넘긴 요구사항은 끝까지 처리)"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, owner: str, name: str, requirements: Iterable[Dict], subject: str, system: str, receiver: str) -> str:
+        """작업 등록 후 작업 ID 반환"""
+        job_id = self.store.create_job(owner, name, requirements, subject, system, receiver)
+        self._wake.set()
+        return job_id
+
+    def retry_failed(self, job_id: str) -> int:
+        """실패한 요구사항을 다시 처리하고 결과 파일(집합 분석 포함)을 다시 생성"""
+        output = self.store.output(job_id)
+        if output:
+            Path(output).unlink(missing_ok=True)
+        with self._lock:
+            self.export_errors.pop(job_id, None)
+        count = self.store.retry_failed(job_id)
+        self._wake.set()
+        return count
+
+    def _dispatch(self):
+
+        while not self._stop.is_set():
+            self._wake.clear()
+            if not self._dispatch_ready():
+                self._wake.wait(self.poll_interval)
+
+    def _dispatch_ready(self) -> bool:
+        """
+        실행 중인 요구사항이 한도 미만인 소유자마다 대기 요구사항 1건씩 실행 서비스에 넘김 (넘긴 것이 있으면 True)
+
+        모든 요구사항이 끝난 작업은 집합 분석과 결과 파일 생성을 실행 서비스에 넘김 (화면은 저장된 파일만 표시)
+        """
+        dispatched = False
+        for owner in list(self.pipelines):
+            self._dispatch_exports(owner)
+            with self._lock:
+                if self._in_flight.get(owner, 0) >= self.max_in_flight:
+                    continue
+            item = self.store.claim_next([owner])
+            if item is None:
+                continue
+
+            with self._lock:
+                self._in_flight[owner] = self._in_flight.get(owner, 0) + 1
+            self.service.submit(owner, None, lambda report, item=item: self._run(item))
+            dispatched = True
+        return dispatched
+
+    def _dispatch_exports(self, owner: str):
+
+        for job in self.store.finished_without_output(owner):
+            with self._lock:
+                if job["id"] in self._exporting or job["id"] in self.export_errors:
+                    continue
+                self._exporting.add(job["id"])
+            self.service.submit(owner, f"export:{job['id']}", lambda report, job=job: self._run_export(owner, job))
+
+    def _run_export(self, owner: str, job: Dict[str, Any]):
+        """실행 서비스 작업자에서 작업 결과 파일 생성 (실패하면 다시 처리 요청 전까지 재시도하지 않음)"""
+        try:
+            with call_context(job=job["id"]):
+                self.store.set_output(job["id"], str(self.export(owner, job)))
+        except Exception as e:
+            with self._lock:
+                self.export_errors[job["id"]] = str(e)
+            raise
+        finally:
+            with self._lock:
+                self._exporting.discard(job["id"])
+
+    def export(self, owner: str, job: Dict[str, Any]) -> Path:
+        """
+        작업 결과를 엑셀 파일로 기록하고 경로 반환
+
+        문서 전체의 중복/상충을 분석하여(유사한 요구사항 묶음만 LLM으로 판정) 집합 규칙 점수와 판정 목록을 함께 기록.
+        집합 분석에는 요구사항 텍스트만 읽고, 처리 결과는 저장소에서 읽는 대로 파일에 기록
+        """
+        pipeline = self.pipelines[owner]
+        ai_client = pipeline.evaluator.ai_client
+        analyzer = SetAnalyzer(ai_client, ai_client.load_prompt(config.SET_PROMPT_FILE))
+        set_analysis = analyzer.analyze(list(self.store.records(job["id"], with_results=False)))
+
+        path = BulkProcessor(pipeline).export(self.store.records(job["id"]), self.output_path(owner, job), set_analysis)
+        self.partial_path(owner, job).unlink(missing_ok=True)
+        return path
+
+    def export_partial(self, owner: str, job: Dict[str, Any]) -> Path:
+        """
+        진행 중인 작업의 현재까지 결과를 엑셀 파일로 기록하고 경로 반환
+
+        집합 분석은 모든 요구사항이 끝난 뒤 최종 파일에만 반영하고, 아직 끝나지 않은 요구사항은 결과 없이 상태만 기록
+        """
+        records = (
+            record if record["status"] in (DONE, FAILED) else {**record, "error": PENDING_LABELS[record["status"]]}
+            for record in self.store.records(job["id"])
+        )
+        return BulkProcessor(self.pipelines[owner]).export(records, self.partial_path(owner, job))
+
+    def output_path(self, owner: str, job: Dict[str, Any]) -> Path:
+        """최종 결과 파일 경로"""
+        return self.output_dir / owner / f"{Path(job['name']).stem}_improved_{job['id'][:8]}.xlsx"
+
+    def partial_path(self, owner: str, job: Dict[str, Any]) -> Path:
+        """중간 결과 파일 경로 (최종 결과 파일을 만들면 삭제)"""
+        return self.output_dir / owner / f"{Path(job['name']).stem}_partial_{job['id'][:8]}.xlsx"
+
+    def _run(self, item: Dict[str, Any]):
+        """실행 서비스 작업자에서 요구사항 1건 처리 (끝나면 소유자의 실행 중 요구사항 수를 줄이고 배분 재개)"""
+        try:
+            self._process(item)
+        finally:
+            with self._lock:
+                self._in_flight[item["owner"]] -= 1
+            self._wake.set()
+
+    def _process(self, item: Dict[str, Any]):
+        """요구사항 1건 처리 (단계별 상태 기록)"""
+        pipeline = self.pipelines[item["owner"]]
+
+        def on_phase(phase: str):
+            if phase in PHASE_STATUS:
+                self.store.set_status(item["job_id"], item["seq"], PHASE_STATUS[phase])
+
+        try:
+            with call_context(job=item["job_id"]):
+                result = pipeline.run(
+                    original_text=item["text"],
+                    subject=item["subject"],
+                    system=item["system"],
+                    receiver=item["receiver"],
+                    on_phase=on_phase
+                )
+        except Exception as e:
+            self.store.fail(item["job_id"], item["seq"], str(e))
+            return
+        
+        # 점수는 규칙별 이유 없이 압축 형식으로 저장 (내보내기에는 점수만 필요)
+        table = pipeline.evaluator.rule_table
+        self.store.complete(item["job_id"], item["seq"], {
+            "improved_result": result["improved_result"],
+            "original_scores": ScoreRecord.from_result(result["original_scores"], table, keep_reasons=False).dump(),
+            "improved_scores": ScoreRecord.from_result(result["improved_scores"], table, keep_reasons=False).dump()
+        })
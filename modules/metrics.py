@@ -0,0 +1,159 @@
+"""
+API 호출 계측 (지연 시간, 토큰 사용량, 예상 비용)
+"""
+import contextvars
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
+import config
+
+
+# 현재 호출의 태그 (phase, session 등). 스레드 풀로 넘길 때는 contextvars.copy_context() 사용
+_call_tags: contextvars.ContextVar = contextvars.ContextVar("call_tags", default={})
+
+TOKEN_FIELDS = ["input_tokens", "output_tokens", "cache_read_tokens", "cache_write_tokens"]
+
+
+@contextmanager
+def call_context(**tags):
+    """블록 안에서 발생하는 API 호출에 태그 추가 (예: phase="improve")"""
+    token = _call_tags.set({**_call_tags.get(), **tags})
+    try:
+        yield
+    finally:
+        _call_tags.reset(token)
+
+
+def current_tags() -> Dict[str, Any]:
+
+    return dict(_call_tags.get())
+
+
+def tagged_iter(iterator: Iterator, **tags) -> Iterator:
+    """제너레이터의 각 단계만 태그를 붙여 실행 (yield 중에는 호출자 쪽에 태그가 남지 않음)"""
+    while True:
+        with call_context(**tags):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def estimate_cost(model: str, record: Dict[str, Any]) -> float:
+    """토큰 사용량으로 예상 비용(USD) 계산"""
+    pricing = config.MODEL_PRICING.get(model, config.MODEL_PRICING["default"])
+    return (
+        record["input_tokens"] * pricing["input"]
+        + record["output_tokens"] * pricing["output"]
+        + record["cache_read_tokens"] * pricing["cache_read"]
+        + record["cache_write_tokens"] * pricing["cache_write"]
+    ) / 1_000_000
+
+
+def summarize(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """호출 기록 합계 및 단계별 요약"""
+    summary = {"calls": 0, "errors": 0, "retries": 0, "escalations": 0, "cost": 0.0, "latency": 0.0, **{key: 0 for key in TOKEN_FIELDS}}
+    phases: Dict[str, Dict[str, Any]] = {}
+    latencies: List[float] = []
+    ttfts: List[float] = []
+
+    for record in records:
+        phase = phases.setdefault(record.get("phase") or "-", {"calls": 0, "latency": 0.0, "cost": 0.0, **{key: 0 for key in TOKEN_FIELDS}})
+        for target in (summary, phase):
+            target["calls"] += 1
+            target["latency"] += record["latency"]
+            target["cost"] += record["cost"]
+            for key in TOKEN_FIELDS:
+                target[key] += record[key]
+        summary["retries"] += record["retries"]
+        summary["errors"] += 0 if record["ok"] else 1
+        summary["escalations"] += 1 if record.get("escalated") else 0
+        latencies.append(record["latency"])
+        if record["ttft"] is not None:
+            ttfts.append(record["ttft"])
+
+    latencies.sort()
+    summary["avg_latency"] = summary["latency"] / len(latencies) if latencies else 0.0
+    summary["p95_latency"] = latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0
+    summary["avg_ttft"] = sum(ttfts) / len(ttfts) if ttfts else 0.0
+    summary["phases"] = phases
+    return summary
+
+
+class JsonlExporter:
+
+
+    def __init__(self, path: Path):
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def __call__(self, record: Dict[str, Any]):
+
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+
+
+class PrometheusExporter:
+    """node_exporter textfile collector 형식으로 누적 지표 기록"""
+
+
+    def __init__(self, path: Path, prefix: str = "requirement_improver_api"):
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._totals: Dict[tuple, Dict[str, float]] = {}
+
+    def __call__(self, record: Dict[str, Any]):
+
+        key = (record.get("phase") or "-", record["model"])
+        with self._lock:
+            totals = self._totals.setdefault(key, {
+                "calls": 0, "errors": 0, "retries": 0, "latency": 0.0, "ttft": 0.0, "cost": 0.0,
+                **{field: 0 for field in TOKEN_FIELDS}
+            })
+            totals["calls"] += 1
+            totals["errors"] += 0 if record["ok"] else 1
+            totals["retries"] += record["retries"]
+            totals["latency"] += record["latency"]
+            totals["ttft"] += record["ttft"] or 0.0
+            totals["cost"] += record["cost"]
+            for field in TOKEN_FIELDS:
+                totals[field] += record[field]
+            self._write()
+
+    def _write(self):
+        """임시 파일에 쓴 뒤 교체 (수집기가 쓰는 도중의 파일을 읽지 않도록)"""
+        families = [
+            ("calls_total", "calls", "%d"),
+            ("errors_total", "errors", "%d"),
+            ("retries_total", "retries", "%d"),
+            ("latency_seconds_sum", "latency", "%.6f"),
+            ("ttft_seconds_sum", "ttft", "%.6f"),
+            ("cost_usd_total", "cost", "%.6f"),
+        ]
+        lines = []
+        for name, field, fmt in families:
+            lines.append(f"# TYPE {self.prefix}_{name} counter")
+            for (phase, model), totals in sorted(self._totals.items()):
+                lines.append(f'{self.prefix}_{name}{{phase="{phase}",model="{model}"}} ' + fmt % totals[field])
+        
+        lines.append(f"# TYPE {self.prefix}_tokens_total counter")
+        for (phase, model), totals in sorted(self._totals.items()):
+            for field in TOKEN_FIELDS:
+                token_type = field[:-len("_tokens")]
+                lines.append(f'{self.prefix}_tokens_total{{phase="{phase}",model="{model}",type="{token_type}"}} {totals[field]}')
+        
+        temp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(temp_path, self.path)
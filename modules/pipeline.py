@@ -0,0 +1,414 @@
+"""
+요구사항 개선 파이프라인
+"""
+import asyncio
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional
+from .improver import RequirementImprover
+from .evaluator import RequirementEvaluator
+from .combined import CombinedImprover
+from .cache import ResultCache, make_key, normalize_text
+from .metrics import call_context, tagged_iter
+from .incremental import affected_rules
+import config
+
+
+class RequirementPipeline:
+    
+    
+    def __init__(
+        self,
+        improver: RequirementImprover,
+        evaluator: RequirementEvaluator,
+        cache: Optional[ResultCache] = None,
+        combined: bool = config.COMBINED_MODE
+    ):
+        """
+        Args:
+            improver: 요구사항 개선기
+            evaluator: 요구사항 평가기
+            cache: 결과 캐시 (None이면 사용 안 함)
+            combined: 원본 평가, 개선, 개선본 평가를 한 번의 요청으로 수행할지 여부
+        """
+        self.improver = improver
+        self.evaluator = evaluator
+        self.cache = cache
+        self.combined = CombinedImprover(improver, evaluator) if combined else None
+        
+        # 프롬프트 내용이 바뀌면 캐시 키도 바뀌도록 해시를 미리 계산
+        # 단계별 모델이 바뀌어도 다른 키 (상위 모델 재평가를 쓰면 그 모델도 포함)
+        improve_model = improver.ai_client.phase_model("improve")[0]
+        score_models = [evaluator.ai_client.phase_model("score")[0]]
+        if evaluator.ai_client.can_escalate():
+            score_models.append(evaluator.ai_client.phase_model("escalate")[0])
+        self._improve_key = make_key(improve_model, make_key(improver.quality_prompt)) if cache else None
+        self._evaluate_key = make_key(*score_models, make_key(evaluator.scoring_prompt), *evaluator.local_rules) if cache else None
+        combined_model = improver.ai_client.phase_model("combined")[0]
+        self._combined_key = make_key(combined_model, self._improve_key, self._evaluate_key) if cache and combined else None
+    
+    def run(
+        self,
+        original_text: str,
+        subject: str,
+        system: str,
+        receiver: str,
+        on_phase: Optional[Callable[[str], None]] = None
+    ) -> Dict:
+        """
+        원본 평가와 개선을 동시에 수행한 뒤 개선된 요구사항만 이어서 평가
+        
+        on_phase가 있으면 개선("improve")과 개선본 평가("score-improved") 시작 시 호출 (단일 호출 모드는 "improve"만)
+        """
+        if self.combined:
+            if on_phase:
+                on_phase("improve")
+            return self.run_combined(original_text, subject, system, receiver)
+        
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # 1. 원본 평가 (개선 결과와 무관하므로 백그라운드에서 실행)
+            original_future = self._submit(executor, "score-original", self.evaluate, original_text)
+            
+            # 2. 요구사항 개선
+            if on_phase:
+                on_phase("improve")
+            with call_context(phase="improve"):
+                improved_result = self.improve(original_text, subject, system, receiver)
+            
+            # 3. 개선된 요구사항 평가 (개선 결과에 의존, 변경이 작으면 영향받는 규칙만)
+            if on_phase:
+                on_phase("score-improved")
+            with call_context(phase="score-improved"):
+                improved_scores = self.evaluate_revision(original_text, improved_result['requirement'], original_future)
+            original_scores = original_future.result()
+        
+        return {
+            "improved_result": improved_result,
+            "original_scores": original_scores,
+            "improved_scores": improved_scores
+        }
+    
+    def run_stream(
+        self,
+        original_text: str,
+        subject: str,
+        system: str,
+        receiver: str
+    ) -> Iterator[Dict]:
+        """
+        run의 스트리밍 버전
+        
+        개선 응답 조각마다 {"type": "delta", "text": ...}를, 마지막에 {"type": "done", "result": ...}를 반환.
+        "### 2. 개선된 요구사항" 섹션이 완성되는 즉시 개선된 요구사항 평가를 시작.
+        단일 호출 모드는 도구 입력이 끝나야 결과를 알 수 있으므로 전체 개선 응답을 한 조각으로 반환
+        """
+        if self.combined:
+            result = self.run_combined(original_text, subject, system, receiver)
+            yield {"type": "delta", "text": result["improved_result"]["improved"]}
+            yield {"type": "done", "result": result}
+            return
+        
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            original_future = self._submit(executor, "score-original", self.evaluate, original_text)
+            improved_future = None
+            chunks = []
+            
+            deltas = tagged_iter(self._improve_stream(original_text, subject, system, receiver), phase="improve")
+            for delta in deltas:
+                chunks.append(delta)
+                yield {"type": "delta", "text": delta}
+                
+                if improved_future is None:
+                    section = self.improver.extract_improved_section("".join(chunks), complete=False)
+                    if section:
+                        improved_future = self._submit(
+                            executor, "score-improved", self.evaluate_revision, original_text, section, original_future
+                        )
+            
+            improved_result = self.improver.build_result(original_text, "".join(chunks), subject, system, receiver)
+            if improved_future is None:
+                improved_future = self._submit(
+                    executor, "score-improved", self.evaluate_revision,
+                    original_text, improved_result['requirement'], original_future
+                )
+            
+            yield {
+                "type": "done",
+                "result": {
+                    "improved_result": improved_result,
+                    "original_scores": original_future.result(),
+                    "improved_scores": improved_future.result()
+                }
+            }
+    
+    def evaluate_revision(self, original_text: str, revised_text: str, original_future: Future) -> Dict:
+        """
+        개선된 요구사항 평가
+        
+        여러 요구사항으로 분리되었으면 각각 병렬로 평가하여 집계.
+        하나이면 공백만 달라진 경우 원본 점수를 그대로 쓰고, 작은 변경이면 영향받는 규칙만 다시 평가하여 원본 점수와 병합
+        """
+        items = self.improver.parse_improved_requirements(revised_text)
+        if len(items) > 1:
+            return self.evaluate_items(items)
+        if items:
+            revised_text = items[0]['text']
+        
+        rules = affected_rules(original_text, revised_text)
+        if rules is None:
+            return self.evaluate(revised_text)
+        
+        original_scores = original_future.result()
+        if not rules:
+            return {**original_scores, "rescored_rules": []}
+        return self.evaluator.rescore(revised_text, original_scores, rules)
+    
+    def evaluate_items(self, items: List[Dict]) -> Dict:
+        """분리된 요구사항들을 병렬로 평가하고 규칙별로 집계 (items에 요구사항별 결과 포함)"""
+        with ThreadPoolExecutor(max_workers=len(items)) as executor:
+            futures = [
+                self._submit(executor, "score-improved", self.evaluate, item['text'])
+                for item in items
+            ]
+            results = [future.result() for future in futures]
+        
+        combined = self.evaluator.combine_scores(results)
+        combined["items"] = [
+            {**item, "scores": result}
+            for item, result in zip(items, results)
+        ]
+        return combined
+    
+    def _submit(self, executor: ThreadPoolExecutor, phase: str, fn: Callable, *args) -> Future:
+        """현재 호출 태그(세션 등)를 유지하고 단계(phase) 태그를 붙여 스레드 풀에서 실행"""
+        context = contextvars.copy_context()
+        return executor.submit(context.run, self._run_phase, phase, fn, *args)
+    
+    @staticmethod
+    def _run_phase(phase: str, fn: Callable, *args):
+        
+        with call_context(phase=phase):
+            return fn(*args)
+    
+    async def run_async(self, original_text: str, subject: str, system: str, receiver: str) -> Dict:
+        """run의 비동기 버전 (원본 평가와 개선을 같은 이벤트 루프에서 동시에 수행)"""
+        if self.combined:
+            return await self.run_combined_async(original_text, subject, system, receiver)
+        
+        original_task = asyncio.create_task(self._run_phase_async("score-original", self.evaluate_async(original_text)))
+        try:
+            improved_result = await self._run_phase_async(
+                "improve", self.improve_async(original_text, subject, system, receiver)
+            )
+            improved_scores = await self._run_phase_async(
+                "score-improved", self.evaluate_revision_async(original_text, improved_result['requirement'], original_task)
+            )
+            original_scores = await original_task
+        except BaseException:
+            original_task.cancel()
+            raise
+        
+        return {
+            "improved_result": improved_result,
+            "original_scores": original_scores,
+            "improved_scores": improved_scores
+        }
+    
+    async def run_many_async(
+        self,
+        requirements: Dict[str, str],
+        subject: str,
+        system: str,
+        receiver: str,
+        max_in_flight: int = config.ASYNC_MAX_IN_FLIGHT,
+        progress_callback: Optional[Callable[[int], None]] = None
+    ) -> Dict[str, Dict]:
+        """
+        여러 요구사항을 이벤트 루프 하나에서 동시에 처리
+        
+        Args:
+            requirements: 요구사항 ID → 텍스트
+            max_in_flight: 동시에 처리할 요구사항 수 (API 동시 요청 수는 클라이언트 세마포어가 따로 제한)
+            progress_callback: 요구사항 1건이 끝날 때마다 완료 건수를 전달받을 함수
+        
+        Returns:
+            ID → run 결과 (실패 시 {"error"})
+        """
+        limit = asyncio.Semaphore(max_in_flight)
+        results: Dict[str, Dict] = {}
+        
+        async def process(req_id: str, text: str):
+            async with limit:
+                try:
+                    results[req_id] = await self.run_async(text, subject, system, receiver)
+                except Exception as e:
+                    results[req_id] = {"error": str(e)}
+            if progress_callback:
+                progress_callback(len(results))
+        
+        await asyncio.gather(*(process(req_id, text) for req_id, text in requirements.items()))
+        return {req_id: results[req_id] for req_id in requirements}
+    
+    async def evaluate_revision_async(self, original_text: str, revised_text: str, original_task: Awaitable) -> Dict:
+        """evaluate_revision의 비동기 버전"""
+        items = self.improver.parse_improved_requirements(revised_text)
+        if len(items) > 1:
+            return await self.evaluate_items_async(items)
+        if items:
+            revised_text = items[0]['text']
+        
+        rules = affected_rules(original_text, revised_text)
+        if rules is None:
+            return await self.evaluate_async(revised_text)
+        
+        original_scores = await original_task
+        if not rules:
+            return {**original_scores, "rescored_rules": []}
+        return await self.evaluator.rescore_async(revised_text, original_scores, rules)
+    
+    async def evaluate_items_async(self, items: List[Dict]) -> Dict:
+        """evaluate_items의 비동기 버전"""
+        results = await asyncio.gather(*(self.evaluate_async(item['text']) for item in items))
+        
+        combined = self.evaluator.combine_scores(list(results))
+        combined["items"] = [
+            {**item, "scores": result}
+            for item, result in zip(items, results)
+        ]
+        return combined
+    
+    @staticmethod
+    async def _run_phase_async(phase: str, coroutine: Awaitable):
+        
+        with call_context(phase=phase):
+            return await coroutine
+    
+    async def improve_async(self, original_text: str, subject: str, system: str, receiver: str) -> Dict:
+        """improve의 비동기 버전 (캐시 우선)"""
+        key = self._improve_cache_key(original_text, subject, system, receiver) if self.cache else None
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            return self.improver.build_result(original_text, cached["improved"], subject, system, receiver)
+        
+        improved_result = await self.improver.improve_async(original_text, subject, system, receiver)
+        if key:
+            self.cache.put(key, {"improved": improved_result["improved"]})
+        return improved_result
+    
+    async def evaluate_async(self, text: str) -> Dict:
+        """evaluate의 비동기 버전 (캐시 우선)"""
+        key = make_key("evaluate", self._evaluate_key, normalize_text(text)) if self.cache else None
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            return cached
+        
+        scores = await self.evaluator.evaluate_async(text)
+        if key:
+            self.cache.put(key, scores)
+        return scores
+    
+    def run_combined(self, original_text: str, subject: str, system: str, receiver: str) -> Dict:
+        """원본 평가, 개선, 개선본 평가를 한 번의 요청으로 수행 (캐시 우선)"""
+        key = self._combined_cache_key(original_text, subject, system, receiver)
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            return self._cached_combined(original_text, cached, subject, system, receiver)
+        
+        with call_context(phase="combined"):
+            result = self.combined.run(original_text, subject, system, receiver)
+        self._put_combined(key, result)
+        return result
+    
+    async def run_combined_async(self, original_text: str, subject: str, system: str, receiver: str) -> Dict:
+        """run_combined의 비동기 버전"""
+        key = self._combined_cache_key(original_text, subject, system, receiver)
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            return self._cached_combined(original_text, cached, subject, system, receiver)
+        
+        result = await self._run_phase_async("combined", self.combined.run_async(original_text, subject, system, receiver))
+        self._put_combined(key, result)
+        return result
+    
+    def _combined_cache_key(self, original_text: str, subject: str, system: str, receiver: str) -> Optional[str]:
+        
+        if self.cache is None:
+            return None
+        return make_key("combined", self._combined_key, normalize_text(original_text), subject, system, receiver)
+    
+    def _cached_combined(self, original_text: str, cached: Dict, subject: str, system: str, receiver: str) -> Dict:
+        
+        return {
+            "improved_result": self.improver.build_result(original_text, cached["improved"], subject, system, receiver),
+            "original_scores": cached["original_scores"],
+            "improved_scores": cached["improved_scores"]
+        }
+    
+    def _put_combined(self, key: Optional[str], result: Dict):
+        
+        if key:
+            self.cache.put(key, {
+                "improved": result["improved_result"]["improved"],
+                "original_scores": result["original_scores"],
+                "improved_scores": result["improved_scores"]
+            })
+    
+    def improve(self, original_text: str, subject: str, system: str, receiver: str) -> Dict:
+        """요구사항 개선 (캐시 우선)"""
+        if self.cache is None:
+            return self.improver.improve(
+                original_text=original_text,
+                subject=subject,
+                system=system,
+                receiver=receiver
+            )
+        
+        key = self._improve_cache_key(original_text, subject, system, receiver)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return self.improver.build_result(original_text, cached["improved"], subject, system, receiver)
+        
+        improved_result = self.improver.improve(
+            original_text=original_text,
+            subject=subject,
+            system=system,
+            receiver=receiver
+        )
+        self.cache.put(key, {"improved": improved_result["improved"]})
+        return improved_result
+    
+    def _improve_stream(self, original_text: str, subject: str, system: str, receiver: str) -> Iterator[str]:
+        """요구사항 개선 스트리밍 (캐시 적중 시 전체 텍스트를 한 번에 반환)"""
+        if self.cache is None:
+            yield from self.improver.improve_stream(original_text, subject, system, receiver)
+            return
+        
+        key = self._improve_cache_key(original_text, subject, system, receiver)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached["improved"]
+            return
+        
+        chunks = []
+        for delta in self.improver.improve_stream(original_text, subject, system, receiver):
+            chunks.append(delta)
+            yield delta
+        self.cache.put(key, {"improved": "".join(chunks)})
+    
+    def _improve_cache_key(self, original_text: str, subject: str, system: str, receiver: str) -> str:
+        
+        return make_key("improve", self._improve_key, normalize_text(original_text), subject, system, receiver)
+    
+    def evaluate(self, text: str) -> Dict:
+        """요구사항 평가 (캐시 우선)"""
+        if self.cache is None:
+            return self.evaluator.evaluate(text)
+        
+        key = make_key("evaluate", self._evaluate_key, normalize_text(text))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        scores = self.evaluator.evaluate(text)
+        self.cache.put(key, scores)
+        return scores
@@ -0,0 +1,144 @@
+"""
+어휘 기반 규칙 사전 점검 (LLM 호출 없이 결정적으로 채점할 수 있는 규칙)
+"""
+import re
+from typing import Callable, Dict, List, Optional
+import config
+
+
+SENTENCE_SPLIT_PATTERN = re.compile(r'(?<=[.!?。])\s+|\n+')
+
+# P2 - 의무형 동사 (강한 순서대로 검사)
+MODAL_LEVELS = [
+    (re.compile(r'야\s*(한다|합니다|함)|\b(shall|must)\b', re.I), 5, "'해야 한다/shall' 의무형 사용"),
+    (re.compile(r'권장|바람직|\bshould\b', re.I), 4, "'권장/should' 약한 의무형 사용"),
+    (re.compile(r'할\s*수\s*있|수\s*있(다|음)|가능하다|\b(may|can|could|might)\b', re.I), 3, "'할 수 있다/may' 선택형 표현"),
+    (re.compile(r'(한다|된다|합니다|됩니다|함|됨)\s*[.]?\s*$|\b(will|is|are)\b', re.I), 2, "서술형 표현"),
+]
+
+# R7 - 모호한 용어 (채점 기준의 2점 예시 / 3점 예시)
+STRONG_VAGUE_PATTERN = re.compile(
+    r'적절|충분|보장|원활|만족스러|합리적|\b(adequate|sufficient|appropriate|reasonable|ensure|proper(ly)?)\b', re.I
+)
+MILD_VAGUE_PATTERN = re.compile(
+    r'빠르|빨리|신속|효율|최소화|최대화|최대한|가능한\s*한|용이|쉽게|간단|안정적|정상적|'
+    r'\b(fast|quick(ly)?|efficient(ly)?|easy|easily|simple|robust|flexible|user-friendly|minimi[sz]e|maximi[sz]e)\b',
+    re.I
+)
+
+# R32 - 보편적 한정어
+UNIVERSAL_PATTERN = re.compile(r'모든|전체|전부|어떠한|어떤\s*\S+도|양쪽|\b(all|any|both|every)\b', re.I)
+
+# R33-R35 - 수치 / 허용 범위 / 시간
+# 성능/물리 단위가 붙은 수치만 측정 기준으로 봄 ("3개의 버튼", "2회 표시" 같은 개수는 성능 기준이 아니므로 제외)
+QUANTITY_PATTERN = re.compile(
+    r'\d+(?:\.\d+)?\s*(?:ms|msec|sec|s|min|h|hz|khz|mhz|mv|v|ma|a|kw|w|km/h|kph|km|cm|mm|m|cd|lux|lx|db|'
+    r'kbps|mbps|bps|kb|mb|byte|%|°c|℃|초|분|시간)(?![a-z])',
+    re.I
+)
+TIME_QUANTITY_PATTERN = re.compile(r'\d+(?:\.\d+)?\s*(?:ms|msec|sec|s|min|h|초|분|시간)(?![a-z])', re.I)
+TOLERANCE_PATTERN = re.compile(
+    r'±|~|≤|≥|<|>|이상|이하|이내|미만|초과|최소|최대|범위|\d\s*(-|to)\s*\d|'
+    r'\b(between|within|at\s+least|at\s+most|minimum|maximum|tolerance)\b',
+    re.I
+)
+VAGUE_PERFORMANCE_PATTERN = re.compile(
+    r'빠르|빨리|신속|즉시|느리|고속|고성능|\b(fast|quick(ly)?|slow|responsive|high[- ]performance|immediately)\b', re.I
+)
+VAGUE_TEMPORAL_PATTERN = re.compile(
+    r'즉시|곧|바로|신속|적시|빠른\s*시간|주기적|\b(soon|immediately|promptly|timely|periodically|eventually)\b', re.I
+)
+
+
+def _score(score: int, reason: str) -> Dict:
+
+    return {"score": score, "reason": f"로컬 점검: {reason}"}
+
+
+def check_modal_verb(text: str) -> Dict:
+    """P2 - 문장별 의무형 수준 중 가장 약한 것으로 채점"""
+    sentences = [sentence for sentence in SENTENCE_SPLIT_PATTERN.split(text.strip()) if sentence.strip()]
+    weakest = None
+    for sentence in sentences or [text]:
+        level = next(((score, reason) for pattern, score, reason in MODAL_LEVELS if pattern.search(sentence)),
+                     (1, "의무형 동사 없음"))
+        if weakest is None or level[0] < weakest[0]:
+            weakest = level
+    return _score(*weakest)
+
+
+def check_vague_terms(text: str) -> Dict:
+    """R7 - 모호한 용어 수와 종류로 채점"""
+    strong = [match.group(0) for match in STRONG_VAGUE_PATTERN.finditer(text)]
+    mild = [match.group(0) for match in MILD_VAGUE_PATTERN.finditer(text)]
+    terms = ", ".join(f"'{term}'" for term in strong + mild)
+
+    if len(strong) + len(mild) >= 3:
+        return _score(1, f"모호한 용어 다수 ({terms})")
+    if strong or len(mild) >= 2:
+        return _score(2, f"주요 개념이 모호함 ({terms})")
+    if mild:
+        return _score(3, f"일부 모호한 용어 사용 ({terms})")
+    return _score(5, "모호한 용어 없음")
+
+
+def check_universal_quantifiers(text: str) -> Dict:
+    """R32 - 'all/모든' 등 보편적 한정어 사용 여부"""
+    found = [match.group(0) for match in UNIVERSAL_PATTERN.finditer(text)]
+    if found:
+        return _score(2, f"보편적 한정어 사용 ({', '.join(found)}), '각'/each 권장")
+    return _score(5, "보편적 한정어 없음")
+
+
+def check_value_range(text: str) -> Dict:
+    """R33 - 수치에 허용 범위가 있는지 (수치가 없으면 N/A)"""
+    if not QUANTITY_PATTERN.search(text):
+        return _score(0, "수치 없음")
+    if TOLERANCE_PATTERN.search(text):
+        return _score(5, "수치에 범위/허용 오차 명시")
+    return _score(2, "수치에 범위/허용 오차 없음")
+
+
+def check_measurable_performance(text: str) -> Dict:
+    """R34 - 성능 기준이 측정 가능한 수치인지 (성능 표현이 없으면 N/A)"""
+    if QUANTITY_PATTERN.search(text):
+        return _score(5, "측정 가능한 수치 기준 명시")
+    if VAGUE_PERFORMANCE_PATTERN.search(text):
+        return _score(2, "성능 기준이 정성적 표현뿐임")
+    return _score(0, "성능 기준 없음")
+
+
+def check_temporal_dependencies(text: str) -> Dict:
+    """R35 - 시간 조건이 구체적인 값인지 (시간 표현이 없으면 N/A)"""
+    if TIME_QUANTITY_PATTERN.search(text):
+        return _score(5, "구체적인 시간 값 명시")
+    if VAGUE_TEMPORAL_PATTERN.search(text):
+        return _score(2, "시간 조건이 모호함")
+    return _score(0, "시간 조건 없음")
+
+
+PRESCREEN_CHECKS: Dict[str, Callable[[str], Dict]] = {
+    "P2": check_modal_verb,
+    "R7": check_vague_terms,
+    "R32": check_universal_quantifiers,
+    "R33": check_value_range,
+    "R34": check_measurable_performance,
+    "R35": check_temporal_dependencies,
+}
+
+
+def local_rules(rules: Optional[List[str]] = None) -> List[str]:
+    """로컬에서 채점하는 규칙 (config.PRESCREEN_RULES 중 점검 함수가 있는 것)"""
+    enabled = [rule for rule in config.PRESCREEN_RULES if rule in PRESCREEN_CHECKS]
+    return enabled if rules is None else [rule for rule in rules if rule in enabled]
+
+
+def prescreen(text: str, rules: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """
+    어휘 규칙 점검 (규칙 → {"score", "reason"})
+
+    Args:
+        text: 요구사항
+        rules: 점검할 규칙 (None이면 설정된 로컬 규칙 전체)
+    """
+    return {rule: PRESCREEN_CHECKS[rule](text) for rule in local_rules(rules)}
@@ -0,0 +1,277 @@
+"""
+규칙 테이블 및 점수 행렬 (일괄 집계용)
+"""
+import re
+import sys
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+import numpy as np
+import config
+
+
+RULE_RANGE_PATTERN = re.compile(r'^([A-Z])(\d+)(?:-\1(\d+))?$')
+SCORE_PER_RULE = 5
+
+
+def expand_rule_range(spec: str) -> List[str]:
+    """"R12-R17" 형식의 규칙 범위를 개별 규칙 목록으로 변환"""
+    match = RULE_RANGE_PATTERN.match(spec)
+    if not match:
+        raise ValueError(f"규칙 범위 형식 오류: {spec}")
+    prefix, start, end = match.group(1), int(match.group(2)), int(match.group(3) or match.group(2))
+    return [f"{prefix}{number}" for number in range(start, end + 1)]
+
+
+class RuleTable:
+    
+    
+    def __init__(self, rules_count: Dict[str, int], categories: Dict[str, List[str]]):
+        """
+        Args:
+            rules_count: 규칙 범위별 규칙 수 (config.RULES_COUNT)
+            categories: 카테고리 이름별 규칙 범위 목록 (config.SCORE_CATEGORIES)
+        """
+        self.rules: List[str] = []
+        for spec, count in rules_count.items():
+            expanded = expand_rule_range(spec)
+            if len(expanded) != count:
+                raise ValueError(f"규칙 수 불일치: {spec}는 {len(expanded)}개 ({count}개로 설정됨)")
+            self.rules.extend(expanded)
+        
+        self.index = {rule: i for i, rule in enumerate(self.rules)}
+        self.max_score = len(self.rules) * SCORE_PER_RULE
+        
+        # 카테고리 소속 행렬 (규칙 수 × 카테고리 수)
+        self.category_names = list(categories)
+        self.category_rules: Dict[str, List[str]] = {}
+        self.membership = np.zeros((len(self.rules), len(self.category_names)), dtype=np.int32)
+        for c, name in enumerate(self.category_names):
+            rules = [rule for spec in categories[name] for rule in expand_rule_range(spec)]
+            self.category_rules[name] = rules
+            for rule in rules:
+                self.membership[self.index[rule], c] = 1
+        self.category_max = self.membership.sum(axis=0) * SCORE_PER_RULE
+
+
+class ScoreMatrix:
+    
+    
+    def __init__(self, table: RuleTable, scores: np.ndarray):
+        """
+        Args:
+            table: 규칙 테이블
+            scores: 요구사항 수 × 규칙 수의 점수 배열 (0은 N/A)
+        """
+        self.table = table
+        self.scores = scores
+    
+    @classmethod
+    def from_scores(cls, table: RuleTable, raw_scores: Sequence[Dict]) -> "ScoreMatrix":
+        """{"규칙": {"score": n}} 형식의 평가 결과 목록으로 행렬 생성"""
+        scores = np.zeros((len(raw_scores), len(table.rules)), dtype=np.uint8)
+        for i, raw in enumerate(raw_scores):
+            for rule, value in raw.items():
+                column = table.index.get(rule)
+                if column is not None and isinstance(value, dict):
+                    scores[i, column] = min(max(int(value.get('score', 0) or 0), 0), SCORE_PER_RULE)
+        return cls(table, scores)
+    
+    def aggregate(self) -> Dict[str, np.ndarray]:
+        """총점, N/A 제외 만점, 만족률, 카테고리별 점수를 한 번에 계산"""
+        scores = self.scores.astype(np.int32)
+        applicable = (scores > 0).astype(np.int32)
+        
+        totals = scores.sum(axis=1)
+        maxima = applicable.sum(axis=1) * SCORE_PER_RULE
+        safe_maxima = np.where(maxima > 0, maxima, 1)
+        percentages = np.where(maxima > 0, np.round(totals / safe_maxima * 100, 1), 0.0)
+        
+        return {
+            "total": totals,
+            "max": np.where(maxima > 0, maxima, self.table.max_score),
+            "percentage": percentages,
+            "category_scores": scores @ self.table.membership,
+            "category_max": applicable @ self.table.membership * SCORE_PER_RULE
+        }
+    
+    def summaries(self) -> List[Dict]:
+        """요구사항별 집계 결과 (RequirementEvaluator._process_scores와 같은 형식, scores 제외)"""
+        result = self.aggregate()
+        summaries = []
+        for i in range(len(self.scores)):
+            summaries.append({
+                "total": int(result["total"][i]),
+                "max": int(result["max"][i]),
+                "percentage": float(result["percentage"][i]),
+                "categories": {
+                    name: {
+                        "rules": self.table.category_rules[name],
+                        "score": int(result["category_scores"][i, c]),
+                        "max": int(self.table.category_max[c])
+                    }
+                    for c, name in enumerate(self.table.category_names)
+                }
+            })
+        return summaries
+
+
+RULE_TABLE = RuleTable(config.RULES_COUNT, config.SCORE_CATEGORIES)
+
+
+class ScoreRecord:
+    """
+    요구사항 1건의 평가 결과 경량 표현 (세션 상태/일괄 처리 기록용)
+    
+    점수는 규칙 순서가 고정된 uint8 배열, 이유는 intern한 문자열 튜플(또는 필요할 때 불러오는 함수)로 보관.
+    평가 결과 dict와 같은 키(total, max, percentage, categories, scores, rescored_rules, items)로도 읽을 수 있음
+    """
+    __slots__ = ("table", "values", "total", "max", "percentage", "rescored_rules", "items", "_reasons")
+    
+    KEYS = ("total", "max", "percentage", "categories", "scores", "rescored_rules", "items")
+    
+    def __init__(
+        self,
+        values: np.ndarray,
+        table: RuleTable = RULE_TABLE,
+        reasons: Union[Sequence[str], Callable[[], Sequence[str]], None] = None,
+        rescored_rules: Optional[Sequence[str]] = None,
+        items: Optional[List[Dict[str, Any]]] = None
+    ):
+        """
+        Args:
+            values: 규칙 순서대로의 점수 (0은 N/A)
+            table: 규칙 테이블
+            reasons: 규칙 순서대로의 이유, 또는 이유 목록을 반환하는 함수 (처음 읽을 때 호출)
+            rescored_rules: 증분 평가로 다시 평가한 규칙
+            items: 분리된 요구사항별 결과 ({"number", "text", "pattern", "scores": ScoreRecord})
+        """
+        self.table = table
+        self.values = values
+        self._reasons = reasons
+        # 평가 결과 dict와 같은 list로 보관 (빈 목록 = 다시 평가한 규칙 없음, None = 증분 평가 아님)
+        self.rescored_rules = list(rescored_rules) if rescored_rules is not None else None
+        self.items = items
+        
+        applicable = int(np.count_nonzero(values))
+        self.total = int(values.sum(dtype=np.int32))
+        self.max = applicable * SCORE_PER_RULE if applicable else table.max_score
+        self.percentage = float(np.round(self.total / self.max * 100, 1)) if applicable else 0.0
+    
+    @classmethod
+    def from_result(cls, result: Dict, table: RuleTable = RULE_TABLE, keep_reasons: bool = True) -> "ScoreRecord":
+        """RequirementEvaluator 평가 결과 dict로 생성"""
+        values = np.zeros(len(table.rules), dtype=np.uint8)
+        reasons = [""] * len(table.rules) if keep_reasons else None
+        for rule, value in result.get("scores", {}).items():
+            column = table.index.get(rule)
+            if column is None or not isinstance(value, dict):
+                continue
+            values[column] = min(max(int(value.get("score", 0) or 0), 0), SCORE_PER_RULE)
+            if reasons is not None:
+                reasons[column] = sys.intern(str(value.get("reason", "")))
+        
+        items = [
+            {**item, "scores": cls.from_result(item["scores"], table, keep_reasons)}
+            for item in result.get("items") or []
+        ]
+        return cls(values, table, tuple(reasons) if reasons is not None else None,
+                   result.get("rescored_rules"), items or None)
+    
+    @classmethod
+    def load(cls, data: Dict, table: RuleTable = RULE_TABLE) -> "ScoreRecord":
+        """dump() 결과로 생성"""
+        values = np.frombuffer(bytes.fromhex(data["values"]), dtype=np.uint8).copy()
+        reasons = tuple(sys.intern(reason) for reason in data["reasons"]) if data.get("reasons") else None
+        items = [{**item, "scores": cls.load(item["scores"], table)} for item in data.get("items") or []]
+        return cls(values, table, reasons, data.get("rescored_rules"), items or None)
+    
+    @classmethod
+    def coerce(cls, value: Union["ScoreRecord", Dict], table: RuleTable = RULE_TABLE) -> "ScoreRecord":
+        """ScoreRecord, dump() 결과, 평가 결과 dict 중 무엇이든 ScoreRecord로"""
+        if isinstance(value, cls):
+            return value
+        if "values" in value:
+            return cls.load(value, table)
+        return cls.from_result(value, table)
+    
+    def dump(self, keep_reasons: bool = False) -> Dict:
+        """JSON 저장용 (점수는 16진 문자열, 이유는 keep_reasons일 때만)"""
+        data: Dict[str, Any] = {"values": self.values.tobytes().hex()}
+        if keep_reasons and self.reasons is not None:
+            data["reasons"] = list(self.reasons)
+        if self.rescored_rules is not None:
+            data["rescored_rules"] = list(self.rescored_rules)
+        if self.items:
+            data["items"] = [{**item, "scores": item["scores"].dump(keep_reasons)} for item in self.items]
+        return data
+    
+    @property
+    def reasons(self) -> Optional[Sequence[str]]:
+        
+        if callable(self._reasons):
+            self._reasons = tuple(sys.intern(reason) for reason in self._reasons())
+        return self._reasons
+    
+    def score(self, rule: str) -> int:
+        
+        return int(self.values[self.table.index[rule]])
+    
+    def reason(self, rule: str) -> str:
+        
+        reasons = self.reasons
+        return reasons[self.table.index[rule]] if reasons is not None else ""
+    
+    @property
+    def categories(self) -> Dict[str, Dict]:
+        """카테고리별 점수 (평가 결과 dict의 categories와 같은 형식)"""
+        values = self.values.astype(np.int32)
+        scores = values @ self.table.membership
+        return {
+            name: {
+                "rules": self.table.category_rules[name],
+                "score": int(scores[c]),
+                "max": int(self.table.category_max[c])
+            }
+            for c, name in enumerate(self.table.category_names)
+        }
+    
+    @property
+    def scores(self) -> Dict[str, Dict]:
+        """규칙별 {"score", "reason"} (평가 결과 dict의 scores와 같은 형식)"""
+        return {
+            rule: {"score": int(self.values[i]), "reason": self.reason(rule)}
+            for i, rule in enumerate(self.table.rules)
+        }
+    
+    def delta(self, other: "ScoreRecord") -> np.ndarray:
+        """규칙별 점수 변화 (other - self)"""
+        return other.values.astype(np.int16) - self.values.astype(np.int16)
+    
+    def changes(self, other: "ScoreRecord") -> Dict[str, Dict[str, int]]:
+        """둘 중 하나라도 N/A가 아닌 규칙의 점수 변화"""
+        delta = self.delta(other)
+        columns = np.flatnonzero((self.values > 0) | (other.values > 0))
+        return {
+            self.table.rules[i]: {
+                "original": int(self.values[i]),
+                "improved": int(other.values[i]),
+                "change": int(delta[i])
+            }
+            for i in columns
+        }
+    
+    def __getitem__(self, key: str):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def get(self, key: str, default=None):
+        
+        value = getattr(self, key) if key in self.KEYS else None
+        return default if value is None else value
+    
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+    
+    def __reduce__(self):
+        # 규칙 테이블은 빼고 점수/이유만 직렬화 (세션 상태 저장 시 크기 절감, 기본 규칙 테이블로 복원)
+        return (ScoreRecord.load, (self.dump(keep_reasons=True),))
@@ -0,0 +1,189 @@
+"""
+API 요청 스케줄러 (속도 제한, 재시도, 동시 요청 수 제한)
+"""
+import asyncio
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# 재시도할 HTTP 상태 코드 (429: rate limit, 529: overloaded)
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class TokenBucket:
+    
+    
+    def __init__(self, per_minute: int):
+        """
+        Args:
+            per_minute: 분당 허용량 (버킷 용량이자 1분 동안 채워지는 양)
+        """
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, amount: float):
+        """amount만큼 사용할 수 있을 때까지 대기 후 차감"""
+        while True:
+            wait = self._take(amount)
+            if not wait:
+                return
+            time.sleep(wait)
+    
+    async def acquire_async(self, amount: float):
+        """acquire의 비동기 버전 (대기 중에도 이벤트 루프를 막지 않음)"""
+        while True:
+            wait = self._take(amount)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+    
+    def _take(self, amount: float) -> float:
+        """사용할 수 있으면 차감하고 0, 부족하면 채워질 때까지 기다릴 시간(초)"""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+            return (amount - self.tokens) / self.rate
+    
+    def adjust(self, amount: float):
+        """예상치와 실제 사용량의 차이 반영 (양수면 추가 차감)"""
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+    
+    def _refill(self):
+        
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class RequestScheduler:
+    
+    
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_concurrency: int,
+        max_retries: int,
+        base_delay: float,
+        max_delay: float
+    ):
+        """
+        Args:
+            requests_per_minute: 분당 요청 수 제한
+            tokens_per_minute: 분당 토큰 수 제한
+            max_concurrency: 동시에 진행할 수 있는 요청 수
+            max_retries: 재시도 가능한 오류의 최대 재시도 횟수
+            base_delay: 지수 백오프 기본 대기 시간(초)
+            max_delay: 백오프 최대 대기 시간(초)
+        """
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+    
+    @contextmanager
+    def slot(self, estimated_tokens: int):
+        """동시 요청 슬롯과 요청/토큰 한도를 확보한 상태로 실행"""
+        with self._semaphore:
+            self.request_bucket.acquire(1)
+            self.token_bucket.acquire(estimated_tokens)
+            yield
+    
+    @asynccontextmanager
+    async def slot_async(self, estimated_tokens: int, semaphore: asyncio.Semaphore):
+        """slot의 비동기 버전 (동시 요청 수는 호출자의 asyncio 세마포어로 제한)"""
+        async with semaphore:
+            await self.request_bucket.acquire_async(1)
+            await self.token_bucket.acquire_async(estimated_tokens)
+            yield
+    
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """실제 토큰 사용량으로 토큰 버킷 보정"""
+        self.token_bucket.adjust(actual_tokens - estimated_tokens)
+    
+    def retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """재시도 대기 시간(초). 재시도하지 않을 오류이거나 횟수를 초과하면 None"""
+        if attempt >= self.max_retries or not self.is_retryable(error):
+            return None
+        
+        retry_after = self._retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        
+        # 지수 백오프 + full jitter
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+    
+    def execute(self, request: Callable[[], T], estimated_tokens: int) -> T:
+        """요청을 한도 내에서 실행하고 재시도 가능한 오류는 백오프 후 재시도"""
+        attempt = 0
+        while True:
+            try:
+                with self.slot(estimated_tokens):
+                    return request()
+            except Exception as e:
+                delay = self.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+    
+    async def execute_async(
+        self,
+        request: Callable[[], Awaitable[T]],
+        estimated_tokens: int,
+        semaphore: asyncio.Semaphore
+    ) -> T:
+        """
+        execute의 비동기 버전
+        
+        동시 요청 수는 호출자의 asyncio 세마포어로 제한하고, 요청/토큰 한도는 동기 요청과 같은 버킷을 공유
+        """
+        attempt = 0
+        while True:
+            try:
+                async with self.slot_async(estimated_tokens, semaphore):
+                    return await request()
+            except Exception as e:
+                delay = self.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+    
+    def is_retryable(self, error: Exception) -> bool:
+        
+        import anthropic
+        
+        if isinstance(error, anthropic.APIConnectionError):  # APITimeoutError 포함
+            return True
+        return getattr(error, "status_code", None) in RETRYABLE_STATUS
+    
+    def _retry_after(self, error: Exception) -> Optional[float]:
+        """응답 헤더의 retry-after-ms / retry-after 값(초)"""
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+        if not headers:
+            return None
+        
+        try:
+            if headers.get("retry-after-ms"):
+                return float(headers["retry-after-ms"]) / 1000
+            if headers.get("retry-after"):
+                return float(headers["retry-after"])
+        except ValueError:
+            pass  # HTTP-date 형식은 무시하고 백오프 사용
+        return None
@@ -0,0 +1,325 @@
+"""
+요구사항 집합 분석 (문서 전체의 중복/상충 후보를 로컬 유사도 색인으로 찾고 후보 묶음만 LLM으로 판정)
+"""
+import contextvars
+import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+import numpy as np
+from .ai_client import AIClient
+from .cache import normalize_text
+from .metrics import call_context
+from .prescreen import QUANTITY_PATTERN
+import config
+
+
+# MinHash 해시 함수 (a * x + b) mod p, x < 2^31이므로 곱이 uint64를 넘지 않음
+MINHASH_PRIME = (1 << 31) - 1
+
+NEGATION_PATTERN = re.compile(r'않|없|금지|\b(not|no|never)\b', re.I)
+
+
+class SimilarityIndex:
+    """
+    문자 n-gram MinHash + LSH 색인
+
+    같은 밴드 버킷에 들어간 요구사항 쌍만 실제 Jaccard 유사도를 계산하므로 전체 쌍 비교(O(n²)) 없이 후보를 찾음.
+    "해야 한다"처럼 문서 대부분에 나오는 n-gram은 서명에서 빼서 상투 표현만 같은 쌍이 한 버킷에 몰리지 않게 함
+    """
+
+
+    def __init__(
+        self,
+        shingle_size: int = config.SET_SHINGLE_SIZE,
+        permutations: int = config.SET_MINHASH_PERMUTATIONS,
+        bands: int = config.SET_LSH_BANDS,
+        seed: int = 0
+    ):
+        """
+        Args:
+            shingle_size: 문자 n-gram 길이
+            permutations: MinHash 서명 길이
+            bands: LSH 밴드 수 (permutations의 약수)
+            seed: 해시 계수 난수 시드 (같은 시드면 같은 후보)
+        """
+        if permutations % bands:
+            raise Exception(f"MinHash 서명 길이({permutations})가 밴드 수({bands})로 나누어떨어지지 않습니다")
+
+        rng = np.random.default_rng(seed)
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self.rows = permutations // bands
+        self._a = rng.integers(1, MINHASH_PRIME, size=(permutations, 1), dtype=np.uint64)
+        self._b = rng.integers(0, MINHASH_PRIME, size=(permutations, 1), dtype=np.uint64)
+
+        self.shingles: List[Set[int]] = []
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+
+    def build(self, texts: List[str]) -> "SimilarityIndex":
+        """요구사항 텍스트 전체(행 순서)로 색인 구성"""
+        self.shingles = [self.shingle(text) for text in texts]
+        self._buckets = {}
+
+        frequency: Dict[int, int] = {}
+        for shingles in self.shingles:
+            for shingle in shingles:
+                frequency[shingle] = frequency.get(shingle, 0) + 1
+        limit = max(config.SET_COMMON_SHINGLE_RATIO * len(self.shingles), config.SET_COMMON_SHINGLE_MIN_COUNT)
+
+        for position, shingles in enumerate(self.shingles):
+            distinctive = {shingle for shingle in shingles if frequency[shingle] <= limit}
+            signature = self.signature(distinctive or shingles)
+            for band in range(self.bands):
+                key = (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+                self._buckets.setdefault(key, []).append(position)
+        return self
+
+    def shingle(self, text: str) -> Set[int]:
+        """정규화한 텍스트의 문자 n-gram 해시 집합"""
+        text = normalize_text(text).lower()
+        size = min(self.shingle_size, len(text)) or 1
+        return {zlib.crc32(text[i:i + size].encode("utf-8")) for i in range(max(1, len(text) - size + 1))}
+
+    def signature(self, shingles: Set[int]) -> np.ndarray:
+        """MinHash 서명 (해시 함수별 최솟값)"""
+        values = np.fromiter(shingles, dtype=np.uint64, count=len(shingles)) % np.uint64(MINHASH_PRIME)
+        return ((self._a * values + self._b) % np.uint64(MINHASH_PRIME)).min(axis=1)
+
+    def candidate_pairs(self, threshold: float = config.SET_RELATED_THRESHOLD) -> Dict[Tuple[int, int], float]:
+        """같은 버킷에 들어간 쌍 중 Jaccard 유사도가 threshold 이상인 쌍 (위치 쌍 → 유사도)"""
+        checked: Set[Tuple[int, int]] = set()
+        pairs = {}
+        for members in self._buckets.values():
+            for x, i in enumerate(members):
+                for j in members[x + 1:]:
+                    if (i, j) in checked:
+                        continue
+                    checked.add((i, j))
+                    similarity = self.jaccard(i, j)
+                    if similarity >= threshold:
+                        pairs[(i, j)] = similarity
+        return pairs
+
+    def jaccard(self, i: int, j: int) -> float:
+
+        a, b = self.shingles[i], self.shingles[j]
+        return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class SetAnalyzer:
+    """
+    요구사항 집합 분석기
+
+    1. 유사도 색인으로 중복/상충 후보 쌍 찾기 (로컬)
+    2. 후보 쌍을 연결 요소별 묶음으로 나누어 묶음마다 LLM 판정 (문서 전체는 보내지 않음)
+    3. 판정 결과로 요구사항별 집합 규칙(config.SET_RULES) 점수 산출
+
+    요구사항은 행 위치로 구분하므로 ID가 겹쳐도 결과가 덮어쓰이지 않음 (겹치는 ID는 "ID#행 번호"로 표시하고 따로 보고).
+    텍스트가 같은 요구사항은 LLM 판정 없이 중복으로 기록
+    """
+
+
+    def __init__(
+        self,
+        ai_client: Optional[AIClient],
+        set_prompt: str = "",
+        max_workers: int = config.BULK_MAX_WORKERS
+    ):
+        """
+        Args:
+            ai_client: 묶음 판정용 클라이언트 (None이면 로컬 추정만 사용)
+            set_prompt: 집합 판정 기준 프롬프트
+            max_workers: 동시에 판정할 묶음 수
+        """
+        self.ai_client = ai_client
+        self.set_prompt = set_prompt
+        self.max_workers = max_workers
+
+    def analyze(self, requirements: List[Dict[str, str]]) -> Dict[str, Any]:
+        """
+        요구사항 집합 분석
+
+        Args:
+            requirements: 요구사항 목록 ({"id", "text"}, 행 순서)
+
+        Returns:
+            {"pairs": 후보 쌍, "groups": LLM에 보낸 묶음(표시 ID 목록), "findings": 판정 목록({"ids", "rows", "type", "reason"}),
+             "scores": 행별 집합 규칙 점수 목록, "duplicate_ids": 여러 행에 쓰인 ID → 행 번호(1부터) 목록,
+             "errors": 판정에 실패해 로컬 추정으로 대체한 묶음 수}
+        """
+        labels, duplicate_ids = self.labels(requirements)
+        texts = [requirement["text"] for requirement in requirements]
+
+        identical = self.identical_rows(texts)
+        findings: List[Dict[str, Any]] = [
+            {"ids": [labels[row] for row in rows], "rows": rows, "type": "duplicate", "reason": "동일한 텍스트"}
+            for rows in identical
+        ]
+        same_text = {row: position for position, rows in enumerate(identical) for row in rows}
+
+        pairs = self.candidate_pairs(texts, labels)
+        groups = self.group_pairs([
+            pair for pair in pairs
+            if same_text.get(pair["rows"][0], -1) != same_text.get(pair["rows"][1], -2)
+        ])
+
+        errors = 0
+        if groups:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(groups))) as executor:
+                futures = [
+                    executor.submit(contextvars.copy_context().run, self._judge, texts, labels, group)
+                    for group in groups
+                ]
+                for future in futures:
+                    group_findings, failed = future.result()
+                    findings.extend(group_findings)
+                    errors += failed
+
+        return {
+            "pairs": pairs,
+            "groups": [[labels[row] for row in group["rows"]] for group in groups],
+            "findings": findings,
+            "scores": self.set_scores(labels, findings),
+            "duplicate_ids": duplicate_ids,
+            "errors": errors
+        }
+
+    def labels(self, requirements: List[Dict[str, str]]) -> Tuple[List[str], Dict[str, List[int]]]:
+        """행별 표시 ID (여러 행에 쓰인 ID는 "ID#행 번호")와 겹치는 ID → 행 번호(1부터) 목록"""
+        rows: Dict[str, List[int]] = {}
+        for row, requirement in enumerate(requirements):
+            rows.setdefault(requirement["id"], []).append(row + 1)
+        duplicate_ids = {req_id: numbers for req_id, numbers in rows.items() if len(numbers) > 1}
+        labels = [
+            f"{requirement['id']}#{row + 1}" if requirement["id"] in duplicate_ids else requirement["id"]
+            for row, requirement in enumerate(requirements)
+        ]
+        return labels, duplicate_ids
+
+    def identical_rows(self, texts: List[str]) -> List[List[int]]:
+        """정규화한 텍스트가 같은 행 묶음 (2개 이상인 것만)"""
+        rows: Dict[str, List[int]] = {}
+        for row, text in enumerate(texts):
+            rows.setdefault(normalize_text(text).lower(), []).append(row)
+        return [members for members in rows.values() if len(members) > 1]
+
+    def candidate_pairs(self, texts: List[str], labels: List[str]) -> List[Dict[str, Any]]:
+        """유사도 색인으로 찾은 후보 쌍 ({"rows", "ids", "similarity", "signals"}, 유사도 내림차순)"""
+        index = SimilarityIndex().build(texts)
+
+        pairs = []
+        for (i, j), similarity in index.candidate_pairs().items():
+            pairs.append({
+                "rows": [i, j],
+                "ids": [labels[i], labels[j]],
+                "similarity": round(similarity, 3),
+                "signals": self.signals(texts[i], texts[j], similarity)
+            })
+        pairs.sort(key=lambda pair: -pair["similarity"])
+        return pairs
+
+    def signals(self, first: str, second: str, similarity: float) -> List[str]:
+        """쌍의 로컬 신호 (LLM 판정 참고 및 판정 실패 시 추정용)"""
+        signals = []
+        if similarity >= config.SET_DUPLICATE_THRESHOLD:
+            signals.append("거의 동일")
+        first_values = {normalize_text(match.group(0)).lower() for match in QUANTITY_PATTERN.finditer(first)}
+        second_values = {normalize_text(match.group(0)).lower() for match in QUANTITY_PATTERN.finditer(second)}
+        if first_values and second_values and first_values != second_values:
+            signals.append("수치 다름")
+        if bool(NEGATION_PATTERN.search(first)) != bool(NEGATION_PATTERN.search(second)):
+            signals.append("부정 표현 다름")
+        return signals
+
+    def group_pairs(self, pairs: List[Dict[str, Any]], max_size: int = config.SET_MAX_GROUP_SIZE) -> List[Dict]:
+        """
+        후보 쌍을 LLM 판정 묶음({"rows", "pairs"})으로 나눔
+
+        연결 요소(서로 유사한 요구사항들)별로 묶되, 요구사항이 max_size개를 넘으면 유사도가 높은 쌍부터 채워 여러 묶음으로 나눔
+        """
+        parent: Dict[int, int] = {}
+
+        def find(row: int) -> int:
+            parent.setdefault(row, row)
+            while parent[row] != row:
+                parent[row] = parent[parent[row]]
+                row = parent[row]
+            return row
+
+        for pair in pairs:
+            parent[find(pair["rows"][0])] = find(pair["rows"][1])
+
+        components: Dict[int, List[Dict]] = {}
+        for pair in pairs:
+            components.setdefault(find(pair["rows"][0]), []).append(pair)
+
+        groups = []
+        for component in components.values():
+            current = {"rows": [], "pairs": []}
+            for pair in component:
+                new_rows = [row for row in pair["rows"] if row not in current["rows"]]
+                if current["pairs"] and len(current["rows"]) + len(new_rows) > max_size:
+                    groups.append(current)
+                    current = {"rows": [], "pairs": []}
+                    new_rows = list(pair["rows"])
+                current["rows"].extend(new_rows)
+                current["pairs"].append(pair)
+            groups.append(current)
+        return groups
+
+    def set_scores(self, labels: List[str], findings: List[Dict[str, Any]]) -> List[Dict[str, Dict]]:
+        """판정 결과로 행별 집합 규칙 점수 (판정이 없는 요구사항은 5점)"""
+        related: Dict[int, Dict[str, List[Tuple[List[str], str]]]] = {}
+        for finding in findings:
+            for row in finding["rows"]:
+                others = [labels[other] for other in finding["rows"] if other != row]
+                related.setdefault(row, {}).setdefault(finding["type"], []).append((others, finding["reason"]))
+
+        scores = []
+        for row in range(len(labels)):
+            found = related.get(row, {})
+            rule_scores = {
+                "R30": self._rule_score(found.get("duplicate"), 2, "중복", "중복 표현 없음"),
+                "C11": self._rule_score(
+                    found.get("conflict") or found.get("inconsistent_terms"),
+                    1 if found.get("conflict") else 3,
+                    "상충" if found.get("conflict") else "용어 불일치",
+                    "상충/용어 불일치 없음"
+                )
+            }
+            scores.append({rule: value for rule, value in rule_scores.items() if rule in config.SET_RULES})
+        return scores
+
+    def _rule_score(self, found: Optional[List[Tuple[List[str], str]]], score: int, label: str, clean: str) -> Dict:
+
+        if not found:
+            return {"score": 5, "reason": f"집합 분석: {clean}"}
+        details = "; ".join(f"{label} {', '.join(others)}" + (f" ({reason})" if reason else "") for others, reason in found)
+        return {"score": score, "reason": f"집합 분석: {details}"}
+
+    def _judge(self, texts: List[str], labels: List[str], group: Dict) -> Tuple[List[Dict[str, Any]], int]:
+        """묶음 1개 판정 (실패하면 로컬 신호로 추정)"""
+        if self.ai_client is not None:
+            try:
+                rows = {labels[row]: row for row in group["rows"]}
+                with call_context(phase="set-analysis"):
+                    findings = self.ai_client.judge_requirement_set(
+                        self.set_prompt, {label: texts[row] for label, row in rows.items()}, group["pairs"]
+                    )
+                return [{**finding, "rows": [rows[label] for label in finding["ids"]]} for finding in findings], 0
+            except Exception:
+                pass
+        return self.local_findings(group["pairs"]), 1 if self.ai_client is not None else 0
+
+    def local_findings(self, pairs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """로컬 신호만으로 추정한 판정 (거의 동일 → 중복, 수치/부정 표현만 다름 → 상충)"""
+        findings = []
+        for pair in pairs:
+            if "거의 동일" in pair["signals"] and len(pair["signals"]) == 1:
+                findings.append({"ids": pair["ids"], "rows": pair["rows"], "type": "duplicate",
+                                 "reason": "로컬 추정: 거의 동일한 표현"})
+            elif "거의 동일" in pair["signals"]:
+                findings.append({"ids": pair["ids"], "rows": pair["rows"], "type": "conflict",
+                                 "reason": f"로컬 추정: {', '.join(pair['signals'][1:])}"})
+        return findings
@@ -0,0 +1,516 @@
+"""
+로컬 Messages API 스텁 서버 (API 토큰 없이 처리량/지연 시간 측정용)
+
+실행: python -m modules.stub_server --port 8765 --latency 0.5
+AIClient(..., base_url="http://127.0.0.1:8765")로 연결
+Message Batches 엔드포인트(/v1/messages/batches)도 지원 (batch_latency초 후 완료)
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+import config
+from .rules import expand_rule_range
+
+
+# 채점 요청의 평가할 규칙 목록 (record_scores 도구는 전체 규칙 정의를 고정으로 보내고 규칙은 메시지로 지정)
+REQUESTED_RULES_PATTERN = re.compile(r'\[평가할 규칙\]\n(.+)')
+
+
+class StubServer:
+
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.2,
+        token_latency: float = 0.0,
+        error_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        retry_after: float = 0.1,
+        batch_latency: float = 1.0,
+        seed: int = 0
+    ):
+        """
+        Args:
+            host, port: 바인딩 주소 (port=0이면 빈 포트 자동 선택)
+            latency: 첫 토큰까지의 지연 시간(초)
+            token_latency: 출력 토큰당 추가 지연 시간(초)
+            error_rate: 429/529 오류를 주입할 확률
+            malformed_rate: 점수 응답에서 일부 규칙을 누락/손상시킬 확률
+            retry_after: 주입한 오류 응답의 retry-after 값(초)
+            batch_latency: Message Batches 배치가 완료되기까지의 시간(초)
+            seed: 난수 시드 (같은 시드면 같은 오류/점수 순서)
+        """
+        self.latency = latency
+        self.token_latency = token_latency
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.retry_after = retry_after
+        self.batch_latency = batch_latency
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._cached_prefixes = set()
+        self._batches: Dict[str, Dict[str, Any]] = {}
+        self.stats = {"requests": 0, "errors": 0, "malformed": 0}
+
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _chance(self, rate: float) -> bool:
+
+        with self._lock:
+            return rate > 0 and self._random.random() < rate
+
+    def _count(self, key: str):
+
+        with self._lock:
+            self.stats[key] += 1
+
+    def _handler_class(self):
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("content-length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                server._count("requests")
+
+                path = self.path.split("?")[0].rstrip("/")
+                if path.endswith("/v1/messages"):
+                    server.handle_messages(self, body)
+                elif path.endswith("/v1/messages/batches"):
+                    self.send_json(200, server.create_batch(body))
+                elif re.search(r"/v1/messages/batches/[^/]+/cancel$", path):
+                    self.send_batch(server.cancel_batch(path.split("/")[-2]))
+                else:
+                    self.send_not_found()
+
+            def do_GET(self):
+                server._count("requests")
+                path = self.path.split("?")[0].rstrip("/")
+                match = re.search(r"/v1/messages/batches/([^/]+)(/results)?$", path)
+                if not match or match.group(1) not in server._batches:
+                    self.send_not_found()
+                elif match.group(2):
+                    payload = server.batch_results(match.group(1)).encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("content-type", "application/binary")
+                    self.send_header("content-length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                else:
+                    self.send_batch(server.batch_status(match.group(1)))
+
+            def send_batch(self, batch: Optional[Dict[str, Any]]):
+                if batch is None:
+                    self.send_not_found()
+                else:
+                    self.send_json(200, batch)
+
+            def send_not_found(self):
+                self.send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+
+            def send_json(self, status: int, data: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(payload)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+    def handle_messages(self, handler, body: Dict[str, Any]):
+        """POST /v1/messages"""
+        # 1. 오류 주입 (429 rate limit / 529 overloaded)
+        if self._chance(self.error_rate):
+            self._count("errors")
+            status, error_type = self._random_error()
+            handler.send_json(
+                status,
+                {"type": "error", "error": {"type": error_type, "message": "stub server injected error"}},
+                headers={"retry-after": str(self.retry_after)}
+            )
+            return
+
+        # 2. 응답 생성
+        content, output_text = self.build_content(body)
+        usage = self._usage(body, output_text)
+
+        # 3. 지연 시간 재현
+        time.sleep(self.latency)
+        if body.get("stream"):
+            self._send_stream(handler, body, output_text, usage)
+            return
+
+        time.sleep(self.token_latency * usage["output_tokens"])
+        handler.send_json(200, self._message(body, content, usage))
+
+    def create_batch(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """POST /v1/messages/batches (응답은 접수 즉시 생성하고 batch_latency초 후 공개)"""
+        results = []
+        for request in body.get("requests") or []:
+            params = request["params"]
+            if self._chance(self.error_rate):
+                self._count("errors")
+                status, error_type = self._random_error()
+                result = {"type": "errored", "error": {
+                    "type": "error", "error": {"type": error_type, "message": "stub server injected error"}
+                }}
+            else:
+                content, output_text = self.build_content(params)
+                result = {"type": "succeeded", "message": self._message(params, content, self._usage(params, output_text))}
+            results.append({"custom_id": request["custom_id"], "result": result})
+
+        batch_id = f"msgbatch_stub_{uuid.uuid4().hex[:16]}"
+        with self._lock:
+            self._batches[batch_id] = {
+                "created": time.time(),
+                "ready": time.time() + self.batch_latency,
+                "canceled": None,
+                "results": results
+            }
+        return self.batch_status(batch_id)
+
+    def cancel_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            if batch is None:
+                return None
+            if batch["canceled"] is None and time.time() < batch["ready"]:
+                batch["canceled"] = time.time()
+        return self.batch_status(batch_id)
+
+    def batch_status(self, batch_id: str) -> Dict[str, Any]:
+        """GET /v1/messages/batches/{id}"""
+        with self._lock:
+            batch = self._batches[batch_id]
+        ended = batch["canceled"] is not None or time.time() >= batch["ready"]
+
+        counts = {"processing": 0, "succeeded": 0, "errored": 0, "canceled": 0, "expired": 0}
+        for entry in batch["results"]:
+            if not ended:
+                counts["processing"] += 1
+            elif batch["canceled"] is not None:
+                counts["canceled"] += 1
+            else:
+                counts[entry["result"]["type"]] += 1
+
+        def timestamp(value: Optional[float]) -> Optional[str]:
+            return datetime.fromtimestamp(value, timezone.utc).isoformat().replace("+00:00", "Z") if value else None
+
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": counts,
+            "created_at": timestamp(batch["created"]),
+            "expires_at": timestamp(batch["created"] + timedelta(days=1).total_seconds()),
+            "ended_at": timestamp(batch["canceled"] or batch["ready"]) if ended else None,
+            "cancel_initiated_at": timestamp(batch["canceled"]),
+            "archived_at": None,
+            "results_url": f"{self.url}/v1/messages/batches/{batch_id}/results" if ended else None
+        }
+
+    def batch_results(self, batch_id: str) -> str:
+        """GET /v1/messages/batches/{id}/results (JSONL)"""
+        with self._lock:
+            batch = self._batches[batch_id]
+        lines = []
+        for entry in batch["results"]:
+            if batch["canceled"] is not None:
+                entry = {"custom_id": entry["custom_id"], "result": {"type": "canceled"}}
+            lines.append(json.dumps(entry, ensure_ascii=False))
+        return "\n".join(lines) + "\n"
+
+    def build_content(self, body: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], str]:
+        """요청 종류(점수 도구 / 배치 평가 / 개선)에 맞는 응답 content 생성"""
+        user_message = self._user_text(body)
+        tools = body.get("tools") or []
+
+        if tools and tools[0]["name"] == "record_set_findings":
+            tool_input = {"findings": self._set_findings(user_message)}
+            text = json.dumps(tool_input, ensure_ascii=False)
+            return [{"type": "tool_use", "id": "toolu_stub", "name": tools[0]["name"], "input": tool_input}], text
+
+        if tools and tools[0]["name"] == "record_improvement":
+            tool_input = self._combined_input(user_message, tools[0])
+            text = json.dumps(tool_input, ensure_ascii=False)
+            return [{"type": "tool_use", "id": "toolu_stub", "name": tools[0]["name"], "input": tool_input}], text
+
+        if tools:
+            tool = tools[0]
+            requested = REQUESTED_RULES_PATTERN.search(user_message)
+            rules = (
+                [rule.strip() for rule in requested.group(1).split(",")] if requested
+                else [rule for rule in tool["input_schema"]["properties"] if rule != "confidence"]
+            )
+            tool_input = {rule: self._score(user_message, rule) for rule in rules}
+            if "confidence" in tool["input_schema"]["properties"]:
+                tool_input["confidence"] = self._confidence(user_message)
+            if self._chance(self.malformed_rate):
+                self._count("malformed")
+                for rule in rules[::7]:
+                    tool_input.pop(rule)
+            text = json.dumps(tool_input, ensure_ascii=False)
+            return [{"type": "tool_use", "id": "toolu_stub", "name": tool["name"], "input": tool_input}], text
+
+        if '<requirement id="' in user_message:
+            text = self._batch_response(user_message)
+        else:
+            text = self._improve_response(user_message)
+        return [{"type": "text", "text": text}], text
+
+    def _combined_input(self, user_message: str, tool: Dict[str, Any]) -> Dict[str, Any]:
+        """개선+평가 단일 호출 응답 (원본 점수, 개선 응답, 개선본 점수)"""
+        rules = tool["input_schema"]["properties"]["original_scores"]["required"]
+        request = user_message.split("[결과 기록]", 1)[0].strip()
+        original = request.split("[원본 요구사항]", 1)[-1].strip()
+        improved = self._improve_response(request)
+        section = improved.split("### 2. 개선된 요구사항", 1)[-1].split("\n###", 1)[0].strip()
+
+        tool_input = {
+            "original_scores": {rule: self._score(original, rule) for rule in rules},
+            "improved": improved,
+            "improved_scores": {rule: self._score(section, rule) for rule in rules}
+        }
+        if self._chance(self.malformed_rate):
+            self._count("malformed")
+            for rule in rules[::7]:
+                tool_input["original_scores"].pop(rule)
+        return tool_input
+
+    def _score(self, text: str, rule: str) -> Dict[str, Any]:
+        """텍스트와 규칙으로 결정되는 점수"""
+        digest = hashlib.sha256(f"{rule}\x00{text}".encode("utf-8")).digest()
+        return {"score": digest[0] % 6, "reason": f"{rule} 스텁 평가"}
+
+    def _set_findings(self, user_message: str) -> List[Dict[str, Any]]:
+        """후보 쌍 목록의 유사도/신호로 결정되는 집합 판정"""
+        findings = []
+        for first, second, similarity, signals in re.findall(
+            r'^- (.+?) / (.+?): 유사도 ([\d.]+)(?:, (.*))?$', user_message, re.M
+        ):
+            if "수치 다름" in signals or "부정 표현 다름" in signals:
+                findings.append({"ids": [first, second], "type": "conflict", "reason": "스텁 판정: 같은 대상에 다른 조건"})
+            elif float(similarity) >= 0.8:
+                findings.append({"ids": [first, second], "type": "duplicate", "reason": "스텁 판정: 같은 요구 반복"})
+        return findings
+
+    def _confidence(self, text: str) -> float:
+        """텍스트로 결정되는 채점 확신도 (0.3-1.0)"""
+        digest = hashlib.sha256(f"confidence\x00{text}".encode("utf-8")).digest()
+        return round(0.3 + 0.7 * digest[0] / 255, 2)
+
+    def _batch_response(self, user_message: str) -> str:
+
+        rules = [rule for spec in config.RULES_COUNT for rule in expand_rule_range(spec)]
+        result = {}
+        for req_id, text in re.findall(r'<requirement id="([^"]+)">\n(.*?)\n</requirement>', user_message, re.S):
+            result[req_id] = {rule: self._score(text, rule)["score"] for rule in rules}
+
+        text = json.dumps(result, ensure_ascii=False)
+        if self._chance(self.malformed_rate):
+            self._count("malformed")
+            text = text[:len(text) // 2]
+        return text
+
+    def _improve_response(self, user_message: str) -> str:
+        """Quality.md 출력 형식의 개선 응답"""
+        original = user_message.split("[원본 요구사항]", 1)[-1].strip()
+        subject = re.search(r"시스템 주체:\s*(.+)", user_message)
+        subject = subject.group(1).strip() if subject else config.DEFAULT_SUBJECT
+
+        improved = original.rstrip(". ")
+        if not improved.startswith(subject):
+            improved = f"{subject}는 {improved}"
+        if not improved.endswith("해야 한다"):
+            improved += "하도록 해야 한다"
+
+        return f"""### 1. 입력된 요구사항
+{original}
+
+### 2. 개선된 요구사항
+{improved}.
+
+**적용된 패턴**: Ubiquitous (보편적 패턴)
+
+### 3. 품질 평가 결과
+
+**불만족 항목 (Failed Criteria):**
+- **[P1] Subject (주어)**: 아니오
+  - 이유: 주체가 명시되지 않음
+  - 개선: "{subject}는" 추가
+
+### 4. 개선 설명
+
+**주요 개선 사항:**
+1. **주체 삽입**: {subject}
+2. **FRS 스타일 적용**: 의무형 표현 사용
+
+### 5. Pattern Classification
+**EARS/Functional Safety Pattern**: Ubiquitous
+- 설명: 조건 없이 항상 적용되는 요구사항
+
+### 6. 추가 개선 권장사항
+검증 기준은 전문가 정의가 필요합니다.
+"""
+
+    def _usage(self, body: Dict[str, Any], output_text: str) -> Dict[str, int]:
+        """프롬프트 캐시를 흉내 낸 usage (같은 시스템 프롬프트는 두 번째부터 캐시 적중)"""
+        # cache_control이 붙은 마지막 블록까지만 캐시 prefix, 그 뒤 블록은 캐시되지 않는 입력
+        blocks = body.get("system") or ""
+        if isinstance(blocks, str):
+            blocks = [{"text": blocks, "cache_control": {"type": "ephemeral"}}]
+        cached_until = max((i + 1 for i, block in enumerate(blocks) if block.get("cache_control")), default=0)
+        system = "".join(block.get("text", "") for block in blocks[:cached_until])
+        uncached = "".join(block.get("text", "") for block in blocks[cached_until:])
+        system_tokens = _tokens(system) + _tokens(json.dumps(body.get("tools") or []))
+        prefix = hashlib.sha256(f"{body.get('model')}\x00{system}".encode("utf-8")).hexdigest()
+
+        with self._lock:
+            cached = prefix in self._cached_prefixes
+            self._cached_prefixes.add(prefix)
+
+        return {
+            "input_tokens": _tokens(self._user_text(body)) + (_tokens(uncached) if uncached else 0),
+            "output_tokens": _tokens(output_text),
+            "cache_read_input_tokens": system_tokens if cached else 0,
+            "cache_creation_input_tokens": 0 if cached else system_tokens
+        }
+
+    def _message(self, body: Dict[str, Any], content: List[Dict[str, Any]], usage: Dict[str, int]) -> Dict[str, Any]:
+
+        return {
+            "id": f"msg_stub_{self.stats['requests']}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "stub"),
+            "content": content,
+            "stop_reason": "tool_use" if content and content[0]["type"] == "tool_use" else "end_turn",
+            "stop_sequence": None,
+            "usage": usage
+        }
+
+    def _send_stream(self, handler, body: Dict[str, Any], text: str, usage: Dict[str, int]):
+        """SSE 스트리밍 응답 (텍스트 응답만 지원)"""
+        handler.send_response(200)
+        handler.send_header("content-type", "text/event-stream")
+        handler.send_header("cache-control", "no-cache")
+        handler.send_header("connection", "close")
+        handler.end_headers()
+        handler.close_connection = True
+
+        def send(event: str, data: Dict[str, Any]):
+            handler.wfile.write(f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8"))
+            handler.wfile.flush()
+
+        message = self._message(body, [], dict(usage, output_tokens=0))
+        message["stop_reason"] = None
+        send("message_start", {"type": "message_start", "message": message})
+        send("content_block_start", {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}})
+
+        chunk_size = 8
+        for i in range(0, len(text), chunk_size):
+            chunk = text[i:i + chunk_size]
+            time.sleep(self.token_latency * _tokens(chunk))
+            send("content_block_delta", {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": chunk}})
+
+        send("content_block_stop", {"type": "content_block_stop", "index": 0})
+        send("message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+            "usage": {"output_tokens": usage["output_tokens"]}
+        })
+        send("message_stop", {"type": "message_stop"})
+
+    def _random_error(self) -> Tuple[int, str]:
+
+        with self._lock:
+            return self._random.choice([(429, "rate_limit_error"), (529, "overloaded_error")])
+
+    def _user_text(self, body: Dict[str, Any]) -> str:
+
+        content = (body.get("messages") or [{}])[-1].get("content", "")
+        if isinstance(content, list):
+            content = "".join(block.get("text", "") for block in content if isinstance(block, dict))
+        return content
+
+
+def _tokens(text: str) -> int:
+
+    return len(text) // config.CHARS_PER_TOKEN + 1
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="로컬 Messages API 스텁 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="첫 토큰까지의 지연 시간(초)")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="출력 토큰당 지연 시간(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429/529 오류 주입 확률")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="점수 응답 손상 확률")
+    parser.add_argument("--batch-latency", type=float, default=1.0, help="Message Batches 완료까지의 시간(초)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = StubServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        token_latency=args.token_latency,
+        error_rate=args.error_rate,
+        malformed_rate=args.malformed_rate,
+        batch_latency=args.batch_latency,
+        seed=args.seed
+    )
+    print(f"스텁 서버 실행 중: {server.url}")
+    server.httpd.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+공용 테스트 도구 (API 호출 없이 응답을 흉내 내는 클라이언트, 로컬 스텁 서버)
+"""
+from types import SimpleNamespace
+import pytest
+from modules.ai_client import AIClient
+from modules.stub_server import StubServer
+
+
+class FakeAIClient(AIClient):
+    """
+    _create_message를 대신하는 클라이언트
+
+    responses의 함수(phase, tool, user_message)가 반환한 dict는 도구 입력으로, 문자열은 텍스트 응답으로 돌려줌
+    """
+
+    def __init__(self, respond, **kwargs):
+        super().__init__(api_key="test-key", model="test-model", max_tokens=100, **kwargs)
+        self.respond = respond
+        self.calls = []
+
+    def _create_message(self, system_prompt, user_message, phase=None, **kwargs):
+        tool = kwargs["tools"][0] if kwargs.get("tools") else None
+        self.calls.append({"phase": phase, "tool": tool, "user_message": user_message})
+        output = self.respond(phase, tool, user_message)
+        if isinstance(output, dict):
+            return SimpleNamespace(content=[SimpleNamespace(type="tool_use", input=output)], usage=None)
+        return SimpleNamespace(content=[SimpleNamespace(type="text", text=output)], usage=None)
+
+    def _settle_usage(self, *args, **kwargs):
+        pass
+
+
+def requested_rules(user_message):
+    """채점 요청 메시지의 평가할 규칙 목록"""
+    return [rule.strip() for rule in user_message.split("[평가할 규칙]\n", 1)[1].split("\n", 1)[0].split(",")]
+
+
+@pytest.fixture
+def stub_server():
+    with StubServer(latency=0.0) as server:
+        yield server
+
+
+def make_pipeline(client, **kwargs):
+    """FakeAIClient로 구성한 파이프라인"""
+    from modules.evaluator import RequirementEvaluator
+    from modules.improver import RequirementImprover
+    from modules.pipeline import RequirementPipeline
+
+    return RequirementPipeline(RequirementImprover(client, "개선 지침"), RequirementEvaluator(client, "채점 기준"), **kwargs)
@@ -0,0 +1,107 @@
+"""
+비동기 클라이언트 (동기 파사드, 스트리밍, 종료 후 재시작, 동시 요청 수 제한)
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import pytest
+import config
+from modules.async_client import AsyncAIClient
+
+
+@pytest.fixture
+def client(stub_server):
+    client = AsyncAIClient(api_key="test-key", model=config.AI_MODEL, max_tokens=1000, base_url=stub_server.url)
+    yield client
+    client.close()
+
+
+def test_async_client_is_opt_in():
+    assert config.ASYNC_CLIENT is False
+
+
+def test_sync_facade_and_async_calls_share_loop(client):
+    text = client.call_api("개선 지침", "시스템은 응답해야 한다.", "improve")
+
+    async def from_other_loop():
+        return await client.call_api_async("개선 지침", "시스템은 기록해야 한다.", "improve")
+
+    assert text
+    assert asyncio.run(from_other_loop())
+    assert client._loop_thread.is_alive()
+
+
+def test_close_then_reuse_starts_new_loop(client):
+    client.call_api("개선 지침", "시스템은 응답해야 한다.", "improve")
+    first_loop, first_thread = client._loop, client._loop_thread
+
+    client.close()
+
+    assert client._loop is None
+    first_thread.join(5)
+    assert not first_thread.is_alive() and first_loop.is_closed()
+    assert client.call_api("개선 지침", "시스템은 응답해야 한다.", "improve")
+    assert client._loop is not first_loop
+
+
+def test_stream_api_yields_chunks(client):
+    chunks = list(client.stream_api("개선 지침", "시스템은 응답해야 한다.", "improve"))
+
+    assert len(chunks) > 1
+    assert "".join(chunks)
+
+
+def test_abandoned_stream_releases_slot(stub_server):
+    client = AsyncAIClient(
+        api_key="test-key", model=config.AI_MODEL, max_tokens=1000, base_url=stub_server.url, max_concurrency=1
+    )
+    try:
+        stream = client.stream_api("개선 지침", "시스템은 응답해야 한다.", "improve")
+        assert next(stream)
+        stream.close()
+
+        # 취소된 스트림이 슬롯을 돌려주지 않으면 다음 요청이 시간 안에 끝나지 않음
+        future = client.submit(client.call_api_async("개선 지침", "시스템은 기록해야 한다.", "improve"))
+        assert future.result(timeout=5)
+    finally:
+        client.close()
+
+
+class CountingMessages:
+    """동시에 진행 중인 요청 수의 최댓값을 기록하는 SDK messages 대용"""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    async def create(self, **params):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.02)
+        with self.lock:
+            self.active -= 1
+        return SimpleNamespace(content=[SimpleNamespace(type="text", text="응답")], usage=None)
+
+
+def test_sync_and_async_callers_share_concurrency_limit(monkeypatch):
+    client = AsyncAIClient(api_key="test-key", model="test-model", max_tokens=100, max_concurrency=2)
+    messages = CountingMessages()
+    client._aclient = SimpleNamespace(messages=messages)
+    monkeypatch.setattr(client, "_settle_usage", lambda *args, **kwargs: None)
+
+    async def async_callers():
+        return await asyncio.gather(*(client.call_api_async("지침", f"요구사항 {i}") for i in range(6)))
+
+    try:
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            sync_results = list(executor.map(lambda i: client.call_api("지침", f"요구사항 {i}"), range(6)))
+            async_results = asyncio.run(async_callers())
+    finally:
+        client._aclient = None
+        client.close()
+
+    assert sync_results == ["응답"] * 6 and async_results == ["응답"] * 6
+    assert messages.peak == 2
@@ -0,0 +1,62 @@
+"""
+여러 요구사항을 한 요청으로 채점하는 배치 평가
+"""
+import config
+from modules.evaluator import RequirementEvaluator
+from modules.rules import RULE_TABLE
+from tests.conftest import FakeAIClient, requested_rules
+
+
+def full_scores(rules, score=4):
+    return {rule: {"score": score, "reason": "ok"} for rule in rules}
+
+
+def test_batch_scores_are_validated_and_repaired():
+    def respond(phase, tool, user_message):
+        if tool is None:
+            return '{"A": {"P1": 5, "P3": 9}, "B": "형식 오류"}'
+        return full_scores(requested_rules(user_message), 4)
+
+    client = FakeAIClient(respond)
+    evaluator = RequirementEvaluator(client, "채점 기준")
+
+    results = evaluator.evaluate_batch({"A": "시스템은 응답해야 한다.", "B": "시스템은 기록해야 한다."})
+
+    assert set(results) == {"A", "B"}
+    for result in results.values():
+        assert set(result["scores"]) == set(RULE_TABLE.rules)
+        assert all(result["scores"][rule]["score"] > 0 for rule in evaluator.semantic_rules)
+    assert results["A"]["scores"]["P1"]["score"] == 5
+    assert results["A"]["scores"]["P3"]["score"] == 4   # 범위를 벗어난 9점은 보완 요청
+
+
+def test_unparseable_batch_is_split_until_single_requirements():
+    batch_sizes = []
+
+    def respond(phase, tool, user_message):
+        if tool is None:
+            batch_sizes.append(user_message.count("<requirement id="))
+            return "JSON이 아닌 응답"
+        return full_scores(requested_rules(user_message), 3)
+
+    client = FakeAIClient(respond)
+    evaluator = RequirementEvaluator(client, "채점 기준")
+    texts = {f"R{i}": f"시스템은 로그 {i}을 기록해야 한다." for i in range(4)}
+
+    results = evaluator.evaluate_batch(texts)
+
+    assert batch_sizes == [4, 2, 2]
+    assert list(results) == list(texts)
+    assert all(result["total"] > 0 for result in results.values())
+
+
+def test_split_batches_respects_item_limit_and_token_budget(monkeypatch):
+    evaluator = RequirementEvaluator(FakeAIClient(lambda *args: {}), "채점 기준")
+    monkeypatch.setattr(config, "BATCH_MAX_ITEMS", 3)
+
+    batches = evaluator._split_batches({f"R{i}": "짧은 요구사항" for i in range(7)})
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+
+    long_text = "가" * (config.BATCH_TOKEN_BUDGET * config.CHARS_PER_TOKEN)
+    batches = evaluator._split_batches({"A": long_text, "B": "짧은 요구사항"})
+    assert [list(batch) for batch in batches] == [["A"], ["B"]]
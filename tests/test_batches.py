@@ -0,0 +1,84 @@
+"""
+Message Batches API 백엔드 (스텁 서버의 배치 엔드포인트로 제출/상태 확인/결과/취소)
+"""
+import pytest
+import config
+from modules.ai_client import AIClient
+from modules.batches import BatchPipeline, MessageBatchBackend
+from modules.evaluator import RequirementEvaluator
+from modules.improver import RequirementImprover
+from modules.rules import RULE_TABLE
+from modules.stub_server import StubServer
+
+
+@pytest.fixture
+def batch_server():
+    with StubServer(latency=0.0, batch_latency=0.2) as server:
+        yield server
+
+
+@pytest.fixture
+def ai_client(batch_server):
+    client = AIClient("test-key", config.AI_MODEL, config.MAX_TOKENS, base_url=batch_server.url)
+    yield client
+    client.close()
+
+
+def message_params(ai_client, text):
+    return ai_client.message_params("시스템 프롬프트", text, "improve")
+
+
+def test_run_submits_chunks_and_collects_results(ai_client):
+    backend = MessageBatchBackend(ai_client, poll_interval=0.05, timeout=10, max_requests=2)
+    requests = {f"req-{i}": message_params(ai_client, f"요구사항 {i}") for i in range(5)}
+    progress = []
+
+    results = backend.run(requests, progress.append)
+
+    assert list(results) == list(requests)
+    assert all(message.content[0].text for message in results.values())
+    assert progress[-1]["succeeded"] == 5 and progress[-1]["processing"] == 0
+    assert any(counts["processing"] for counts in progress)
+    usage = ai_client.usage_summary()
+    assert usage["calls"] == 5 and usage["errors"] == 0
+
+
+def test_failed_requests_are_returned_as_exceptions(ai_client, batch_server):
+    batch_server.error_rate = 1.0
+    backend = MessageBatchBackend(ai_client, poll_interval=0.05, timeout=10)
+
+    results = backend.run({"req": message_params(ai_client, "요구사항")})
+
+    assert isinstance(results["req"], Exception)
+    assert "errored" in str(results["req"])
+
+
+def test_timeout_cancels_pending_batches(ai_client, batch_server):
+    batch_server.batch_latency = 30
+    backend = MessageBatchBackend(ai_client, poll_interval=0.05, timeout=0.2)
+
+    with pytest.raises(Exception, match="시간 초과"):
+        backend.run({"req": message_params(ai_client, "요구사항")})
+
+    batch = next(iter(batch_server._batches.values()))
+    assert batch["canceled"] is not None
+    assert batch_server.batch_status(next(iter(batch_server._batches)))["processing_status"] == "ended"
+
+
+def test_batch_pipeline_scores_and_improves(ai_client):
+    evaluator = RequirementEvaluator(ai_client, "채점 기준")
+    pipeline = BatchPipeline(
+        RequirementImprover(ai_client, "개선 지침"),
+        evaluator,
+        MessageBatchBackend(ai_client, poll_interval=0.05, timeout=10)
+    )
+    texts = {"A": "시스템은 빠르게 응답해야 한다.", "B": "시스템은 로그를 기록해야 한다."}
+
+    scores = pipeline.score(texts)
+    results = pipeline.run(texts, "Supplier", "IRCU", "HKMC")
+
+    assert all(set(result["scores"]) == set(RULE_TABLE.rules) for result in scores.values())
+    for result in results.values():
+        assert "error" not in result
+        assert result["improved_result"]["requirement"]
+        assert result["improved_scores"]["total"] > 0
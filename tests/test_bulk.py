@@ -0,0 +1,118 @@
+"""
+일괄 처리 입력 읽기와 결과 파일 기록
+"""
+import io
+import pytest
+from openpyxl import load_workbook
+import config
+from modules.bulk import BulkProcessor
+from modules.execution import ExecutionService
+from modules.jobs import DONE, JobRunner, JobStore
+from modules.rules import RULE_TABLE, ScoreRecord
+from tests.conftest import FakeAIClient, make_pipeline, requested_rules
+
+
+def respond(phase, tool, user_message):
+    if tool is None:
+        return "개선된 요구사항"
+    if tool["name"] == "record_set_findings":
+        return {"findings": []}
+    return {rule: {"score": 3, "reason": "ok"} for rule in requested_rules(user_message)}
+
+
+def stored_result(score):
+    record = ScoreRecord.from_result({"scores": {rule: {"score": score} for rule in RULE_TABLE.rules}})
+    return {
+        "improved_result": {"requirement": "개선된 요구사항"},
+        "original_scores": record.dump(),
+        "improved_scores": record.dump()
+    }
+
+
+def test_read_requirements_from_csv():
+    bulk = BulkProcessor(make_pipeline(FakeAIClient(respond)))
+    data = "ID,요구사항\nREQ-1,시스템은 응답해야 한다.\nREQ-2,\n,시스템은 기록해야 한다.\n"
+
+    requirements = list(bulk.read_requirements(io.StringIO(data), "doc.csv"))
+
+    assert requirements == [
+        {"id": "REQ-1", "text": "시스템은 응답해야 한다."},
+        {"id": "3", "text": "시스템은 기록해야 한다."},
+    ]
+
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "JOB_RECORDS_PAGE_SIZE", 2)
+    runner = JobRunner(JobStore(tmp_path / "jobs.db"), ExecutionService(), output_dir=tmp_path / "outputs")
+    runner.pipelines["alice"] = make_pipeline(FakeAIClient(respond))
+    return runner
+
+
+def create_job(runner, count):
+    requirements = [{"id": f"REQ-{i}", "text": f"시스템은 {i}번 로그를 {i * 7}초마다 기록해야 한다."} for i in range(count)]
+    job_id = runner.store.create_job("alice", "doc.xlsx", requirements, "Supplier", "IRCU", "HKMC")
+    return {"id": job_id, "name": "doc.xlsx"}
+
+
+def result_rows(path):
+    sheet = load_workbook(path, read_only=True)["결과"]
+    return [row for row in sheet.iter_rows(values_only=True)][1:]
+
+
+def test_records_are_read_page_by_page_in_order(runner):
+    job = create_job(runner, 5)
+    runner.store.complete(job["id"], 3, stored_result(4))
+
+    records = list(runner.store.records(job["id"]))
+
+    assert [record["seq"] for record in records] == [0, 1, 2, 3, 4]
+    assert records[3]["status"] == DONE and records[3]["result"]["improved_result"]
+    assert all(record["result"] is None for record in runner.store.records(job["id"], with_results=False))
+
+
+def test_partial_export_while_job_is_running(runner):
+    job = create_job(runner, 5)
+    runner.store.complete(job["id"], 0, stored_result(4))
+    runner.store.fail(job["id"], 1, "API 오류")
+    runner.store.set_status(job["id"], 2, "improving")
+
+    path = runner.export_partial("alice", job)
+
+    assert path == runner.partial_path("alice", job)
+    rows = result_rows(path)
+    assert [row[0] for row in rows] == [f"REQ-{i}" for i in range(5)]
+    assert rows[0][2] == "개선된 요구사항" and rows[0][8] is None
+    assert [row[8] for row in rows[1:]] == ["API 오류", "개선 중", "대기 중", "대기 중"]
+
+
+def test_final_export_replaces_partial_file(runner):
+    job = create_job(runner, 3)
+    for seq in range(3):
+        runner.store.complete(job["id"], seq, stored_result(4))
+    runner.export_partial("alice", job)
+
+    path = runner.export("alice", job)
+
+    assert path == runner.output_path("alice", job)
+    assert not runner.partial_path("alice", job).exists()
+    workbook = load_workbook(path, read_only=True)
+    assert workbook.sheetnames == ["결과", "집합 분석"]
+    assert len(result_rows(path)) == 3
+
+
+def test_export_applies_set_scores_by_row_with_duplicate_ids(tmp_path):
+    bulk = BulkProcessor(make_pipeline(FakeAIClient(respond)))
+    records = [
+        {"id": "REQ-1", "text": "시스템은 진단 결과를 CAN으로 전송해야 한다.", "result": stored_result(4)},
+        {"id": "REQ-1", "text": "와이퍼는 우천 감지 시 자동으로 작동해야 한다.", "result": stored_result(4)},
+    ]
+    set_scores = {"R30": {"score": 2, "reason": "중복"}, "C11": {"score": 5, "reason": "ok"}}
+    set_analysis = {"scores": [set_scores, {}], "findings": [], "duplicate_ids": {"REQ-1": [1, 2]}}
+
+    path = bulk.export(iter(records), tmp_path / "out.xlsx", set_analysis)
+
+    rows = result_rows(path)
+    assert rows[0][3] < rows[1][3]
+    set_rows = list(load_workbook(path, read_only=True)["집합 분석"].iter_rows(values_only=True))
+    assert set_rows[1][:2] == ("ID 중복", "REQ-1")
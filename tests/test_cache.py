@@ -0,0 +1,62 @@
+"""
+내용 기반 결과 캐시 (키 구성, 크기 제한 LRU, 파이프라인 재사용)
+"""
+import itertools
+import pytest
+from modules import cache as cache_module
+from modules.cache import ResultCache, make_key, normalize_text
+from tests.conftest import FakeAIClient, make_pipeline, requested_rules
+
+
+def test_normalize_text_unifies_whitespace_and_unicode_form():
+    decomposed = "\u1100\u1161"   # 자모로 분해된 "가"
+    assert normalize_text(f"  {decomposed} 시스템\t는\n\n응답해야 한다. ") == "가 시스템 는 응답해야 한다."
+
+
+def test_make_key_separates_parts():
+    assert make_key("ab", "c") != make_key("a", "bc")
+    assert make_key("a", "b") == make_key("a", "b")
+    assert len(make_key("a")) == 64
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    ticks = itertools.count(1000)
+    monkeypatch.setattr(cache_module.time, "time", lambda: float(next(ticks)))
+
+
+def test_get_returns_stored_value(tmp_path):
+    cache = ResultCache(tmp_path / "cache.db", max_bytes=1024)
+    cache.put("k", {"improved": "개선본"})
+
+    assert cache.get("k") == {"improved": "개선본"}
+    assert cache.get("missing") is None
+
+    cache.clear()
+    assert cache.get("k") is None
+
+
+def test_evicts_least_recently_used_entries_over_limit(tmp_path, clock):
+    value = {"text": "x" * 40}   # 약 50바이트
+    cache = ResultCache(tmp_path / "cache.db", max_bytes=160)
+    for key in ["a", "b", "c"]:
+        cache.put(key, value)
+    cache.get("a")   # a를 최근 사용으로
+
+    cache.put("d", value)
+
+    assert cache.get("b") is None
+    assert all(cache.get(key) == value for key in ["a", "c", "d"])
+
+
+def test_pipeline_reuses_scores_for_same_normalized_text(tmp_path):
+    client = FakeAIClient(lambda phase, tool, user_message: {rule: {"score": 4, "reason": ""} for rule in requested_rules(user_message)})
+    pipeline = make_pipeline(client, cache=ResultCache(tmp_path / "cache.db", max_bytes=1 << 20))
+
+    first = pipeline.evaluate("시스템은 로그를 기록해야 한다.")
+    calls = len(client.calls)
+    second = pipeline.evaluate("  시스템은   로그를 기록해야 한다.\n")
+
+    assert calls > 0
+    assert len(client.calls) == calls
+    assert second["scores"] == first["scores"]
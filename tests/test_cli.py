@@ -0,0 +1,81 @@
+"""
+로컬 스텁 서버를 상대로 한 CLI 실행
+"""
+import json
+import sys
+import pytest
+import cli
+import config
+
+
+@pytest.fixture
+def requirements_file(tmp_path):
+    path = tmp_path / "requirements.txt"
+    path.write_text(
+        "IRCU 시스템은 차량 속도를 100ms 이내에 CAN 버스로 전송해야 한다.\n"
+        "\n"
+        "시동이 켜진 경우 시스템은 진단 결과를 기록해야 한다.\n",
+        encoding="utf-8"
+    )
+    return path
+
+
+@pytest.fixture
+def stub_env(stub_server, monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(config, "API_BASE_URL", stub_server.url)
+    return stub_server
+
+
+def read_records(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.mark.parametrize("options", [[], ["--async"]])
+def test_improve_run_writes_jsonl(stub_env, requirements_file, tmp_path, options):
+    output = tmp_path / "out.jsonl"
+    metrics = tmp_path / "metrics.jsonl"
+
+    exit_code = cli.main([*options, "--no-cache", "--metrics", str(metrics), "-o", str(output), str(requirements_file)])
+
+    assert exit_code == 0
+    records = read_records(output)
+    assert [record["id"] for record in records] == [f"{requirements_file}:1", f"{requirements_file}:3"]
+    for record in records:
+        assert "error" not in record
+        assert record["improved"]
+        assert set(record["original_scores"]["rules"]) == set(record["improved_scores"]["rules"])
+        assert 0 < record["original_scores"]["percentage"] <= 100
+    assert stub_env.stats["requests"] > 0
+    assert metrics.read_text(encoding="utf-8").strip()
+
+
+def test_score_batch_run(stub_env, requirements_file, tmp_path):
+    output = tmp_path / "out.jsonl"
+
+    exit_code = cli.main(["--mode", "score", "--batch", "--no-cache", "-o", str(output), str(requirements_file)])
+
+    assert exit_code == 0
+    records = read_records(output)
+    assert len(records) == 2
+    assert all("improved" not in record and record["original_scores"]["total"] > 0 for record in records)
+
+
+def test_missing_api_key_exits_with_usage_error(monkeypatch, requirements_file, tmp_path):
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    monkeypatch.setattr(cli, "CONFIG_FILE", tmp_path / "missing.json")
+    monkeypatch.setitem(sys.modules, "dotenv", None)   # .env 파일 무시
+
+    assert cli.main([str(requirements_file)]) == 2
+
+
+def test_set_analysis_adds_row_scores(stub_env, requirements_file, tmp_path):
+    output = tmp_path / "out.jsonl"
+
+    exit_code = cli.main(["--mode", "score", "--set-analysis", "--no-cache", "-o", str(output), str(requirements_file)])
+
+    assert exit_code == 0
+    for record in read_records(output):
+        assert set(record["set_scores"]) == set(config.SET_RULES)
+        assert record["set_findings"] == []
@@ -0,0 +1,95 @@
+"""
+개선+평가 단일 호출 (record_improvement 응답 검증, 누락 규칙 보완)
+"""
+import asyncio
+import pytest
+from modules.combined import SCORING_HEADING
+from modules.rules import RULE_TABLE
+from tests.conftest import FakeAIClient, make_pipeline, requested_rules
+
+
+IMPROVED = "### 1. 분석\n모호함\n\n### 2. 개선된 요구사항\n시스템은 100ms 이내에 응답해야 한다.\n\n### 3. 요약\n완료"
+
+
+def scores_for(rules, score=4):
+    return {rule: {"score": score, "reason": "ok"} for rule in rules}
+
+
+def combined_respond(original_scores, repaired=None):
+    def respond(phase, tool, user_message):
+        if phase == "combined":
+            return {
+                "original_scores": original_scores,
+                "improved": IMPROVED,
+                "improved_scores": scores_for(tool["input_schema"]["properties"]["improved_scores"]["required"], 5)
+            }
+        return scores_for(requested_rules(user_message), 2) if repaired is None else repaired
+    return respond
+
+
+def test_combined_from_raw_reports_missing_and_invalid_rules():
+    client = FakeAIClient(lambda *args: {})
+    raw = {
+        "original_scores": {"C1": {"score": 4, "reason": "ok"}, "C2": {"score": 9, "reason": "범위 밖"}},
+        "improved": IMPROVED,
+        "improved_scores": scores_for(["C1", "C2", "C3"])
+    }
+
+    payload = client.combined_from_raw(raw, ["C1", "C2", "C3"])
+
+    assert payload["improved"] == IMPROVED
+    assert list(payload["original_scores"]) == ["C1"]
+    assert payload["original_missing"] == ["C2", "C3"]
+    assert payload["improved_missing"] == []
+
+
+@pytest.mark.parametrize("raw", [None, {"improved": "  "}, {"original_scores": {}, "improved_scores": {}}])
+def test_combined_from_raw_requires_improved_text(raw):
+    with pytest.raises(Exception, match="개선 결과 누락"):
+        FakeAIClient(lambda *args: {}).combined_from_raw(raw, ["C1"])
+
+
+def test_system_prompt_is_single_cached_block():
+    pipeline = make_pipeline(FakeAIClient(lambda *args: {}), combined=True)
+
+    prompt = pipeline.combined.system_prompt()
+
+    assert prompt.startswith("개선 지침") and SCORING_HEADING in prompt and prompt.endswith("채점 기준")
+
+
+def test_run_repairs_only_missing_rules():
+    client = FakeAIClient(lambda *args: {})
+    semantic = make_pipeline(client).evaluator.semantic_rules
+    client.respond = combined_respond(scores_for(semantic[1:]))
+    pipeline = make_pipeline(client, combined=True)
+
+    result = pipeline.run("시스템은 빠르게 응답해야 한다.", "Supplier", "IRCU", "HKMC")
+
+    assert [call["phase"] for call in client.calls] == ["combined", "score"]
+    assert requested_rules(client.calls[1]["user_message"]) == [semantic[0]]
+    assert result["improved_result"]["requirement"] == "시스템은 100ms 이내에 응답해야 한다."
+    assert result["original_scores"]["scores"][semantic[0]]["score"] == 2
+    assert set(result["original_scores"]["scores"]) == set(RULE_TABLE.rules)
+    assert all(result["improved_scores"]["scores"][rule]["score"] == 5 for rule in semantic)
+
+
+def test_run_fails_when_repair_keeps_missing_rules():
+    client = FakeAIClient(lambda *args: {})
+    semantic = make_pipeline(client).evaluator.semantic_rules
+    client.respond = combined_respond(scores_for(semantic[1:]), repaired={})
+    pipeline = make_pipeline(client, combined=True)
+
+    with pytest.raises(Exception):
+        pipeline.run("시스템은 빠르게 응답해야 한다.", "Supplier", "IRCU", "HKMC")
+
+
+def test_run_async_falls_back_to_thread_for_sync_client():
+    client = FakeAIClient(lambda *args: {})
+    semantic = make_pipeline(client).evaluator.semantic_rules
+    client.respond = combined_respond(scores_for(semantic))
+    pipeline = make_pipeline(client, combined=True)
+
+    result = asyncio.run(pipeline.combined.run_async("시스템은 빠르게 응답해야 한다.", "Supplier", "IRCU", "HKMC"))
+
+    assert [call["phase"] for call in client.calls] == ["combined"]
+    assert result["improved_scores"]["scores"][semantic[0]]["score"] == 5
@@ -0,0 +1,105 @@
+"""
+실행 서비스의 사용자별 공평 분배와 중복 요청 공유
+"""
+import threading
+import time
+from modules.execution import DONE, FAILED, QUEUED, ExecutionService
+
+
+def wait_for(service, task_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = service.status(task_id)
+        if status["state"] in (DONE, FAILED):
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"작업이 끝나지 않음: {service.status(task_id)}")
+
+
+def test_users_are_served_round_robin():
+    service = ExecutionService(max_workers=1, max_per_user=1)
+    release = threading.Event()
+    order = []
+
+    def task(name, block=False):
+        def run(report):
+            if block:
+                release.wait(5)
+            order.append(name)
+            return name
+        return run
+
+    first = service.submit("heavy", None, task("heavy-0", block=True))
+    heavy = [service.submit("heavy", None, task(f"heavy-{i}")) for i in range(1, 4)]
+    light = service.submit("light", None, task("light-0"))
+
+    assert service.status(light)["state"] == QUEUED
+    assert service.status(light)["ahead"] <= 1
+    release.set()
+    for task_id in [first, *heavy, light]:
+        wait_for(service, task_id)
+
+    # 먼저 몰린 요청이 많아도 다른 사용자의 요청은 바로 다음 차례
+    assert order[:2] == ["heavy-0", "light-0"]
+    assert order[2:] == ["heavy-1", "heavy-2", "heavy-3"]
+
+
+def test_per_user_limit_leaves_workers_for_others():
+    service = ExecutionService(max_workers=3, max_per_user=1)
+    release = threading.Event()
+
+    def blocked(report):
+        release.wait(5)
+
+    heavy = [service.submit("heavy", None, blocked) for _ in range(3)]
+    other = service.submit("other", None, blocked)
+    time.sleep(0.1)
+
+    assert service.status(heavy[0])["state"] != QUEUED
+    assert service.status(other)["state"] != QUEUED
+    assert service.stats()["running"] == 2
+    assert service.stats()["queued"] == 2
+    release.set()
+    for task_id in [*heavy, other]:
+        wait_for(service, task_id)
+
+
+def test_same_key_from_same_user_shares_one_task():
+    service = ExecutionService(max_workers=2, max_per_user=2)
+    release = threading.Event()
+    calls = []
+
+    def run(report):
+        calls.append(1)
+        release.wait(5)
+        return "결과"
+
+    first = service.submit("user", "요구사항", run)
+    second = service.submit("user", "요구사항", run)
+    other_user = service.submit("other", "요구사항", run)
+
+    assert first == second
+    assert other_user != first
+    assert service.status(first)["waiters"] == 2
+    release.set()
+    assert wait_for(service, first)["result"] == "결과"
+    wait_for(service, other_user)
+    assert len(calls) == 2
+
+    # 끝난 작업은 공유하지 않고 새로 실행
+    assert service.submit("user", "요구사항", run) != first
+
+
+def test_progress_and_failure_are_reported():
+    service = ExecutionService(max_workers=1, max_per_user=1)
+
+    def fail(report):
+        report(step="개선")
+        raise Exception("API 오류")
+
+    status = wait_for(service, service.submit("user", None, fail))
+
+    assert status["state"] == FAILED
+    assert status["error"] == "API 오류"
+    assert status["progress"] == {"step": "개선"}
+    assert service.stats()["users"] == 0
@@ -0,0 +1,76 @@
+"""
+개선 전후 차이에 따른 증분 평가 (점수 재사용 / 일부 규칙만 재평가 / 전체 평가)
+"""
+from concurrent.futures import Future
+from modules.ai_client import SCORING_TOOL
+from modules.incremental import BASE_RULES, SUBJECT_RULES, affected_rules
+from modules.rules import RULE_TABLE
+from tests.conftest import FakeAIClient, make_pipeline, requested_rules
+
+
+ORIGINAL = "IRCU 시스템은 차량 속도를 100ms 이내에 CAN 버스로 전송해야 한다."
+
+
+def test_whitespace_only_change_reuses_original_scores():
+    assert affected_rules(ORIGINAL, "  IRCU 시스템은  차량 속도를 100ms 이내에\nCAN 버스로 전송해야 한다. ") == []
+
+
+def test_small_edit_rescores_related_rules_only():
+    rules = affected_rules(ORIGINAL, ORIGINAL.replace("100ms", "50ms"))
+
+    assert rules is not None
+    assert set(BASE_RULES) <= set(rules)
+    assert {"R34", "R35"} <= set(rules)
+    assert "P1" not in rules   # 주어는 그대로
+    assert rules == [rule for rule in RULE_TABLE.rules if rule in rules]
+
+
+def test_subject_change_rescores_subject_rules():
+    rules = affected_rules(ORIGINAL, "HKMC " + ORIGINAL)
+
+    assert rules is not None
+    assert set(SUBJECT_RULES) <= set(rules)
+
+
+def test_large_rewrite_needs_full_evaluation():
+    assert affected_rules(ORIGINAL, "운전자가 요청하면 계기판은 경고등을 3초 동안 점멸해야 한다.") is None
+
+
+def revision_pipeline():
+    """원본 점수(모두 4점)가 나온 상태의 파이프라인 (다시 평가한 규칙은 2점)"""
+    client = FakeAIClient(lambda phase, tool, user_message: {
+        rule: {"score": 2, "reason": "재평가"} for rule in requested_rules(user_message)
+    })
+    pipeline = make_pipeline(client)
+    original_scores = pipeline.evaluator.build_result(
+        ORIGINAL, {rule: {"score": 4, "reason": "원본"} for rule in pipeline.evaluator.semantic_rules}
+    )
+    future = Future()
+    future.set_result(original_scores)
+    return pipeline, client, future
+
+
+def test_evaluate_revision_reuses_scores_without_calls():
+    pipeline, client, future = revision_pipeline()
+
+    result = pipeline.evaluate_revision(ORIGINAL, ORIGINAL + "  ", future)
+
+    assert client.calls == []
+    assert result["rescored_rules"] == []
+    assert result["scores"] == future.result()["scores"]
+
+
+def test_evaluate_revision_rescores_affected_rules_and_keeps_the_rest():
+    pipeline, client, future = revision_pipeline()
+    revised = ORIGINAL.replace("100ms", "50ms")
+
+    result = pipeline.evaluate_revision(ORIGINAL, revised, future)
+
+    expected = affected_rules(ORIGINAL, revised)
+    requested = [rule for call in client.calls for rule in requested_rules(call["user_message"])]
+    assert result["rescored_rules"] == expected
+    assert set(requested) <= set(expected)
+    assert all(call["tool"] is SCORING_TOOL for call in client.calls)   # 전체 평가와 같은 도구 정의 (캐시 공유)
+    kept = [rule for rule in pipeline.evaluator.semantic_rules if rule not in expected]
+    assert kept and all(result["scores"][rule]["score"] == 4 for rule in kept)
+    assert all(result["scores"][rule]["score"] == 2 for rule in requested)
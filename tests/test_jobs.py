@@ -0,0 +1,79 @@
+"""
+일괄 처리 작업 큐 (소유자별 분리, 재시작 후 이어서 처리)
+"""
+import time
+from modules.execution import ExecutionService
+from modules.jobs import DONE, FAILED, IMPROVING, PENDING, SCORING, JobRunner, JobStore
+from tests.conftest import FakeAIClient, make_pipeline, requested_rules
+
+
+REQUIREMENTS = [{"id": f"REQ-{i}", "text": f"시스템은 {i}번 로그를 기록해야 한다."} for i in range(4)]
+
+
+def create_job(store, owner="alice"):
+    return store.create_job(owner, "doc.xlsx", REQUIREMENTS, "Supplier", "IRCU", "HKMC")
+
+
+def test_jobs_are_listed_and_claimed_per_owner(tmp_path):
+    store = JobStore(tmp_path / "jobs.db")
+    mine = store.create_job("alice", "a.xlsx", REQUIREMENTS[:1], "Supplier", "IRCU", "HKMC")
+    store.create_job("bob", "b.xlsx", REQUIREMENTS[:1], "Supplier", "IRCU", "HKMC")
+
+    assert [job["id"] for job in store.list_jobs("alice")] == [mine]
+
+    item = store.claim_next(["alice"])
+    assert (item["job_id"], item["owner"], item["id"]) == (mine, "alice", "REQ-0")
+    assert store.claim_next(["alice"]) is None
+    assert store.claim_next(["bob"])["owner"] == "bob"
+
+
+def test_interrupted_items_are_requeued_after_restart(tmp_path):
+    store = JobStore(tmp_path / "jobs.db")
+    job_id = create_job(store)
+    store.complete(job_id, 0, {"improved_result": {}})
+    store.fail(job_id, 1, "API 오류")
+    store.set_status(job_id, 2, IMPROVING)
+    store.set_status(job_id, 3, SCORING)
+
+    # 재시작: 같은 파일로 저장소와 작업 큐를 다시 생성
+    restarted = JobStore(tmp_path / "jobs.db")
+    JobRunner(restarted, ExecutionService(), output_dir=tmp_path / "outputs")
+
+    assert [record["status"] for record in restarted.records(job_id)] == [DONE, FAILED, PENDING, PENDING]
+    assert restarted.counts(job_id) == {PENDING: 2, IMPROVING: 0, SCORING: 0, DONE: 1, FAILED: 1}
+    assert restarted.requeue_interrupted() == 0
+
+
+def test_retry_failed_requeues_only_failed_items(tmp_path):
+    store = JobStore(tmp_path / "jobs.db")
+    job_id = create_job(store)
+    store.complete(job_id, 0, {"improved_result": {}})
+    store.fail(job_id, 1, "API 오류")
+    store.set_output(job_id, "결과.xlsx")
+
+    assert store.retry_failed(job_id) == 1
+    assert [record["status"] for record in store.records(job_id, with_results=False)][:2] == [DONE, PENDING]
+    assert store.output(job_id) is None
+
+
+def test_runner_processes_job_and_writes_output(tmp_path):
+    def respond(phase, tool, user_message):
+        if tool is None:
+            return "### 2. 개선된 요구사항\nIRCU 시스템은 오류 로그를 100ms 이내에 기록해야 한다.\n"
+        if tool["name"] == "record_set_findings":
+            return {"findings": []}
+        return {rule: {"score": 4, "reason": ""} for rule in requested_rules(user_message)}
+
+    store = JobStore(tmp_path / "jobs.db")
+    runner = JobRunner(store, ExecutionService(max_workers=2), poll_interval=0.05, output_dir=tmp_path / "outputs")
+    job_id = runner.submit("alice", "doc.xlsx", REQUIREMENTS, "Supplier", "IRCU", "HKMC")
+    runner.start("alice", make_pipeline(FakeAIClient(respond)))
+    try:
+        deadline = time.monotonic() + 10
+        while store.output(job_id) is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        runner.stop(timeout=5)
+
+    assert store.counts(job_id)[DONE] == len(REQUIREMENTS)
+    assert store.output(job_id) == str(runner.output_path("alice", {"id": job_id, "name": "doc.xlsx"}))
@@ -0,0 +1,71 @@
+"""
+어휘 기반 사전 점검 (P2, R7, R32-R35)
+"""
+import pytest
+import config
+from modules.prescreen import local_rules, prescreen
+
+
+def scores(text):
+    return {rule: result["score"] for rule, result in prescreen(text).items()}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("시스템은 로그를 기록해야 한다.", 5),
+    ("The system shall log the event.", 5),
+    ("시스템은 로그를 기록하는 것을 권장한다.", 4),
+    ("시스템은 로그를 기록할 수 있다.", 3),
+    ("시스템은 로그를 기록한다.", 2),
+    ("로그 기록", 1),
+    ("시스템은 로그를 기록해야 한다. 시스템은 알림을 표시할 수 있다.", 3),   # 가장 약한 문장 기준
+])
+def test_p2_modal_verb(text, expected):
+    assert scores(text)["P2"] == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("시스템은 로그를 기록해야 한다.", 5),
+    ("시스템은 빠르게 응답해야 한다.", 3),
+    ("시스템은 빠르고 효율적으로 응답해야 한다.", 2),
+    ("시스템은 적절한 응답을 보장해야 한다.", 2),
+    ("시스템은 적절히 빠르고 효율적으로 응답해야 한다.", 1),
+])
+def test_r7_vague_terms(text, expected):
+    assert scores(text)["R7"] == expected
+
+
+def test_r32_universal_quantifiers():
+    assert scores("시스템은 모든 오류를 기록해야 한다.")["R32"] == 2
+    assert scores("The system shall log every error.")["R32"] == 2
+    assert scores("시스템은 각 오류를 기록해야 한다.")["R32"] == 5
+
+
+@pytest.mark.parametrize("text, r33, r34, r35", [
+    ("시스템은 100ms 이내에 응답해야 한다.", 5, 5, 5),
+    ("시스템은 100ms에 응답해야 한다.", 2, 5, 5),
+    ("시스템은 전압을 12V ± 0.5V로 유지해야 한다.", 5, 5, 0),
+    ("시스템은 빠르게 응답해야 한다.", 0, 2, 0),
+    ("시스템은 주기적으로 상태를 기록해야 한다.", 0, 0, 2),
+    ("시스템은 로그를 기록해야 한다.", 0, 0, 0),
+])
+def test_r33_to_r35_quantities(text, r33, r34, r35):
+    result = scores(text)
+    assert (result["R33"], result["R34"], result["R35"]) == (r33, r34, r35)
+
+
+@pytest.mark.parametrize("text", [
+    "시스템은 3개의 버튼을 표시해야 한다.",
+    "시스템은 경고를 2회 표시해야 한다.",
+    "시스템은 알림음을 3번 재생해야 한다.",
+])
+def test_counting_units_are_not_performance_values(text):
+    result = scores(text)
+    assert (result["R33"], result["R34"], result["R35"]) == (0, 0, 0)
+
+
+def test_local_rules_follow_config(monkeypatch):
+    monkeypatch.setattr(config, "PRESCREEN_RULES", ["P2", "R7", "C1"])
+
+    assert local_rules() == ["P2", "R7"]
+    assert local_rules(["R7", "R34"]) == ["R7"]
+    assert set(prescreen("시스템은 로그를 기록해야 한다.")) == {"P2", "R7"}
@@ -0,0 +1,83 @@
+"""
+단계별 모델 선택과 상위 모델 재평가 (escalate는 설정한 경우에만)
+"""
+import pytest
+from modules.ai_client import SCORING_TOOL
+from modules.cache import ResultCache
+from tests.conftest import FakeAIClient, make_pipeline, requested_rules
+
+
+RULES = ["P1", "P3", "P4"]
+
+ROUTED = {
+    "improve": {"model": "strong-model", "max_tokens": 100},
+    "score": {"model": "fast-model", "max_tokens": 100},
+    "escalate": {"model": "strong-model", "max_tokens": 100},
+}
+
+
+def full_scores(rules, score):
+    return {rule: {"score": score, "reason": ""} for rule in rules}
+
+
+def test_default_uses_one_model_without_escalation():
+    client = FakeAIClient(lambda *args: {})
+
+    assert client.phase_model("score") == client.phase_model("improve")
+    assert not client.can_escalate()
+
+
+def test_confidence_is_required_by_scoring_schema():
+    assert "confidence" in SCORING_TOOL["input_schema"]["required"]
+
+
+def test_without_escalation_failed_repair_raises_and_low_confidence_is_kept():
+    client = FakeAIClient(lambda phase, tool, user_message: {})
+
+    with pytest.raises(Exception, match="누락"):
+        client.evaluate_requirement("채점 기준", "요구사항", RULES)
+    assert {call["phase"] for call in client.calls} == {"score"}
+
+    client = FakeAIClient(lambda phase, tool, user_message: {
+        **full_scores(requested_rules(user_message), 2), "confidence": 0.1
+    })
+    scores = client.evaluate_requirement("채점 기준", "요구사항", RULES)
+    assert len(client.calls) == 1 and scores["P1"]["score"] == 2
+
+
+def test_routed_scoring_escalates_failed_repair():
+    def respond(phase, tool, user_message):
+        return full_scores(requested_rules(user_message), 3) if phase == "escalate" else {}
+
+    client = FakeAIClient(respond, phase_models=ROUTED)
+
+    scores = client.evaluate_requirement("채점 기준", "요구사항", RULES)
+
+    assert client.can_escalate()
+    assert client.phase_model("score")[0] == "fast-model"
+    assert client.calls[-1]["phase"] == "escalate"
+    assert sorted(scores) == sorted(RULES) and all(value["score"] == 3 for value in scores.values())
+
+
+def test_routed_scoring_escalates_low_confidence():
+    def respond(phase, tool, user_message):
+        rules = requested_rules(user_message)
+        if phase == "escalate":
+            return {**full_scores(rules, 5), "confidence": 0.9}
+        return {**full_scores(rules, 1), "confidence": 0.1}
+
+    client = FakeAIClient(respond, phase_models=ROUTED)
+
+    scores = client.evaluate_requirement("채점 기준", "요구사항", RULES)
+
+    assert [call["phase"] for call in client.calls] == ["score", "escalate"]
+    assert all(value["score"] == 5 for value in scores.values())
+
+
+def test_cache_key_changes_with_routing(tmp_path):
+    cache = ResultCache(tmp_path / "cache.db", 1 << 20)
+    default = make_pipeline(FakeAIClient(lambda *args: {}), cache=cache)
+    routed = make_pipeline(FakeAIClient(lambda *args: {}, phase_models=ROUTED), cache=cache)
+
+    assert default._evaluate_key != routed._evaluate_key
+    assert default._improve_key != routed._improve_key
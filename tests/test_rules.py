@@ -0,0 +1,135 @@
+"""
+규칙 테이블, 점수 집계, ScoreRecord 직렬화
+"""
+import json
+import pickle
+import numpy as np
+import pytest
+import config
+from modules.rules import RULE_TABLE, RuleTable, ScoreMatrix, ScoreRecord, expand_rule_range
+
+
+def test_rule_table_is_built_from_rules_count():
+    assert len(RULE_TABLE.rules) == sum(config.RULES_COUNT.values())
+    assert RULE_TABLE.max_score == len(RULE_TABLE.rules) * 5
+    assert "R36" not in RULE_TABLE.index
+    assert RULE_TABLE.rules[:3] == ["P1", "P2", "P3"]
+    assert expand_rule_range("R34-R35") == ["R34", "R35"]
+
+
+def test_rule_table_rejects_count_mismatch():
+    with pytest.raises(ValueError, match="P1-P7"):
+        RuleTable({"P1-P7": 6}, {})
+
+
+def test_every_rule_belongs_to_one_category():
+    assert RULE_TABLE.membership.sum(axis=1).tolist() == [1] * len(RULE_TABLE.rules)
+    assert int(RULE_TABLE.category_max.sum()) == RULE_TABLE.max_score
+
+
+def test_summaries_exclude_not_applicable_rules():
+    matrix = ScoreMatrix.from_scores(RULE_TABLE, [
+        {"P1": {"score": 5}, "P2": {"score": 3}, "R1": {"score": 0}, "ZZ1": {"score": 5}},
+        {},
+    ])
+
+    applicable, empty = matrix.summaries()
+
+    assert (applicable["total"], applicable["max"], applicable["percentage"]) == (8, 10, 80.0)
+    assert applicable["categories"]["패턴 규칙 (P1-P7)"]["score"] == 8
+    assert (empty["total"], empty["max"], empty["percentage"]) == (0, RULE_TABLE.max_score, 0.0)
+
+
+def test_aggregate_matches_per_rule_sums():
+    rng = np.random.default_rng(0)
+    raw = [
+        {rule: {"score": int(score)} for rule, score in zip(RULE_TABLE.rules, row)}
+        for row in rng.integers(0, 6, size=(20, len(RULE_TABLE.rules)))
+    ]
+
+    result = ScoreMatrix.from_scores(RULE_TABLE, raw).aggregate()
+
+    for i, scores in enumerate(raw):
+        values = [value["score"] for value in scores.values()]
+        assert result["total"][i] == sum(values)
+        applicable = sum(1 for value in values if value)
+        assert result["max"][i] == (5 * applicable if applicable else RULE_TABLE.max_score)
+
+
+def make_result(rescored_rules=None, items=None):
+    scores = {rule: {"score": (i % 6), "reason": f"{rule} 이유"} for i, rule in enumerate(RULE_TABLE.rules)}
+    result = {"scores": scores}
+    if rescored_rules is not None:
+        result["rescored_rules"] = rescored_rules
+    if items is not None:
+        result["items"] = items
+    return result
+
+
+def assert_same(record, other):
+    assert other.values.tolist() == record.values.tolist()
+    assert (other.total, other.max, other.percentage) == (record.total, record.max, record.percentage)
+    assert other.rescored_rules == record.rescored_rules
+    assert type(other.rescored_rules) is type(record.rescored_rules)
+
+
+@pytest.mark.parametrize("rescored_rules", [None, [], ["P3", "R1"]])
+def test_dump_load_round_trip(rescored_rules):
+    record = ScoreRecord.from_result(make_result(rescored_rules))
+
+    loaded = ScoreRecord.load(json.loads(json.dumps(record.dump(keep_reasons=True))))
+
+    assert_same(record, loaded)
+    assert loaded.scores == record.scores
+    assert loaded.categories == record.categories
+
+
+@pytest.mark.parametrize("rescored_rules", [None, [], ["P3", "R1"]])
+def test_pickle_round_trip(rescored_rules):
+    record = ScoreRecord.from_result(make_result(rescored_rules))
+
+    restored = pickle.loads(pickle.dumps(record))
+
+    assert_same(record, restored)
+    assert restored.reason("P1") == "P1 이유"
+
+
+def test_rescored_rules_reads_like_evaluation_result():
+    result = make_result([])
+    record = ScoreRecord.from_result(result)
+
+    assert record["rescored_rules"] == result["rescored_rules"]
+    assert isinstance(record["rescored_rules"], list)
+    assert "rescored_rules" in record
+    assert ScoreRecord.from_result(make_result())["rescored_rules"] is None
+
+
+def test_items_round_trip():
+    item = {"number": 1, "text": "분리된 요구사항", "pattern": "P1", "scores": make_result()}
+    record = ScoreRecord.from_result(make_result(items=[item]))
+
+    loaded = ScoreRecord.load(record.dump())
+
+    assert loaded.items[0]["text"] == "분리된 요구사항"
+    assert isinstance(loaded.items[0]["scores"], ScoreRecord)
+    assert_same(record.items[0]["scores"], loaded.items[0]["scores"])
+    assert loaded.reasons is None   # keep_reasons=False
+
+
+def test_from_result_clamps_scores_and_ignores_unknown_rules():
+    record = ScoreRecord.from_result({"scores": {"P1": {"score": 9}, "ZZ9": {"score": 3}, "P2": "형식 오류"}})
+
+    assert record.score("P1") == 5
+    assert record.score("P2") == 0
+    assert record.total == 5
+    assert record.max == 5
+    assert record.percentage == 100.0
+
+
+def test_coerce_accepts_record_dump_and_result():
+    result = make_result(["P1"])
+    record = ScoreRecord.from_result(result)
+
+    assert ScoreRecord.coerce(record) is record
+    assert_same(record, ScoreRecord.coerce(record.dump()))
+    assert_same(record, ScoreRecord.coerce(result))
@@ -0,0 +1,131 @@
+"""
+요청 스케줄러의 토큰 버킷과 재시도 백오프
+"""
+import asyncio
+from types import SimpleNamespace
+import pytest
+from modules.scheduler import RequestScheduler, TokenBucket
+
+
+class StatusError(Exception):
+    """status_code와 응답 헤더를 가진 API 오류 흉내"""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def make_scheduler(**kwargs):
+    options = dict(
+        requests_per_minute=6000, tokens_per_minute=600000, max_concurrency=2,
+        max_retries=3, base_delay=0.001, max_delay=0.01
+    )
+    options.update(kwargs)
+    return RequestScheduler(**options)
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(60)   # 초당 1
+
+    assert bucket._take(60) == 0.0
+    assert bucket._take(1) == pytest.approx(1.0, abs=0.05)
+
+
+def test_token_bucket_caps_request_at_capacity():
+    bucket = TokenBucket(60)
+
+    # 용량보다 큰 요청도 용량만큼만 기다리면 처리됨
+    assert bucket._take(1000) == 0.0
+    assert bucket.tokens == pytest.approx(0.0, abs=0.1)
+
+
+def test_token_bucket_adjust_charges_actual_usage():
+    bucket = TokenBucket(600)
+    bucket._take(100)
+
+    bucket.adjust(400)
+    assert bucket.tokens == pytest.approx(100, abs=1)
+
+    bucket.adjust(-100)
+    assert bucket.tokens == pytest.approx(200, abs=1)
+
+
+def test_retry_delay_uses_retry_after_header():
+    scheduler = make_scheduler(max_delay=60.0)
+
+    assert scheduler.retry_delay(StatusError(429, {"retry-after-ms": "250"}), 0) == pytest.approx(0.25)
+    assert scheduler.retry_delay(StatusError(529, {"retry-after": "2"}), 0) == pytest.approx(2.0)
+    assert scheduler.retry_delay(StatusError(429, {"retry-after": "120"}), 0) == 60.0
+
+
+def test_retry_delay_backs_off_exponentially_with_jitter():
+    scheduler = make_scheduler(base_delay=1.0, max_delay=5.0, max_retries=20)
+
+    for attempt in range(3):
+        for _ in range(20):
+            delay = scheduler.retry_delay(StatusError(503), attempt)
+            assert 0 <= delay <= min(5.0, 2 ** attempt)
+    assert max(scheduler.retry_delay(StatusError(503), 10) for _ in range(50)) <= 5.0
+
+
+def test_retry_delay_gives_up_on_client_errors_and_after_max_retries():
+    scheduler = make_scheduler(max_retries=3)
+
+    assert scheduler.retry_delay(StatusError(400), 0) is None
+    assert scheduler.retry_delay(ValueError("bug"), 0) is None
+    assert scheduler.retry_delay(StatusError(429), 3) is None
+
+
+def test_execute_retries_retryable_errors():
+    scheduler = make_scheduler()
+    errors = [StatusError(429), StatusError(529)]
+
+    def request():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    assert scheduler.execute(request, 10) == "ok"
+    assert errors == []
+
+
+def test_execute_raises_non_retryable_error_immediately():
+    scheduler = make_scheduler()
+    calls = []
+
+    def request():
+        calls.append(1)
+        raise StatusError(400)
+
+    with pytest.raises(StatusError):
+        scheduler.execute(request, 10)
+    assert len(calls) == 1
+
+
+def test_execute_async_retries_and_limits_concurrency():
+    scheduler = make_scheduler()
+    running = []
+    peak = []
+
+    async def main():
+        semaphore = asyncio.Semaphore(2)
+        failures = {0: 1}
+
+        async def run(index):
+            async def request():
+                running.append(index)
+                peak.append(len(running))
+                await asyncio.sleep(0.01)
+                running.remove(index)
+                if failures.get(index):
+                    failures[index] -= 1
+                    raise StatusError(429)
+                return index
+
+            return await scheduler.execute_async(request, 10, semaphore)
+
+        return await asyncio.gather(*(run(index) for index in range(5)))
+
+    assert asyncio.run(main()) == [0, 1, 2, 3, 4]
+    assert max(peak) == 2
@@ -0,0 +1,87 @@
+"""
+채점 응답 검증과 누락 규칙 보완
+"""
+import pytest
+from modules.ai_client import SCORING_TOOL
+from modules.rules import RULE_TABLE
+from tests.conftest import FakeAIClient, requested_rules
+
+
+RULES = ["P1", "P2", "P3", "P4", "P5", "P6"]
+
+
+def full_scores(rules, score=4):
+    return {rule: {"score": score, "reason": "ok"} for rule in rules}
+
+
+def test_validate_scores_accepts_schema_and_loose_values():
+    client = FakeAIClient(lambda *args: {})
+    raw = {
+        "P1": {"score": 3, "reason": "주어 명확"},
+        "P2": 5,
+        "P3": {"score": " 4 "},
+        "P4": {"score": 6, "reason": "범위 초과"},
+        "P5": True,
+    }
+
+    scores, missing = client._validate_scores(raw, RULES)
+
+    assert scores == {
+        "P1": {"score": 3, "reason": "주어 명확"},
+        "P2": {"score": 5, "reason": ""},
+        "P3": {"score": 4, "reason": ""},
+    }
+    assert missing == ["P4", "P5", "P6"]
+
+
+@pytest.mark.parametrize("raw", [None, [], "점수", {"P1": None}])
+def test_validate_scores_treats_malformed_input_as_missing(raw):
+    client = FakeAIClient(lambda *args: {})
+
+    scores, missing = client._validate_scores(raw, ["P1"])
+
+    assert scores == {}
+    assert missing == ["P1"]
+
+
+def test_evaluate_requirement_repairs_only_missing_rules():
+    def respond(phase, tool, user_message):
+        rules = requested_rules(user_message)
+        if rules == RULES:
+            return {**full_scores(RULES[:4]), "P5": {"score": "x"}, "confidence": 0.9}
+        return full_scores(rules, 2)
+
+    client = FakeAIClient(respond)
+
+    scores = client.evaluate_requirement("채점 기준", "시스템은 응답해야 한다.", RULES)
+
+    assert [call["phase"] for call in client.calls] == ["score", "score"]
+    assert requested_rules(client.calls[1]["user_message"]) == ["P5", "P6"]
+    assert {rule: value["score"] for rule, value in scores.items()} == {
+        "P1": 4, "P2": 4, "P3": 4, "P4": 4, "P5": 2, "P6": 2
+    }
+
+
+def test_repair_and_subset_requests_reuse_the_full_scoring_tool():
+    def respond(phase, tool, user_message):
+        rules = requested_rules(user_message)
+        # 요청하지 않은 규칙까지 돌려줘도 요청한 규칙만 사용
+        return full_scores(RULE_TABLE.rules if len(rules) > 1 else [], 3)
+
+    client = FakeAIClient(respond)
+
+    with pytest.raises(Exception):
+        client.evaluate_requirement("채점 기준", "요구사항", ["R1"])
+    scores = client.evaluate_requirement("채점 기준", "요구사항", ["R1", "R2"])
+
+    assert sorted(scores) == ["R1", "R2"]
+    assert all(call["tool"] is SCORING_TOOL for call in client.calls)
+    assert set(RULE_TABLE.rules) <= set(SCORING_TOOL["input_schema"]["properties"])
+
+
+def test_repair_scores_raises_when_rules_stay_missing():
+    client = FakeAIClient(lambda phase, tool, user_message: {})
+
+    with pytest.raises(Exception, match="P6"):
+        client.repair_scores("채점 기준", "요구사항", {}, ["P6"])
+    assert len(client.calls) == 2   # SCORING_REPAIR_ATTEMPTS
@@ -0,0 +1,98 @@
+"""
+요구사항 집합 분석 (MinHash/LSH 후보, 묶음 판정, C11/R30 점수)
+"""
+import config
+from modules.set_analysis import SetAnalyzer, SimilarityIndex
+from tests.conftest import FakeAIClient
+
+
+REQUIREMENTS = [
+    {"id": "REQ-1", "text": "헤드램프는 운전자가 라이트 스위치를 켜면 주간과 야간 모두 0.5초 이내에 점등되어야 한다."},
+    {"id": "REQ-2", "text": "헤드램프는 운전자가 라이트 스위치를 켜면 주간과 야간 모두 2초 이내에 점등되어야 한다."},
+    {"id": "REQ-3", "text": "와이퍼는 우천 감지 시 자동으로 작동해야 한다."},
+    {"id": "REQ-4", "text": "시스템은 진단 결과를 CAN으로 전송해야 한다."},
+]
+
+
+def test_similarity_index_finds_only_similar_pairs():
+    texts = [requirement["text"] for requirement in REQUIREMENTS]
+
+    pairs = SimilarityIndex().build(texts).candidate_pairs()
+
+    assert list(pairs) == [(0, 1)]
+    assert pairs[(0, 1)] >= config.SET_RELATED_THRESHOLD
+
+
+def test_similarity_index_is_deterministic_for_seed():
+    texts = [requirement["text"] for requirement in REQUIREMENTS]
+
+    first = SimilarityIndex(seed=7).build(texts)
+    second = SimilarityIndex(seed=7).build(texts)
+
+    assert first._buckets == second._buckets
+
+
+def test_local_estimate_scores_conflict_without_client():
+    analysis = SetAnalyzer(None).analyze(REQUIREMENTS)
+
+    assert analysis["groups"] == [["REQ-1", "REQ-2"]]
+    assert analysis["pairs"][0]["signals"] == ["거의 동일", "수치 다름"]
+    assert [finding["type"] for finding in analysis["findings"]] == ["conflict"]
+    assert analysis["scores"][0]["C11"]["score"] == 1
+    assert analysis["scores"][0]["R30"]["score"] == 5
+    assert analysis["scores"][2] == {
+        "R30": {"score": 5, "reason": "집합 분석: 중복 표현 없음"},
+        "C11": {"score": 5, "reason": "집합 분석: 상충/용어 불일치 없음"},
+    }
+    assert analysis["errors"] == 0
+
+
+def test_llm_judges_only_candidate_groups():
+    def respond(phase, tool, user_message):
+        return {"findings": [{"ids": ["REQ-1", "REQ-2"], "type": "inconsistent_terms", "reason": "단위 표기 다름"}]}
+
+    client = FakeAIClient(respond)
+    analysis = SetAnalyzer(client, "집합 기준").analyze(REQUIREMENTS)
+
+    assert len(client.calls) == 1
+    assert "REQ-3" not in client.calls[0]["user_message"]
+    assert analysis["findings"][0]["rows"] == [0, 1]
+    assert analysis["scores"][1]["C11"] == {"score": 3, "reason": "집합 분석: 용어 불일치 REQ-1 (단위 표기 다름)"}
+
+
+def test_failed_judgement_falls_back_to_local_estimate():
+    def respond(phase, tool, user_message):
+        raise Exception("API 오류")
+
+    analysis = SetAnalyzer(FakeAIClient(respond), "집합 기준").analyze(REQUIREMENTS)
+
+    assert analysis["errors"] == 1
+    assert analysis["scores"][0]["C11"]["score"] == 1
+
+
+def test_duplicate_ids_are_kept_per_row():
+    requirements = [
+        {"id": "REQ-1", "text": "시스템은 진단 결과를 CAN으로 전송해야 한다."},
+        {"id": "REQ-1", "text": "와이퍼는 우천 감지 시 자동으로 작동해야 한다."},
+        {"id": "REQ-2", "text": "시스템은  진단 결과를 CAN으로 전송해야 한다."},
+    ]
+    client = FakeAIClient(lambda phase, tool, user_message: {"findings": []})
+
+    analysis = SetAnalyzer(client, "집합 기준").analyze(requirements)
+
+    assert analysis["duplicate_ids"] == {"REQ-1": [1, 2]}
+    assert len(analysis["scores"]) == 3
+    assert analysis["findings"] == [
+        {"ids": ["REQ-1#1", "REQ-2"], "rows": [0, 2], "type": "duplicate", "reason": "동일한 텍스트"}
+    ]
+    assert analysis["scores"][0]["R30"] == {"score": 2, "reason": "집합 분석: 중복 REQ-2 (동일한 텍스트)"}
+    assert analysis["scores"][1]["R30"]["score"] == 5
+    assert client.calls == []
+
+
+def test_group_pairs_splits_large_components():
+    pairs = [{"rows": [0, i], "ids": ["A", str(i)], "similarity": 0.5, "signals": []} for i in range(1, 5)]
+
+    groups = SetAnalyzer(None).group_pairs(pairs, max_size=3)
+
+    assert [group["rows"] for group in groups] == [[0, 1, 2], [0, 3, 4]]
@@ -0,0 +1,70 @@
+"""
+개선 응답 스트리밍과 개선된 요구사항 섹션이 완성되는 즉시 시작하는 평가
+"""
+import threading
+from modules.improver import RequirementImprover
+from tests.conftest import FakeAIClient, make_pipeline, requested_rules
+
+
+ORIGINAL = "시스템은 빠르게 응답해야 한다."
+REVISED = "운전자가 버튼을 누르면 IRCU 시스템은 경고 화면을 200ms 이내에 표시해야 한다."
+RESPONSE = f"""### 1. 원본 분석
+모호한 표현이 있습니다.
+
+### 2. 개선된 요구사항
+{REVISED}
+
+### 3. 적용된 규칙
+R7, R34
+"""
+
+
+def test_extract_improved_section_waits_for_next_heading_while_streaming():
+    improver = RequirementImprover(FakeAIClient(lambda *args: {}), "개선 지침")
+    partial = RESPONSE[:RESPONSE.index("### 3.")]
+
+    assert improver.extract_improved_section(partial, complete=False) is None
+    assert improver.extract_improved_section(partial + "##", complete=False) is None
+    assert improver.extract_improved_section(partial + "### ", complete=False) == REVISED
+    assert improver.extract_improved_section(partial) == REVISED
+
+
+def test_extract_improved_section_without_heading():
+    improver = RequirementImprover(FakeAIClient(lambda *args: {}), "개선 지침")
+
+    assert improver.extract_improved_section("형식 없는 응답", complete=False) is None
+    assert improver.extract_improved_section(" 형식 없는 응답 ") == "형식 없는 응답"
+
+
+class StreamingClient(FakeAIClient):
+    """개선 응답을 조각으로 나누어 주고, 마지막 조각 전에 개선본 평가 요청이 오는지 기다림"""
+
+    def __init__(self, respond):
+        super().__init__(respond)
+        self.revised_scored = threading.Event()
+        self.scored_before_end = None
+
+    def stream_api(self, system_prompt, user_message, phase=None):
+        cut = RESPONSE.index("### 3.") + len("### 3.")
+        yield RESPONSE[:cut]
+        self.scored_before_end = self.revised_scored.wait(5)
+        yield RESPONSE[cut:]
+
+
+def test_run_stream_scores_revision_before_response_ends():
+    def respond(phase, tool, user_message):
+        if REVISED in user_message:
+            client.revised_scored.set()
+        return {rule: {"score": 4, "reason": ""} for rule in requested_rules(user_message)}
+
+    client = StreamingClient(respond)
+    pipeline = make_pipeline(client)
+
+    events = list(pipeline.run_stream(ORIGINAL, "Supplier", "IRCU", "HKMC"))
+
+    assert client.scored_before_end is True
+    assert "".join(event["text"] for event in events if event["type"] == "delta") == RESPONSE
+    result = events[-1]["result"]
+    assert events[-1]["type"] == "done"
+    assert result["improved_result"]["requirement"] == REVISED
+    assert result["improved_scores"]["total"] > 0 and result["original_scores"]["total"] > 0